@@ -1,22 +1,384 @@
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, Request, request, jsonify, render_template, g, Response
 import os
+import hmac
+import time
+import functools
+from pathlib import Path
+import queue
+import uuid
+import threading
+import numpy as np
 from flask_cors import CORS, cross_origin
-from Classifier.utils.common import decodeImage
-from Classifier.pipeline.prediction import PredictionPipeline
+from werkzeug.formparser import FormDataParser, MultiPartParser
+from Classifier.utils.common import decodeImageBytes
+from Classifier.pipeline.batching import MicroBatcher
+from Classifier.pipeline.prediction_cache import PredictionCache
+from Classifier.pipeline.upload import UploadBuffers, BufferWriter
+from Classifier.pipeline.worker_pool import InferenceWorkerPool, PooledModel
+from Classifier.pipeline.serving import classify_image
+from Classifier.pipeline import metrics
+from Classifier.pipeline.training_jobs import TrainingJobManager
+from Classifier.pipeline.model_watcher import ModelWatcher
+from Classifier.config.configuration import ConfigurationManager
+from src.logger import logging, set_request_id, reset_request_id
+# NOTE: Classifier.pipeline.prediction (and with it TensorFlow) is imported
+# lazily in ClientApp.load_model, so importing this module stays cheap
+# (and with the worker pool enabled, it is never imported here at all).
 
 
 
 os.putenv('LANG', 'en_US.UTF-8')
 os.putenv('LC_ALL', 'en_US.UTF-8')
 
+
+def _process_start_time() -> float:
+    """
+    Wall-clock time at which this process was started (exec or fork), read from
+    /proc on Linux. Falls back to the import time of this module elsewhere.
+    """
+    try:
+        with open("/proc/self/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/stat") as f:
+            boot_time = next(int(line.split()[1]) for line in f if line.startswith("btime"))
+        return boot_time + int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, StopIteration):
+        return time.time()
+
+
+PROCESS_START = _process_start_time()
+
+
+class ImageFieldParser(MultiPartParser):
+    """
+    Multipart parser writing the 'image' file field into the thread's reusable
+    upload buffer (see pipeline/upload.py) instead of a fresh temporary file.
+    Any other file field gets Werkzeug's usual stream.
+
+    The field name is only known here: Werkzeug's stream factory
+    ('Request._get_file_stream') is not told which field it is called for.
+    """
+    def __init__(self, upload_buffers: UploadBuffers, **kwargs):
+        super().__init__(**kwargs)
+        self.upload_buffers = upload_buffers
+        self.buffer_used = False
+
+    def start_file_streaming(self, event, total_content_length):
+        if event.name == "image" and not self.buffer_used:
+            self.buffer_used = True
+            return self.upload_buffers.writer()
+        return super().start_file_streaming(event, total_content_length)
+
+
+class ImageFormDataParser(FormDataParser):
+    """
+    FormDataParser using ImageFieldParser for multipart bodies (same steps as Werkzeug's own).
+    """
+    def _parse_multipart(self, stream, mimetype, content_length, options):
+        parser = ImageFieldParser(
+            UploadRequest.upload_buffers,
+            stream_factory=self.stream_factory,
+            max_form_memory_size=self.max_form_memory_size,
+            max_form_parts=self.max_form_parts,
+            cls=self.cls,
+        )
+        boundary = options.get("boundary", "").encode("ascii")
+        if not boundary:
+            raise ValueError("Missing boundary")
+        form, files = parser.parse(stream, boundary, content_length)
+        return stream, form, files
+
+
+class UploadRequest(Request):
+    """
+    Request whose multipart 'image' file is written into the thread's reusable upload buffer.
+    """
+    upload_buffers = UploadBuffers()
+    form_data_parser_class = ImageFormDataParser
+
+
 app = Flask(__name__)
-CORS(app)
+app.request_class = UploadRequest
+# Cross-origin calls are allowed everywhere except the /admin routes
+CORS(app, resources={r"/(?!admin/).*": {"origins": "*"}})
 
 
 class ClientApp:
-    def __init__(self):
+    """
+    Holds everything one server process needs to answer requests.
+
+    The model can be loaded lazily ('lazy', the default: on the first request,
+    or in the background as soon as the readiness probe is called) or eagerly
+    ('preload': when the app is created). Use 'preload' with 'python app.py'
+    or gunicorn without '--preload' only: under 'gunicorn --preload' the
+    model would be loaded in the master and forked into the workers, and
+    TensorFlow's thread pools and runtime state do not survive a fork (workers
+    can hang on their first prediction). Background threads (batcher, model
+    watcher, training job runner) do not survive a fork either, so they are
+    started separately in every worker process.
+
+    With the worker pool enabled, the model only runs in the pool's processes:
+    this process holds a 'PooledModel' (version and label map) and no TensorFlow.
+    """
+    def __init__(self, load_mode=None):
         self.filename = "inputImage.jpg"
-        self.classifier = PredictionPipeline(self.filename)
+        config_manager = ConfigurationManager()
+        self.config = config_manager.get_prediction_config()
+        self.training_jobs_config = config_manager.get_training_jobs_config()
+        self.load_mode = load_mode or os.environ.get("MODEL_LOAD_MODE") or self.config.load_mode
+
+        self.classifier = None
+        self.batcher = None
+        self.prediction_cache = None
+        self.model_watcher = None
+        self.worker_pool = None
+        self._training_jobs = None
+        self._load_lock = threading.Lock()
+        self._services_lock = threading.Lock()
+        self._services_pid = None
+        self._loader_pid = None
+        self._jobs_pid = None
+        self._first_prediction_logged = False
+
+    @property
+    def ready(self) -> bool:
+        """
+        True once the model is loaded and has passed its warm-up prediction.
+        """
+        return self.classifier is not None
+
+    def load_model(self):
+        """
+        Imports TensorFlow, loads the model and warms it up (only once per process tree).
+        With the worker pool enabled, only reads the model's version and label map
+        (the pool's workers load and warm up the model, see '_start_services').
+        """
+        with self._load_lock:
+            if self.classifier is None and self.config.worker_pool_enabled:
+                self.classifier = PooledModel(
+                    self.config.model_path, image_size=self.config.params_image_size[:-1]
+                )
+                logging.info(f"Serving model version {self.classifier.model_version} through the worker pool")
+            elif self.classifier is None:
+                start = time.perf_counter()
+                from Classifier.pipeline.prediction import PredictionPipeline
+
+                classifier = PredictionPipeline(
+                    self.filename,
+                    model_path=self.config.model_path,
+                    image_size=self.config.params_image_size[:-1],
+                    tflite_threads=self.config.tflite_threads
+                )
+                classifier.warm_up()
+                self._timed_forward = metrics.timed_forward(
+                    classifier.predict_proba, lambda: classifier.model_version
+                )
+                self.classifier = classifier
+                logging.info(
+                    f"Model ready in {time.perf_counter() - start:.2f}s "
+                    f"({time.time() - PROCESS_START:.2f}s after process start, load mode: {self.load_mode})"
+                )
+        return self.classifier
+
+    def load_model_in_background(self):
+        """
+        Starts loading the model without blocking the caller (used by the readiness probe).
+        At most one loader thread is started per process, however many probes arrive.
+        """
+        if self.ready:
+            return
+        pid = os.getpid()
+        with self._services_lock:
+            if self._loader_pid == pid:
+                return
+            self._loader_pid = pid
+        threading.Thread(target=self._load_in_background, name="model-loader", daemon=True).start()
+
+    def _load_in_background(self):
+        try:
+            self.load_model()
+        except Exception as e:
+            logging.exception(e)
+            self._loader_pid = None     # Let the next readiness probe try again
+
+    def _start_services(self):
+        """
+        Starts the per-process threads that depend on the model.
+        """
+        pid = os.getpid()
+        if self._services_pid == pid:
+            return
+        with self._services_lock:
+            if self._services_pid == pid:
+                return
+
+            # Decode + model in K pinned worker processes (see worker_pool.py);
+            # the workers batch their own queue, so the micro-batcher is not needed.
+            # A model swap moves the pool first (see PooledModel)
+            self.worker_pool = None
+            if self.config.worker_pool_enabled:
+                info = self.classifier.model_info()
+                self.worker_pool = InferenceWorkerPool(
+                    info["path"],
+                    image_size=self.config.params_image_size[:-1],
+                    workers=self.config.pool_workers,
+                    threads_per_worker=self.config.pool_threads_per_worker,
+                    max_batch_size=self.config.pool_max_batch_size,
+                    max_queue_size=self.config.pool_max_queue_size,
+                    timeout_s=self.config.pool_timeout_s,
+                    model_version=info["version"]
+                ).start()
+                self.classifier.worker_pool = self.worker_pool
+
+            # Concurrent /predict calls are grouped into one model call (see batching.py)
+            self.batcher = None
+            if self.config.batching_enabled and self.worker_pool is None:
+                self.batcher = MicroBatcher(
+                    self.forward,
+                    max_batch_size=self.config.max_batch_size,
+                    max_wait_ms=self.config.max_wait_ms,
+                    max_queue_size=self.config.max_queue_size
+                )
+
+            # Repeated images are answered from the cache; a model swap empties it
+            # (and, like startup, prunes the disk entries of stale versions)
+            self.prediction_cache = None
+            if self.config.cache_enabled:
+                self.prediction_cache = PredictionCache(
+                    max_entries=self.config.cache_max_entries, disk_dir=self.config.cache_disk_dir,
+                    disk_max_age_days=self.config.cache_disk_max_age_days
+                )
+                self.prediction_cache.prune_disk(keep_version=self.classifier.model_version)
+                self.classifier.on_model_swap.append(self.prediction_cache.invalidate)
+
+            # /metrics reports which model version is being served
+            metrics.set_model_version(self.classifier.model_version)
+            self.classifier.on_model_swap.append(metrics.set_model_version)
+
+            # Newly trained models are warmed up and swapped in without a restart
+            self.model_watcher = None
+            if self.config.hot_reload_enabled:
+                self.model_watcher = ModelWatcher(
+                    self.classifier, self.config.watch_path, self.config.poll_seconds
+                ).start()
+
+            self._services_pid = pid
+
+    def serving_state(self):
+        """
+        Version of the model actually answering predictions (cache keys use it)
+        and the in-process model state, read together once per request.
+        The worker pool moves to a new model just before its state is swapped in.
+
+        Returns:
+            tuple: (version, state) where 'state' can be passed to 'forward'.
+        """
+        state = self.classifier.state
+        if self.worker_pool is not None:
+            return self.worker_pool.model_version, state
+        return state["version"], state
+
+    @property
+    def serving_version(self) -> str:
+        return self.serving_state()[0]
+
+    def forward(self, batch, state=None):
+        """
+        Model call used by every route, timed for /metrics.
+
+        Args:
+            state (dict, optional): Model to run (see 'serving_state'); defaults to the one being served.
+        """
+        return self._timed_forward(batch, state)
+
+    def ensure_ready(self):
+        """
+        Returns the loaded classifier, loading it first if needed (lazy mode).
+        """
+        classifier = self.load_model()
+        self._start_services()
+        return classifier
+
+    @property
+    def training_jobs(self) -> TrainingJobManager:
+        """
+        Retraining runs in a separate, lower-priority process (see training_jobs.py).
+        Created on first use in each worker process.
+        """
+        pid = os.getpid()
+        if self._jobs_pid != pid:
+            with self._services_lock:
+                if self._jobs_pid != pid:
+                    self._training_jobs = TrainingJobManager(self.training_jobs_config)
+                    self._jobs_pid = pid
+        return self._training_jobs
+
+    def log_first_prediction(self):
+        """
+        Logs the cold-start time (process start -> first prediction served), once per process.
+        """
+        if not self._first_prediction_logged:
+            self._first_prediction_logged = True
+            logging.info(f"First prediction served {time.time() - PROCESS_START:.2f}s after process start")
+
+
+clApp = None
+
+
+def create_app(load_mode=None):
+    """
+    Application factory (e.g., 'gunicorn app:app'). Do not combine '--preload'
+    with load_mode 'preload': TensorFlow must not be loaded before the fork.
+
+    Args:
+        load_mode (str, optional): 'preload' loads the model right away, 'lazy'
+            defers it to the first request / readiness probe. Defaults to the
+            MODEL_LOAD_MODE environment variable, then to 'prediction.load_mode'
+            in config.yaml.
+
+    Returns:
+        Flask: The configured Flask app.
+    """
+    global clApp
+    clApp = ClientApp(load_mode)
+    # Bigger bodies are rejected with HTTP 413 before (or while) they are read
+    app.config["MAX_CONTENT_LENGTH"] = clApp.config.max_upload_bytes
+    UploadRequest.upload_buffers = UploadBuffers(max_kept_bytes=clApp.config.upload_keep_bytes)
+    if clApp.load_mode == "preload":
+        clApp.load_model()
+    return app
+
+
+@app.before_request
+def assignRequestId():
+    # Every log line written while serving this request carries its id
+    g.request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    g.request_id_token = set_request_id(g.request_id)
+
+
+@app.before_request
+def startRequestMetrics():
+    g.metrics_route = request.url_rule.rule if request.url_rule else "unmatched"
+    g.metrics_start = time.perf_counter()
+    metrics.request_started(g.metrics_route)
+
+
+@app.after_request
+def recordResponseStatus(response):
+    g.metrics_status = response.status_code
+    response.headers["X-Request-ID"] = g.request_id
+    return response
+
+
+@app.teardown_request
+def finishRequestMetrics(exception=None):
+    if "metrics_start" in g:
+        metrics.request_finished(
+            g.metrics_route, request.method, g.get("metrics_status", 500),
+            time.perf_counter() - g.metrics_start
+        )
+    if "request_id_token" in g:
+        reset_request_id(g.request_id_token)
 
 
 @app.route("/", methods=['GET'])
@@ -28,6 +390,26 @@ def home():
     return render_template('index.html')
 
 
+@app.route("/health", methods=['GET'])
+def healthRoute():
+    """
+    Liveness probe: the process is up and answering HTTP.
+    """
+    return jsonify({"status": "ok"})
+
+
+@app.route("/ready", methods=['GET'])
+def readyRoute():
+    """
+    Readiness probe: only healthy once the model is loaded and warmed up.
+    In lazy mode, the first call starts loading the model in the background.
+    """
+    if not clApp.ready:
+        clApp.load_model_in_background()
+        return jsonify({"ready": False}), 503
+    return jsonify({"ready": True, "model_version": clApp.classifier.model_version})
+
+
 
 
 @app.route("/train", methods=['GET','POST'])
@@ -37,33 +419,314 @@ def trainRoute():
     Triggers the Machine Learning pipeline.
     In a real-world scenario, we use 'dvc repro' to intelligently run 
     only the modified parts of the pipeline.
+
+    The run is queued as a background job (one pipeline run at a time) and
+    this route returns its id right away; use /train/<job_id> to follow it.
+    """
+    job = clApp.training_jobs.submit()
+    return jsonify(job.to_dict()), 202
+
+
+@app.route("/train/<job_id>", methods=['GET'])
+@cross_origin()
+def trainStatusRoute(job_id):
+    """
+    Returns the status of a training job (queued, running, succeeded, failed, cancelled).
+    """
+    job = clApp.training_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown job: {job_id}"}), 404
+    return jsonify(job.to_dict())
+
+
+@app.route("/train/<job_id>/log", methods=['GET'])
+@cross_origin()
+def trainLogRoute(job_id):
+    """
+    Returns the last lines of a training job's log (?lines=100).
+    """
+    if clApp.training_jobs.get(job_id) is None:
+        return jsonify({"error": f"Unknown job: {job_id}"}), 404
+    lines = request.args.get("lines", default=100, type=int)
+    return clApp.training_jobs.tail(job_id, lines), 200, {"Content-Type": "text/plain; charset=utf-8"}
+
+
+@app.route("/train/<job_id>/cancel", methods=['POST'])
+@cross_origin()
+def trainCancelRoute(job_id):
+    """
+    Cancels a queued or running training job.
     """
-    # os.system("python main.py") # Alternative direct execution
-    os.system("dvc repro")        # Recommended: DVC handles pipeline tracking
-    return "Training done successfully!"
+    if not clApp.training_jobs.cancel(job_id):
+        return jsonify({"error": f"Job {job_id} is unknown or already finished"}), 409
+    return jsonify(clApp.training_jobs.get(job_id).to_dict())
+
 
 
+def readUploadedImage():
+    """
+    Encoded image of a raw or multipart /predict body, as a zero-copy view of
+    this thread's upload buffer. Returns None if the body holds no image.
+    """
+    if request.mimetype == "multipart/form-data":
+        upload = request.files.get("image")
+        if upload is None:
+            return None
+        if isinstance(upload.stream, BufferWriter):
+            return upload.stream.getbuffer()
+        return upload.read()
+
+    writer = UploadRequest.upload_buffers.writer()
+    writer.fill_from(request.stream, clApp.config.upload_chunk_bytes, request.content_length)
+    return writer.getbuffer() if writer.size else None
+
 
 @app.route("/predict", methods=['POST'])
 @cross_origin()
 def predictRoute():
     """
-    Receives an image string (Base64) from the frontend, decodes it, 
+    Receives an image from the frontend, decodes it, 
     and returns the classification result (Normal/Tumor).
+
+    The image can be sent as:
+    - JSON {"image": "<Base64 string>"} (what the web page sends).
+    - A raw body (Content-Type: application/octet-stream or image/*).
+    - multipart/form-data with the file in the 'image' field.
+    Raw and multipart bodies skip Base64 entirely: they are streamed into this
+    thread's reusable upload buffer and the image is decoded straight from it.
     """
-    image = request.json['image']
+    classifier = clApp.ensure_ready()
+    route = "/predict"
     
-    # 1. Decode the Base64 image and save it as 'inputImage.jpg'
-    decodeImage(image, clApp.filename)
+    # 1. Get the encoded image bytes (kept in memory, no shared temp file)
+    if request.is_json:
+        try:
+            with metrics.phase(route, "base64_decode"):
+                image_bytes = decodeImageBytes(request.json['image'])
+        except (KeyError, TypeError, ValueError) as e:
+            # No 'image' key, not a string, or invalid Base64 (binascii.Error is a ValueError)
+            return jsonify({"error": f"Invalid request: {e}"}), 400
+    else:
+        with metrics.phase(route, "body_read"):
+            image_bytes = readUploadedImage()
+        if image_bytes is None:
+            return jsonify({"error": "No image in the request body"}), 400
     
-    # 2. Use the PredictionPipeline to classify the saved image
-    result = clApp.classifier.predict()
+    # 2. Answer from the cache, or classify the image with the served model
+    # (worker pool, micro-batcher or direct call; see pipeline/serving.py).
+    # The served model is read once: its version keys the cache, its labels name the result.
+    serving = clApp.serving_state()
+    try:
+        probabilities = classify_image(clApp, image_bytes, route, serving)
+    except (queue.Full, TimeoutError):
+        return jsonify({"error": "Server busy, please retry"}), 503
+    except ValueError as e:
+        # The image could not be decoded
+        return jsonify({"error": f"Invalid image: {e}"}), 400
+    except RuntimeError as e:
+        # Worker died mid-request, or the pool is closed/empty
+        logging.error(f"Worker pool failed: {e}")
+        return jsonify({"error": "Inference unavailable, please retry"}), 503
+    clApp.log_first_prediction()
     
     # 3. Send the result back to the frontend as JSON
-    return jsonify(result)
+    with metrics.phase(route, "serialization"):
+        return jsonify(classifier.interpret(probabilities, serving[1]["class_names"]))
 
 
-if __name__ == "__main__":
-    clApp = ClientApp()
+@app.route("/predict_batch", methods=['POST'])
+@cross_origin()
+def predictBatchRoute():
+    """
+    Receives a list of Base64 images ({"images": [...]}) and returns one
+    result per image, with the predicted class and all class probabilities.
+    Meant for bulk jobs (e.g., every slice of a study) rather than the dashboard.
+    """
+    classifier = clApp.ensure_ready()
+    route = "/predict_batch"
+    # 1. Decode every Base64 payload into raw bytes (in memory)
+    try:
+        images = request.json['images']
+        if not isinstance(images, list):
+            raise TypeError("'images' must be a list of Base64 strings")
+        with metrics.phase(route, "base64_decode"):
+            images_bytes = [decodeImageBytes(image) for image in images]
+    except (KeyError, TypeError, ValueError) as e:
+        # No 'images' key, not a list of strings, or invalid Base64 (binascii.Error is a ValueError)
+        return jsonify({"error": f"Invalid request: {e}"}), 400
+
+    # 2. Look every image up in the cache; only the misses go to the model
+    # (the version is read once and used for the lookup, the model calls, the labels and the cache writes)
+    version, state = clApp.serving_state()
+    class_names = state["class_names"]
+    cache = clApp.prediction_cache
+    if cache is not None:
+        with metrics.phase(route, "cache_lookup"):
+            keys = [cache.key(image_bytes, version) for image_bytes in images_bytes]
+            cached = [cache.get(key) for key in keys]
+        missing = [i for i, probabilities in enumerate(cached) if probabilities is None]
+    else:
+        cached = [None] * len(images_bytes)
+        missing = list(range(len(images_bytes)))
+
+    # 3. Decode/resize the misses in parallel and run the model chunk by chunk
+    # (decoding overlaps the model calls here, so it is one 'model' phase; the
+    # forward passes alone show up in kidney_model_forward_seconds)
+    with metrics.phase(route, "model"):
+        if clApp.worker_pool is not None:
+            # Spread over the worker processes, which decode and batch on their own
+            try:
+                rows = clApp.worker_pool.predict_many([images_bytes[i] for i in missing])
+            except (queue.Full, TimeoutError):
+                return jsonify({"error": "Server busy, please retry"}), 503
+            except ValueError as e:
+                return jsonify({"error": f"Invalid image: {e}"}), 400
+            except RuntimeError as e:
+                logging.error(f"Worker pool failed: {e}")
+                return jsonify({"error": "Inference unavailable, please retry"}), 503
+            computed = classifier.interpret_many(np.stack(rows), class_names) if rows else []
+        else:
+            computed = classifier.predict_many(
+                [images_bytes[i] for i in missing],
+                chunk_size=clApp.config.bulk_chunk_size,
+                workers=clApp.config.bulk_decode_workers,
+                predict_fn=lambda batch: clApp.forward(batch, state),
+                class_names=class_names
+            )
+    results = [None] * len(images_bytes)
+    cacheable = cache is not None and clApp.serving_version == version
+    for i, result in zip(missing, computed):
+        results[i] = result
+        if cacheable:
+            cache.put(keys[i], [result["probabilities"][name] for name in class_names])
+    if len(missing) < len(images_bytes):
+        hits = [i for i in range(len(images_bytes)) if cached[i] is not None]
+        for i, result in zip(hits, classifier.interpret_many(np.stack([cached[i] for i in hits]), class_names)):
+            results[i] = result
+
+    # 4. Send the per-image results back as JSON
+    with metrics.phase(route, "serialization"):
+        return jsonify(results)
+
+
+# Model files /admin/model/reload may load: only files inside these folders
+MODEL_SUFFIXES = (".h5", ".keras", ".tflite")
 
+
+def adminOnly(route):
+    """
+    Guards the /admin routes: with the ADMIN_TOKEN environment variable set, the
+    caller must send it ('Authorization: Bearer <token>'); without it, only
+    requests from this machine (localhost) are accepted.
+    """
+    @functools.wraps(route)
+    def guarded(*args, **kwargs):
+        token = os.environ.get("ADMIN_TOKEN")
+        if token:
+            sent = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+            if not hmac.compare_digest(sent.encode(), token.encode()):
+                return jsonify({"error": "Unauthorized"}), 401
+        elif request.remote_addr not in ("127.0.0.1", "::1"):
+            return jsonify({"error": "Admin routes are only served to localhost (set ADMIN_TOKEN)"}), 403
+        return route(*args, **kwargs)
+    return guarded
+
+
+def allowedModelPath(path):
+    """
+    Resolves a requested model path; returns None unless it is a model file inside
+    the folder of the served model or of the watched training output.
+    """
+    resolved = Path(path).resolve()
+    allowed_dirs = {Path(clApp.config.model_path).resolve().parent, Path(clApp.config.watch_path).resolve().parent}
+    if resolved.suffix not in MODEL_SUFFIXES or resolved.parent not in allowed_dirs or not resolved.is_file():
+        return None
+    return resolved
+
+
+@app.route("/admin/model", methods=['GET'])
+@adminOnly
+def modelInfoRoute():
+    """
+    Shows which model version is being served (and which one a rollback would restore).
+    """
+    classifier = clApp.ensure_ready()
+    return jsonify(classifier.model_info())
+
+
+@app.route("/admin/model/reload", methods=['POST'])
+@adminOnly
+def modelReloadRoute():
+    """
+    Loads a model ({"path": ...}, defaults to the watched training output), warms it
+    up and swaps it in. The current model keeps serving if anything goes wrong.
+    Only model files next to the served model or the watched output can be loaded.
+    """
+    classifier = clApp.ensure_ready()
+    payload = request.get_json(silent=True) or {}
+    path = allowedModelPath(payload.get("path", str(clApp.config.watch_path)))
+    if path is None:
+        return jsonify({"error": "Not an allowed model file"}), 400
+    try:
+        classifier.reload_model(path)
+    except Exception as e:
+        # Details stay in the log: the response must not describe the filesystem
+        logging.error(f"Model reload from {path} failed: {e}")
+        return jsonify({"error": "The model could not be loaded"}), 400
+    return jsonify(classifier.model_info())
+
+
+@app.route("/admin/model/rollback", methods=['POST'])
+@adminOnly
+def modelRollbackRoute():
+    """
+    Instantly switches back to the previously served model.
+    """
+    classifier = clApp.ensure_ready()
+    try:
+        classifier.rollback_model()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 409
+    except RuntimeError as e:
+        # The worker pool could not start on the previous model; it keeps the current one
+        logging.error(f"Model rollback failed: {e}")
+        return jsonify({"error": "The previous model could not be loaded"}), 503
+    return jsonify(classifier.model_info())
+
+
+@app.route("/stats", methods=['GET'])
+@cross_origin()
+def statsRoute():
+    """
+    Exposes serving statistics (batch-size distribution, queue wait percentiles,
+    prediction cache hits/misses, worker pool load) used to tune the serving settings in config.yaml.
+    """
+    stats = {}
+    if clApp.batcher is not None:
+        stats["batching"] = clApp.batcher.stats.snapshot()
+    if clApp.prediction_cache is not None:
+        stats["prediction_cache"] = clApp.prediction_cache.snapshot()
+    if clApp.worker_pool is not None:
+        stats["worker_pool"] = clApp.worker_pool.snapshot()
+    return jsonify(stats)
+
+
+@app.route("/metrics", methods=['GET'])
+def metricsRoute():
+    """
+    Prometheus metrics: request counts, latency histograms (total and per phase),
+    in-flight requests and the served model version (see pipeline/metrics.py).
+    """
+    body, content_type = metrics.render()
+    return Response(body, content_type=content_type)
+
+
+# Worker pool processes are spawned: they re-import this module as '__mp_main__'
+# (when it is run as a script) and must not build a ClientApp of their own.
+# Under gunicorn ('gunicorn app:app') or 'python app.py' this runs once per server process.
+if __name__ != "__mp_main__":
+    app = create_app()
+
+
+if __name__ == "__main__":
     app.run(host='0.0.0.0', port=8080) #for AWS
\ No newline at end of file
@@ -0,0 +1,373 @@
+"""
+ASYNC SERVING ENTRY POINT
+-------------------------
+Asyncio (ASGI) alternative to the Flask app in app.py, with the same '/',
+'/predict' and '/train' routes, the same JSON responses and the same
+templates/index.html:
+
+    uvicorn asgi_app:app --host 0.0.0.0 --port 8080
+    (or: python asgi_app.py)
+
+- Request I/O (reading a slow upload, sending the response) happens on the
+  event loop, so a slow client never holds a thread.
+- Decoding and the model call run on a dedicated InferenceExecutor with a
+  bounded number of threads and a bounded wait queue. When the queue is full
+  the request is answered with HTTP 429 right away.
+- The model is served by the same PredictionPipeline (with hot reload and
+  the prediction cache), and /train queues jobs on the same TrainingJobManager.
+  The micro-batcher is not used here: the executor bounds concurrency instead.
+"""
+
+import os
+import json
+import time
+import queue
+import uuid
+import contextlib
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+from starlette.routing import Route, Match
+from starlette.templating import Jinja2Templates
+from Classifier.utils.common import decodeImageBytes
+from Classifier.pipeline.prediction_cache import PredictionCache
+from Classifier.pipeline.inference_executor import InferenceExecutor
+from Classifier.pipeline.serving import classify_image
+from Classifier.pipeline.training_jobs import TrainingJobManager
+from Classifier.pipeline.model_watcher import ModelWatcher
+from Classifier.pipeline import metrics
+from Classifier.config.configuration import ConfigurationManager
+from src.logger import logging, set_request_id, reset_request_id
+
+
+templates = Jinja2Templates(directory=os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates"))
+
+
+class AsyncClientApp:
+    """
+    Everything the async server needs: the model, the inference executor,
+    the prediction cache, the model watcher and the training job runner.
+    """
+    def __init__(self):
+        config_manager = ConfigurationManager()
+        self.config = config_manager.get_prediction_config()
+        self.training_jobs = TrainingJobManager(config_manager.get_training_jobs_config())
+        self.executor = InferenceExecutor(
+            max_workers=self.config.inference_workers, max_pending=self.config.max_pending_inferences
+        )
+        self.classifier = None
+        self.prediction_cache = None
+        self.model_watcher = None
+        # Not used here (the executor bounds concurrency), but classify_image checks them
+        self.batcher = None
+        self.worker_pool = None
+
+    def load_model(self):
+        """
+        Loads and warms up the model, then starts the services depending on it (blocking: run it off the loop).
+        """
+        from Classifier.pipeline.prediction import PredictionPipeline
+
+        start = time.perf_counter()
+        classifier = PredictionPipeline(
+            "inputImage.jpg",
+            model_path=self.config.model_path,
+            image_size=self.config.params_image_size[:-1],
+            tflite_threads=self.config.tflite_threads
+        )
+        classifier.warm_up()
+        self.forward = metrics.timed_forward(classifier.predict_proba, lambda: classifier.model_version)
+
+        if self.config.cache_enabled:
+            self.prediction_cache = PredictionCache(
+                max_entries=self.config.cache_max_entries, disk_dir=self.config.cache_disk_dir,
+                disk_max_age_days=self.config.cache_disk_max_age_days
+            )
+            self.prediction_cache.prune_disk(keep_version=classifier.model_version)
+            classifier.on_model_swap.append(self.prediction_cache.invalidate)
+        metrics.set_model_version(classifier.model_version)
+        classifier.on_model_swap.append(metrics.set_model_version)
+        if self.config.hot_reload_enabled:
+            self.model_watcher = ModelWatcher(
+                classifier, self.config.watch_path, self.config.poll_seconds
+            ).start()
+
+        self.classifier = classifier
+        logging.info(f"Model ready in {time.perf_counter() - start:.2f}s (async server)")
+
+    def serving_state(self):
+        """
+        (version, model state) of the served model, read together (see app.py).
+        """
+        state = self.classifier.state
+        return state["version"], state
+
+    def predict(self, payload, is_json: bool) -> list:
+        """
+        Inference job (runs on an executor thread): JSON/Base64 decode, then the
+        same cache lookup and model call as app.py (see pipeline/serving.py).
+
+        Args:
+            payload (bytes | bytearray): The request body (JSON) or the encoded image.
+            is_json (bool): Whether 'payload' is a JSON body with a Base64 'image'.
+        """
+        route = "/predict"
+        if is_json:
+            with metrics.phase(route, "base64_decode"):
+                payload = decodeImageBytes(json.loads(payload)["image"])
+        serving = self.serving_state()
+        probabilities = classify_image(self, payload, route, serving)
+        # Labels of the model that produced the probabilities, not of one swapped in meanwhile
+        return self.classifier.interpret(probabilities, serving[1]["class_names"])
+
+    def shutdown(self):
+        if self.model_watcher is not None:
+            self.model_watcher.stop()
+        self.executor.shutdown()
+
+
+clApp = AsyncClientApp()
+
+
+class BodyTooLarge(Exception):
+    """
+    The client sent more than the upload limit.
+    """
+
+
+def limitedRequest(request, limit: int) -> Request:
+    """
+    The same request, with a receive channel that raises BodyTooLarge once more
+    than 'limit' body bytes arrived. Unlike the Content-Length check, this also
+    stops chunked bodies, and it covers file parts, which the multipart parser's
+    own 'max_part_size' does not.
+    """
+    received = 0
+
+    async def receive():
+        nonlocal received
+        message = await request.receive()
+        if message["type"] == "http.request":
+            received += len(message.get("body", b""))
+            if received > limit:
+                raise BodyTooLarge
+        return message
+
+    return Request(request.scope, receive)
+
+
+async def readBody(request, limit: int) -> bytearray:
+    """
+    Reads the request body on the event loop, chunk by chunk as the client sends it.
+    Returns None when the body is larger than 'limit' bytes.
+    """
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > limit:
+            return None
+    return body
+
+
+async def home(request):
+    """
+    Renders the main dashboard of the web application.
+    """
+    return templates.TemplateResponse(request, "index.html")
+
+
+async def healthRoute(request):
+    """
+    Liveness probe: the process is up and answering HTTP.
+    """
+    return JSONResponse({"status": "ok"})
+
+
+async def readyRoute(request):
+    """
+    Readiness probe: only healthy once the model is loaded and warmed up.
+    """
+    if clApp.classifier is None:
+        return JSONResponse({"ready": False}, status_code=503)
+    return JSONResponse({"ready": True, "model_version": clApp.classifier.model_version})
+
+
+async def trainRoute(request):
+    """
+    Queues a background training run (see app.py) and returns its id right away.
+    """
+    job = await run_in_threadpool(clApp.training_jobs.submit)
+    return JSONResponse(job.to_dict(), status_code=202)
+
+
+async def trainStatusRoute(request):
+    """
+    Returns the status of a training job (queued, running, succeeded, failed, cancelled).
+    """
+    job = clApp.training_jobs.get(request.path_params["job_id"])
+    if job is None:
+        return JSONResponse({"error": f"Unknown job: {request.path_params['job_id']}"}, status_code=404)
+    return JSONResponse(job.to_dict())
+
+
+async def trainLogRoute(request):
+    """
+    Returns the last lines of a training job's log (?lines=100).
+    """
+    job_id = request.path_params["job_id"]
+    if clApp.training_jobs.get(job_id) is None:
+        return JSONResponse({"error": f"Unknown job: {job_id}"}, status_code=404)
+    try:
+        lines = int(request.query_params.get("lines", 100))
+    except ValueError:
+        lines = 100                     # Same fallback as Flask's 'type=int
+    return PlainTextResponse(await run_in_threadpool(clApp.training_jobs.tail, job_id, lines))
+
+
+async def trainCancelRoute(request):
+    """
+    Cancels a queued or running training job.
+    """
+    job_id = request.path_params["job_id"]
+    if not await run_in_threadpool(clApp.training_jobs.cancel, job_id):
+        return JSONResponse({"error": f"Job {job_id} is unknown or already finished"}, status_code=409)
+    return JSONResponse(clApp.training_jobs.get(job_id).to_dict())
+
+
+async def predictRoute(request):
+    """
+    Same contract as /predict in app.py: JSON {"image": "<Base64>"}, a raw body
+    (application/octet-stream, image/*) or multipart/form-data ('image' field).
+
+    The body is read on the event loop; everything CPU-bound (JSON and Base64
+    decode, image decode/resize, model) runs on the inference executor.
+    """
+    if clApp.classifier is None:
+        return JSONResponse({"error": "Model is still loading"}, status_code=503)
+
+    limit = clApp.config.max_upload_bytes
+    try:
+        content_length = int(request.headers.get("content-length") or 0)
+    except ValueError:
+        return JSONResponse({"error": "Invalid Content-Length header"}, status_code=400)
+    if content_length > limit:
+        return JSONResponse({"error": "Request body too large"}, status_code=413)
+
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    with metrics.phase("/predict", "body_read"):
+        if content_type == "multipart/form-data":
+            try:
+                # The form (and its spooled files) is closed when the block ends
+                async with limitedRequest(request, limit).form(max_part_size=limit) as form:
+                    upload = form.get("image")
+                    body = await upload.read() if hasattr(upload, "read") else None
+            except BodyTooLarge:
+                return JSONResponse({"error": "Request body too large"}, status_code=413)
+        else:
+            body = await readBody(request, limit)
+            if body is None:
+                return JSONResponse({"error": "Request body too large"}, status_code=413)
+    if not body:
+        return JSONResponse({"error": "No image in the request body"}, status_code=400)
+
+    try:
+        result = await clApp.executor.run(clApp.predict, body, content_type == "application/json")
+    except queue.Full:
+        return JSONResponse({"error": "Server busy, please retry"}, status_code=429, headers={"Retry-After": "1"})
+    except (ValueError, KeyError, TypeError) as e:
+        # Invalid JSON or Base64, no 'image' key, or an undecodable image
+        return JSONResponse({"error": f"Invalid request: {e}"}, status_code=400)
+
+    with metrics.phase("/predict", "serialization"):
+        return JSONResponse(result)
+
+
+async def statsRoute(request):
+    """
+    Inference executor and prediction cache statistics.
+    """
+    stats = {"inference_executor": clApp.executor.snapshot()}
+    if clApp.prediction_cache is not None:
+        stats["prediction_cache"] = clApp.prediction_cache.snapshot()
+    return JSONResponse(stats)
+
+
+async def metricsRoute(request):
+    """
+    Prometheus metrics (see pipeline/metrics.py).
+    """
+    body, content_type = metrics.render()
+    return Response(body, headers={"Content-Type": content_type})
+
+
+routes = [
+    Route("/", home, methods=["GET"]),
+    Route("/health", healthRoute, methods=["GET"]),
+    Route("/ready", readyRoute, methods=["GET"]),
+    Route("/train", trainRoute, methods=["GET", "POST"]),
+    Route("/train/{job_id}", trainStatusRoute, methods=["GET"]),
+    Route("/train/{job_id}/log", trainLogRoute, methods=["GET"]),
+    Route("/train/{job_id}/cancel", trainCancelRoute, methods=["POST"]),
+    Route("/predict", predictRoute, methods=["POST"]),
+    Route("/stats", statsRoute, methods=["GET"]),
+    Route("/metrics", metricsRoute, methods=["GET"]),
+]
+
+
+def routeTemplate(scope) -> str:
+    """
+    Route pattern of a request (e.g., '/train/{job_id}'), so metric labels stay bounded.
+    """
+    for route in routes:
+        match, _ = route.matches(scope)
+        if match != Match.NONE:
+            return route.path
+    return "unmatched"
+
+
+async def requestContext(request, call_next):
+    """
+    Request id (log lines and X-Request-ID header) and request metrics, as in app.py.
+    """
+    request_id = request.headers.get("x-request-id") or uuid.uuid4().hex
+    token = set_request_id(request_id)
+    route = routeTemplate(request.scope)
+    start = time.perf_counter()
+    metrics.request_started(route)
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        response.headers["X-Request-ID"] = request_id
+        return response
+    finally:
+        metrics.request_finished(route, request.method, status, time.perf_counter() - start)
+        reset_request_id(token)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    # Loading the model blocks for seconds: keep it off the event loop
+    await run_in_threadpool(clApp.load_model)
+    yield
+    await run_in_threadpool(clApp.shutdown)
+
+
+app = Starlette(
+    routes=routes,
+    middleware=[
+        Middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"]),
+        Middleware(BaseHTTPMiddleware, dispatch=requestContext),
+    ],
+    lifespan=lifespan,
+)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host="0.0.0.0", port=8080)
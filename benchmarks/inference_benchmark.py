@@ -0,0 +1,298 @@
+"""
+INFERENCE BENCHMARK
+-------------------
+Measures what the prediction path costs, piece by piece, so changes to the
+serving code can be compared between commits.
+
+Sections (each one can be skipped):
+1. cold_start : fresh Python process -> import TensorFlow, load the model, first prediction.
+2. decode     : base64 decoding and image decode + resize, timed separately.
+3. latency    : single-image latency percentiles (model call only, and the full 'predict' path).
+4. throughput : images/sec of 'predict_proba' for batch sizes 1..64.
+5. http       : end-to-end load against a running app (POST /predict) at several concurrency levels.
+
+By default everything runs offline against a small synthetic Keras model with
+the same input shape as the real one; pass --model to benchmark a real .h5 or
+.tflite file. Results are written as JSON (with the git commit they were taken at).
+
+Usage:
+    python benchmarks/inference_benchmark.py
+    python benchmarks/inference_benchmark.py --model model/model.h5 --skip cold_start
+    python app.py &   # then
+    python benchmarks/inference_benchmark.py --url http://localhost:8080/predict --concurrency 1,8,32
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import base64
+import argparse
+import platform
+import tempfile
+import subprocess
+import urllib.error
+import urllib.request
+import numpy as np
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT_DIR))
+
+SECTIONS = ("cold_start", "decode", "latency", "throughput", "http")
+
+
+def summarize(samples_ms: list) -> dict:
+    """
+    Mean and percentiles (in milliseconds) of a list of timings.
+    """
+    samples = np.asarray(samples_ms, dtype="float64")
+    return {
+        "count": int(samples.size),
+        "mean_ms": round(float(samples.mean()), 3),
+        "p50_ms": round(float(np.percentile(samples, 50)), 3),
+        "p90_ms": round(float(np.percentile(samples, 90)), 3),
+        "p99_ms": round(float(np.percentile(samples, 99)), 3),
+        "max_ms": round(float(samples.max()), 3),
+    }
+
+
+def timed(fn, iterations: int, warmup: int = 3) -> list:
+    """
+    Calls 'fn' 'warmup' times untimed, then returns 'iterations' timings in milliseconds.
+    """
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def build_synthetic_model(path: Path, image_size: int, classes: int = 2):
+    """
+    Saves a tiny softmax classifier with the production input/output shapes.
+    """
+    import tensorflow as tf
+
+    model = tf.keras.Sequential([
+        tf.keras.Input(shape=(image_size, image_size, 3)),
+        tf.keras.layers.Conv2D(8, 3, strides=2, activation="relu"),
+        tf.keras.layers.Conv2D(16, 3, strides=2, activation="relu"),
+        tf.keras.layers.GlobalAveragePooling2D(),
+        tf.keras.layers.Dense(classes, activation="softmax"),
+    ])
+    model.save(path)
+
+
+def sample_image_bytes(image_path: str = None, size: int = 512) -> bytes:
+    """
+    Encoded JPEG used for every request: 'image_path' if given, else random noise.
+    """
+    if image_path:
+        with open(image_path, "rb") as f:
+            return f.read()
+    from PIL import Image
+
+    rng = np.random.default_rng(0)
+    buffer = io.BytesIO()
+    Image.fromarray(rng.integers(0, 256, size=(size, size, 3), dtype=np.uint8)).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def bench_cold_start(model_path: Path, image_size: int, runs: int) -> dict:
+    """
+    Starts fresh interpreters that import the pipeline, load the model and predict once.
+    """
+    script = (
+        "import sys, time, json\n"
+        "start = time.perf_counter()\n"
+        f"sys.path.append({str(ROOT_DIR)!r})\n"
+        "import numpy as np\n"
+        "from src.Classifier.pipeline.prediction import PredictionPipeline\n"
+        "imported = time.perf_counter()\n"
+        f"pipeline = PredictionPipeline(model_path={str(model_path)!r}, image_size=({image_size}, {image_size}))\n"
+        "loaded = time.perf_counter()\n"
+        f"pipeline.predict_proba(np.zeros((1, {image_size}, {image_size}, 3), dtype='float32'))\n"
+        "done = time.perf_counter()\n"
+        "print(json.dumps({'import_s': imported - start, 'load_s': loaded - imported, 'first_predict_s': done - loaded}))\n"
+    )
+    results = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+        phases = json.loads(output.stdout.strip().splitlines()[-1])
+        phases["process_total_s"] = time.perf_counter() - start
+        results.append(phases)
+    summary = {key: round(float(np.median([r[key] for r in results])), 3) for key in results[0]}
+    summary["runs"] = runs
+    return summary
+
+
+def bench_decode(pipeline, image_bytes: bytes, iterations: int) -> dict:
+    """
+    Splits request preprocessing into base64 decoding and image decode + resize.
+    """
+    from src.Classifier.utils.common import decodeImageBytes
+
+    encoded = base64.b64encode(image_bytes).decode("ascii")
+    return {
+        "payload_bytes": len(encoded),
+        "base64_decode": summarize(timed(lambda: decodeImageBytes(encoded), iterations)),
+        "decode_resize": summarize(timed(lambda: pipeline.load_image(image_bytes), iterations)),
+    }
+
+
+def bench_latency(pipeline, image_bytes: bytes, image_size: int, iterations: int) -> dict:
+    """
+    Single-image latency: model call alone, and bytes -> result through 'predict'.
+    """
+    tensor = np.zeros((1, image_size, image_size, 3), dtype="float32")
+    return {
+        "model_call": summarize(timed(lambda: pipeline.predict_proba(tensor), iterations)),
+        "predict_end_to_end": summarize(timed(lambda: pipeline.predict(image_bytes), iterations)),
+    }
+
+
+def bench_throughput(pipeline, image_size: int, batch_sizes: list, iterations: int) -> list:
+    """
+    Images/sec of the model alone for every batch size.
+    """
+    results = []
+    for batch_size in batch_sizes:
+        batch = np.random.default_rng(0).random((batch_size, image_size, image_size, 3), dtype="float32") * 255
+        stats = summarize(timed(lambda: pipeline.predict_proba(batch), iterations))
+        stats["batch_size"] = batch_size
+        stats["images_per_sec"] = round(batch_size * 1000 / stats["mean_ms"], 1)
+        results.append(stats)
+    return results
+
+
+def bench_http(url: str, image_bytes: bytes, concurrency_levels: list, requests_per_level: int, timeout: float) -> list:
+    """
+    Sends 'requests_per_level' POST /predict requests with 'concurrency' clients at a time.
+    """
+    body = json.dumps({"image": base64.b64encode(image_bytes).decode("ascii")}).encode()
+
+    def send(_):
+        request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            status = e.code
+        except Exception:
+            status = None
+        return status, (time.perf_counter() - start) * 1000
+
+    results = []
+    for concurrency in concurrency_levels:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(send, range(concurrency)))          # Warm-up, not recorded
+            start = time.perf_counter()
+            responses = list(pool.map(send, range(requests_per_level)))
+            elapsed = time.perf_counter() - start
+
+        ok = [latency for status, latency in responses if status == 200]
+        stats = summarize(ok) if ok else {"count": 0}
+        stats.update({
+            "concurrency": concurrency,
+            "requests": requests_per_level,
+            "errors": requests_per_level - len(ok),
+            "requests_per_sec": round(len(ok) / elapsed, 1),
+        })
+        results.append(stats)
+    return results
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    import tensorflow as tf
+
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "tensorflow": tf.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the prediction path.")
+    parser.add_argument("--model", help="Model to benchmark (.h5 or .tflite); default: synthetic tiny model")
+    parser.add_argument("--image", help="Image file sent in every request; default: random 512x512 JPEG")
+    parser.add_argument("--image-size", type=int, default=224, help="Model input height/width")
+    parser.add_argument("--iterations", type=int, default=100, help="Timed calls per measurement")
+    parser.add_argument("--batch-sizes", default="1,2,4,8,16,32,64")
+    parser.add_argument("--cold-start-runs", type=int, default=3)
+    parser.add_argument("--url", help="e.g. http://localhost:8080/predict; the http section runs only when given")
+    parser.add_argument("--concurrency", default="1,4,16")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per concurrency level")
+    parser.add_argument("--timeout", type=float, default=30.0, help="HTTP timeout in seconds")
+    parser.add_argument("--skip", default="", help=f"Comma-separated sections to skip: {', '.join(SECTIONS)}")
+    parser.add_argument("--output", default=None, help="JSON file; default: benchmarks/results/inference_<commit>_<time>.json")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    skip = {s.strip() for s in args.skip.split(",") if s.strip()}
+    batch_sizes = [int(b) for b in args.batch_sizes.split(",")]
+    image_bytes = sample_image_bytes(args.image)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model_path = Path(args.model) if args.model else Path(tmp_dir) / "synthetic_model.h5"
+        if not args.model:
+            build_synthetic_model(model_path, args.image_size)
+
+        report = {"environment": environment(), "model": str(args.model or "synthetic"),
+                  "image_size": args.image_size, "iterations": args.iterations}
+
+        if "cold_start" not in skip:
+            print("Measuring cold start...")
+            report["cold_start"] = bench_cold_start(model_path, args.image_size, args.cold_start_runs)
+
+        if not {"decode", "latency", "throughput"} <= skip:
+            from src.Classifier.pipeline.prediction import PredictionPipeline
+
+            pipeline = PredictionPipeline(model_path=model_path, image_size=(args.image_size, args.image_size))
+            pipeline.warm_up()
+            if "decode" not in skip:
+                print("Measuring decode / resize...")
+                report["decode"] = bench_decode(pipeline, image_bytes, args.iterations)
+            if "latency" not in skip:
+                print("Measuring single-image latency...")
+                report["latency"] = bench_latency(pipeline, image_bytes, args.image_size, args.iterations)
+            if "throughput" not in skip:
+                print("Measuring batch throughput...")
+                report["throughput"] = bench_throughput(pipeline, args.image_size, batch_sizes, args.iterations)
+
+    if args.url and "http" not in skip:
+        print(f"Load testing {args.url}...")
+        concurrency_levels = [int(c) for c in args.concurrency.split(",")]
+        report["http"] = bench_http(args.url, image_bytes, concurrency_levels, args.requests, args.timeout)
+
+    output = Path(args.output) if args.output else (
+        ROOT_DIR / "benchmarks" / "results" /
+        f"inference_{report['environment']['commit'] or 'nogit'}_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=4)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
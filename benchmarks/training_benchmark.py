@@ -0,0 +1,150 @@
+"""
+TRAINING STEP BENCHMARK
+-----------------------
+Runs the stage 03 profiling mode ('Training.profile') on a small synthetic
+dataset, once per input pipeline, so the data-wait / compute split can be
+compared on any machine, CPU-only included, without downloading the real data.
+
+The synthetic dataset has the same layout as the real one (one folder of JPEGs
+per class) and the model is the usual VGG16 + dense head, built with random
+weights (no ImageNet download) at a configurable, smaller, resolution.
+
+Usage:
+    python benchmarks/training_benchmark.py
+    python benchmarks/training_benchmark.py --pipelines generator,tf_data,shards --image-size 224 --steps 40
+    python benchmarks/training_benchmark.py --trace 10,15     # + TensorFlow profiler trace
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import dataclasses
+import numpy as np
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT_DIR))
+
+import tensorflow as tf
+from PIL import Image
+from src.Classifier.config.configuration import ConfigurationManager
+from src.Classifier.entity.config_entity import DataShardingConfig
+from src.Classifier.components.data_sharding import DataSharding
+from src.Classifier.components.prepare_base_model import PrepareBaseModel
+from src.Classifier.components.training import Training
+
+
+def make_dataset(root: Path, images_per_class: int, source_size: int, classes=("Normal", "Tumor")):
+    """
+    Writes random grayscale-looking JPEGs (like CT slices) in one folder per class.
+    """
+    rng = np.random.default_rng(0)
+    for name in classes:
+        os.makedirs(root / name, exist_ok=True)
+        for i in range(images_per_class):
+            pixels = rng.integers(0, 256, size=(source_size, source_size), dtype=np.uint8)
+            Image.fromarray(pixels).convert("RGB").save(root / name / f"{i:05d}.jpg", quality=90)
+
+
+def make_model(path: Path, image_size: int, classes: int, learning_rate: float):
+    """
+    VGG16 (random weights, frozen) + the project's classification head, saved like stage 02 does.
+    """
+    base = tf.keras.applications.vgg16.VGG16(input_shape=(image_size, image_size, 3), weights=None, include_top=False)
+    model = PrepareBaseModel._prepare_full_model(
+        model=base, classes=classes, freeze_all=True, freeze_till=None, learning_rate=learning_rate
+    )
+    model.save(path)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Profile training steps on a synthetic dataset.")
+    parser.add_argument("--pipelines", default="generator,tf_data,shards", help="INPUT_PIPELINE values to compare")
+    parser.add_argument("--images-per-class", type=int, default=128)
+    parser.add_argument("--source-size", type=int, default=512, help="Size of the synthetic JPEGs")
+    parser.add_argument("--image-size", type=int, default=96, help="Model input size (224 for production)")
+    parser.add_argument("--batch-size", type=int, default=None, help="Default: BATCH_SIZE from params.yaml")
+    parser.add_argument("--steps", type=int, default=20, help="Profiled steps per pipeline")
+    parser.add_argument("--augmentation", choices=["on", "off"], default=None, help="Default: AUGMENTATION from params.yaml")
+    parser.add_argument("--trace", default="", help="'first,last' steps to capture a profiler trace for")
+    parser.add_argument("--output", default=None, help="JSON file; default: benchmarks/results/training_<time>.json")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.output:
+        args.output = os.path.abspath(args.output)     # Relative to where the script was started
+    os.chdir(ROOT_DIR)   # ConfigurationManager reads config/config.yaml and params.yaml relative to the repo
+    pipelines = [p.strip() for p in args.pipelines.split(",") if p.strip()]
+    trace_steps = [int(s) for s in args.trace.split(",")] if args.trace else []
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        data_dir = tmp / "kidney-ct-scan-image"
+        print(f"Writing {2 * args.images_per_class} synthetic images...")
+        make_dataset(data_dir, args.images_per_class, args.source_size)
+
+        base_config = ConfigurationManager().get_training_config()
+        image_size = [args.image_size, args.image_size, 3]
+        model_path = tmp / "base_model_updated.h5"
+        make_model(model_path, args.image_size, classes=2, learning_rate=base_config.params_learning_rate)
+
+        shard_index = tmp / "shards" / "index.json"
+        if "shards" in pipelines:
+            DataSharding(DataShardingConfig(
+                root_dir=tmp / "shards", index_file=shard_index, source_data=data_dir,
+                images_per_shard=256, num_workers=os.cpu_count() or 4,
+                params_validation_split=base_config.params_validation_split, params_image_size=image_size,
+                params_input_pipeline="shards"
+            )).create_shards()
+
+        for pipeline in pipelines:
+            config = dataclasses.replace(
+                base_config,
+                root_dir=tmp,
+                updated_base_model_path=model_path,
+                training_data=data_dir,
+                params_image_size=image_size,
+                params_batch_size=args.batch_size or base_config.params_batch_size,
+                params_is_augmentation=(args.augmentation == "on") if args.augmentation else base_config.params_is_augmentation,
+                params_input_pipeline=pipeline,
+                params_validation_cache="none",
+                shard_index_file=shard_index,
+                profile_report_path=tmp / f"profile_{pipeline}.json",
+                profile_trace_dir=ROOT_DIR / "benchmarks" / "results" / f"trace_{pipeline}",
+                params_profile_steps=args.steps,
+                params_profile_trace_steps=trace_steps,
+            )
+            print(f"Profiling input pipeline '{pipeline}'...")
+            training = Training(config=config)
+            training.get_base_model()
+            training.prepare_inputs()
+            results.append(training.profile())
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "tensorflow": tf.__version__,
+        "cpu_count": os.cpu_count(),
+        "gpus": len(tf.config.list_physical_devices("GPU")),
+        "image_size": args.image_size,
+        "images": 2 * args.images_per_class,
+        "results": results,
+    }
+    output = Path(args.output) if args.output else ROOT_DIR / "benchmarks" / "results" / f"training_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=4)
+
+    for r in results:
+        print(f"{r['input_pipeline']:>10}: {r['data_wait']['mean_ms']:8.1f} ms data wait, "
+              f"{r['compute']['mean_ms']:8.1f} ms compute, {r['images_per_sec']:7.1f} images/sec ({r['bound']}-bound)")
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
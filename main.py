@@ -2,6 +2,8 @@ from src.Classifier.pipeline.stage_01_data_ingestion import DataIngestionTrainin
 from src.Classifier.pipeline.stage_02_prepare_base_model import PrepareBaseModelTrainingPipeline
 from src.Classifier.pipeline.stage_03_training import ModelTrainingPipeline
 from src.Classifier.pipeline.stage_04_evaluation import EvaluationTrainingPipeline
+from src.Classifier.pipeline.stage_01b_data_sharding import DataShardingTrainingPipeline
+from src.Classifier.pipeline.stage_05_model_export import ModelExportTrainingPipeline
 from src.logger import logging
 
 """
@@ -12,9 +14,11 @@ It imports and executes each stage sequentially.
 
 Pipeline Flow:
 1. Data Ingestion: Download and extract dataset.
+1b. Data Sharding: Pack the resized images into a few large shard files (INPUT_PIPELINE: shards only).
 2. Prepare Base Model: Initialize VGG16 and add custom classification head.
 3. Training: Train the model on the kidney scan data.
 4. Evaluation: Validate performance and log results to MLflow.
+5. Model Export: Convert the trained model to SavedModel and (quantized) TFLite.
 """
 
 # ----------------- STAGE 1: Data Ingestion -----------------
@@ -38,6 +42,25 @@ except Exception as e:
         raise e
 
 
+# ----------------- STAGE 1b: Data Sharding -----------------
+# Runs right after ingestion: decodes and resizes every image once and packs them
+# into a few large shard files that training and evaluation can stream.
+# Only does work when INPUT_PIPELINE is 'shards'.
+STAGE_NAME = "Data Sharding"
+try:
+        logging.info(f"*******************")
+        logging.info(f">>>>>> stage {STAGE_NAME} started <<<<<<")
+
+        data_sharding_pipeline = DataShardingTrainingPipeline()
+        data_sharding_pipeline.main()
+
+        logging.info(f">>>>>> stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
+
+except Exception as e:
+        logging.exception(e)
+        raise e
+
+
 # ----------------- STAGE 2: Prepare Base Model -----------------
 # This stage involves initializing a pre-trained model (VGG16) and customizing it.
 STAGE_NAME = "Prepare base model"
@@ -98,4 +121,19 @@ except Exception as e:
         raise e
 
 
+# ----------------- STAGE 5: Model Export -----------------
+# Converts the trained model into lean inference formats and reports how much
+# size, latency and accuracy the quantized TFLite model trades against the .h5.
+STAGE_NAME = "Model Export"
+try:
+        logging.info("*******************")
+        logging.info(f">>>>>> stage {STAGE_NAME} started <<<<<<")
+
+        model_export_pipeline = ModelExportTrainingPipeline()
+        model_export_pipeline.main()
+
+        logging.info(f">>>>>> stage {STAGE_NAME} completed <<<<<<\n\n")
 
+except Exception as e:
+        logging.exception(e)
+        raise e
@@ -0,0 +1,164 @@
+import os
+import json
+import numpy as np
+import tensorflow as tf
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from src.Classifier.entity.config_entity import DataShardingConfig
+from src.Classifier.utils.common import list_image_files
+from src.logger import logging
+
+
+SUBSETS = ("training", "validation")
+
+
+class DataSharding:
+    """
+    Component for packing the dataset into a few large, pre-resized shard files.
+
+    Reading thousands of small JPEGs (and resizing every one of them again) in
+    every stage is slow on network storage, where opening a file costs more than
+    reading it. This component decodes and resizes every image once and writes:
+
+        <root_dir>/training_00000.npy          uint8 images, shape (n, 224, 224, 3)
+        <root_dir>/training_00000_labels.npy   int64 labels, shape (n,)
+        ...                                    (same for 'validation')
+        <root_dir>/index.json                  class names, image size and the shard list
+
+    The .npy files can be memory-mapped, so readers stream them without loading
+    the whole dataset in memory.
+    """
+    def __init__(self, config: DataShardingConfig):
+        """
+        Initializes the component with configuration.
+        """
+        self.config = config
+
+
+    def _load(self, path: str) -> np.ndarray:
+        """
+        Decodes and resizes one image exactly like flow_from_directory (bilinear), kept as uint8.
+        """
+        img = tf.keras.utils.load_img(
+            path, target_size=tuple(self.config.params_image_size[:-1]), interpolation="bilinear"
+        )
+        return np.asarray(img, dtype="uint8")
+
+
+    def _write_subset(self, subset: str, filepaths: list, labels: list, pool: ThreadPoolExecutor) -> dict:
+        shards = []
+        per_shard = self.config.images_per_shard
+        image_shape = tuple(self.config.params_image_size[:-1]) + (3,)
+
+        for shard_id, start in enumerate(range(0, len(filepaths), per_shard)):
+            files = filepaths[start:start + per_shard]
+            images_name = f"{subset}_{shard_id:05d}.npy"
+            labels_name = f"{subset}_{shard_id:05d}_labels.npy"
+
+            images = np.lib.format.open_memmap(
+                os.path.join(self.config.root_dir, images_name), mode="w+", dtype="uint8",
+                shape=(len(files),) + image_shape
+            )
+            for row, array in enumerate(pool.map(self._load, files)):
+                images[row] = array
+            images.flush()
+            del images
+
+            np.save(os.path.join(self.config.root_dir, labels_name), np.asarray(labels[start:start + per_shard], dtype="int64"))
+            shards.append({"images": images_name, "labels": labels_name, "count": len(files)})
+            logging.info(f"Wrote shard {images_name} ({len(files)} images)")
+
+        return {"count": len(filepaths), "shards": shards}
+
+
+    def create_shards(self):
+        """
+        Splits the dataset (same per-class split as the training generator) and writes the shards and index.
+
+        With another INPUT_PIPELINE nothing reads the shards, so only an index
+        without shards is written (the dvc output must still exist).
+        """
+        os.makedirs(self.config.root_dir, exist_ok=True)
+        if self.config.params_input_pipeline != "shards":
+            with open(self.config.index_file, "w") as f:
+                json.dump({"skipped": f"INPUT_PIPELINE is '{self.config.params_input_pipeline}'"}, f, indent=4)
+            logging.info(f"INPUT_PIPELINE is '{self.config.params_input_pipeline}': no shards written")
+            return
+
+        index = {
+            "image_size": list(self.config.params_image_size),
+            "validation_split": self.config.params_validation_split,
+            "subsets": {}
+        }
+
+        with ThreadPoolExecutor(max_workers=self.config.num_workers) as pool:
+            for subset in SUBSETS:
+                filepaths, labels, class_names = list_image_files(
+                    self.config.source_data, validation_split=self.config.params_validation_split, subset=subset
+                )
+                index["class_names"] = class_names
+                index["subsets"][subset] = self._write_subset(subset, filepaths, labels, pool)
+
+        with open(self.config.index_file, "w") as f:
+            json.dump(index, f, indent=4)
+        logging.info(f"Shard index saved at: {self.config.index_file}")
+
+
+class ShardReader:
+    """
+    Streams a subset of the sharded dataset as a tf.data pipeline.
+
+    Shards are opened as memory maps; each epoch visits the shards in random
+    order and shuffles the rows inside each shard, so reads stay large and
+    mostly sequential.
+    """
+    def __init__(self, index_file: Path):
+        """
+        Args:
+            index_file (Path): The 'index.json' written by DataSharding.
+        """
+        self.root_dir = Path(index_file).parent
+        with open(index_file) as f:
+            self.index = json.load(f)
+        self.class_names = self.index["class_names"]
+        self.class_indices = {name: i for i, name in enumerate(self.class_names)}
+
+
+    def count(self, subset: str) -> int:
+        return self.index["subsets"][subset]["count"]
+
+
+    def _batches(self, subset: str, batch_size: int, shuffle: bool):
+        shards = self.index["subsets"][subset]["shards"]
+        order = np.random.permutation(len(shards)) if shuffle else range(len(shards))
+        for shard_id in order:
+            shard = shards[shard_id]
+            images = np.load(self.root_dir / shard["images"], mmap_mode="r")
+            labels = np.load(self.root_dir / shard["labels"])
+            rows = np.random.permutation(shard["count"]) if shuffle else np.arange(shard["count"])
+            for start in range(0, len(rows), batch_size):
+                batch_rows = np.sort(rows[start:start + batch_size])
+                yield images[batch_rows], labels[batch_rows]
+
+
+    def dataset(self, subset: str, batch_size: int, shuffle: bool = False, repeat: bool = False) -> tf.data.Dataset:
+        """
+        Returns (images in [0, 1], one-hot labels) batches for 'training' or 'validation'.
+        """
+        height, width = self.index["image_size"][:2]
+        num_classes = len(self.class_names)
+
+        dataset = tf.data.Dataset.from_generator(
+            lambda: self._batches(subset, batch_size, shuffle),
+            output_signature=(
+                tf.TensorSpec(shape=(None, height, width, 3), dtype=tf.uint8),
+                tf.TensorSpec(shape=(None,), dtype=tf.int64),
+            )
+        )
+        dataset = dataset.map(
+            lambda x, y: (tf.cast(x, tf.float32) / 255.0, tf.one_hot(y, num_classes)),   # Same rescale as the generator
+            num_parallel_calls=tf.data.AUTOTUNE
+        )
+        if repeat:
+            dataset = dataset.repeat()
+        return dataset
@@ -1,16 +1,29 @@
+import os
+import json
+import hashlib
+import numpy as np
 import tensorflow as tf
 from pathlib import Path
 import mlflow
 import mlflow.keras
 from urllib.parse import urlparse
-from src.Classifier.utils.common import save_json
+from src.Classifier.utils.common import save_json, list_image_files
 from src.Classifier.entity.config_entity import EvaluationConfig
+from src.Classifier.components.data_sharding import ShardReader
+from src.logger import logging
 
 
 class Evaluation:
     """
     Component for evaluating the performance of the trained model.
-    Handles data generation for validation, model loading, scoring, and MLflow logging.
+
+    The model is run once over the validation split (the same VALIDATION_SPLIT per class the
+    training stage validated on) and the raw softmax outputs are saved as .npy
+    files in 'artifacts/evaluation'. Every metric (loss, accuracy, confusion
+    matrix, per-class precision/recall, ROC-AUC, calibration) is then computed
+    from those arrays with vectorized NumPy, so adding a metric never needs a
+    new pass over the images. The saved predictions are reused as long as the
+    model file and the validation file list (or validation shards) are unchanged.
     """
     def __init__(self, config: EvaluationConfig):
         """
@@ -18,33 +31,74 @@ class Evaluation:
         """
         self.config = config
 
-    
-    def _valid_generator(self):
+
+    def _valid_files(self):
         """
-        Setup the validation data generator.
-        (Internal method called during the evaluation process)
+        Validation images and labels, split exactly like the training stage.
         """
-        datagenerator_kwargs = dict(
-            rescale = 1./255,          # Scale pixel values [0-255] to [0-1]
-            validation_split=0.30      # Use 30% of data for validation if split isn't pre-defined
-        )
+        if self.config.params_input_pipeline == "shards":
+            reader = ShardReader(self.config.shard_index_file)
+            labels = np.concatenate([
+                np.load(reader.root_dir / shard["labels"])
+                for shard in reader.index["subsets"]["validation"]["shards"]
+            ])
+            return None, labels, reader.class_names
 
-        dataflow_kwargs = dict(
-            target_size=self.config.params_image_size[:-1], # Match model's input resolution
-            batch_size=self.config.params_batch_size,       # Number of images to process at once
-            interpolation="bilinear"
+        filepaths, labels, class_names = list_image_files(
+            self.config.training_data, validation_split=self.config.params_validation_split, subset="validation"
         )
+        return filepaths, np.asarray(labels, dtype="int64"), class_names
 
-        valid_datagenerator = tf.keras.preprocessing.image.ImageDataGenerator(
-            **datagenerator_kwargs
-        )
 
-        self.valid_generator = valid_datagenerator.flow_from_directory(
-            directory=self.config.training_data,
-            subset="validation",
-            shuffle=False,             # Keep images in order for evaluation reproducibility
-            **dataflow_kwargs
-        )
+    def _valid_dataset(self, filepaths: list) -> tf.data.Dataset:
+        """
+        Batched validation images (no shuffling, so rows line up with the labels).
+        """
+        if filepaths is None:
+            # Stream the pre-resized validation shards (written with the training split)
+            reader = ShardReader(self.config.shard_index_file)
+            return reader.dataset("validation", self.config.params_batch_size).map(lambda x, y: x)
+
+        image_size = tuple(self.config.params_image_size[:-1])
+
+        def load(path):
+            image = tf.io.decode_image(tf.io.read_file(path), channels=3, expand_animations=False)
+            image = tf.image.resize(image, image_size, method="bilinear")
+            return image / 255.0                      # Same rescale as the training pipelines
+
+        dataset = tf.data.Dataset.from_tensor_slices(filepaths)
+        dataset = dataset.map(load, num_parallel_calls=tf.data.AUTOTUNE)
+        return dataset.batch(self.config.params_batch_size).prefetch(tf.data.AUTOTUNE)
+
+
+    def _shard_files(self) -> list:
+        """
+        Shard index and validation image shards, whose content identifies the sharded validation set.
+        """
+        reader = ShardReader(self.config.shard_index_file)
+        shards = reader.index["subsets"]["validation"]["shards"]
+        return [Path(self.config.shard_index_file)] + [reader.root_dir / shard["images"] for shard in shards]
+
+
+    @staticmethod
+    def _fingerprint(model_path: Path, labels: np.ndarray, filepaths: list, data_files: list = ()) -> str:
+        """
+        Identifies one (model, validation set) pair: the saved predictions are only reused when it matches.
+
+        Args:
+            model_path (Path): The evaluated model (its content is hashed).
+            labels (np.ndarray): Validation labels.
+            filepaths (list): Validation image paths (None in shards mode).
+            data_files (list): Files whose content is hashed too (the shards, see '_shard_files').
+        """
+        sha = hashlib.sha256()
+        for path in [model_path, *data_files]:
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    sha.update(block)
+        sha.update(labels.tobytes())
+        sha.update("\n".join(filepaths or []).encode())
+        return sha.hexdigest()
 
 
     @staticmethod
@@ -53,50 +107,213 @@ class Evaluation:
         Static helper method to load a Keras model from the disk.
         """
         return tf.keras.models.load_model(path)
-    
+
+
+    def predict(self):
+        """
+        Runs (or reuses) the single prediction pass and saves probabilities and labels.
+        """
+        filepaths, self.labels, self.class_names = self._valid_files()
+        # In shards mode, the images are only known through the shards: hash their content
+        data_files = self._shard_files() if filepaths is None else []
+        fingerprint = self._fingerprint(self.config.path_of_model, self.labels, filepaths, data_files)
+
+        meta_path = Path(self.config.root_dir) / "predictions.json"
+        if meta_path.exists() and os.path.exists(self.config.probabilities_path):
+            with open(meta_path) as f:
+                if json.load(f).get("fingerprint") == fingerprint:
+                    logging.info(f"Reusing saved predictions from {self.config.probabilities_path}")
+                    self.probabilities = np.load(self.config.probabilities_path)
+                    return
+
+        self.model = self.load_model(self.config.path_of_model)
+        self.probabilities = self.model.predict(self._valid_dataset(filepaths)).astype("float32")
+        if len(self.probabilities) != len(self.labels):
+            raise ValueError(f"Got {len(self.probabilities)} predictions for {len(self.labels)} validation images")
+
+        np.save(self.config.probabilities_path, self.probabilities)
+        np.save(self.config.labels_path, self.labels)
+        save_json(path=meta_path, data={
+            "fingerprint": fingerprint,
+            "model": str(self.config.path_of_model),
+            "class_names": self.class_names,
+            "images": int(len(self.labels)),
+        })
+
+
+    @staticmethod
+    def _average_ranks(values: np.ndarray) -> np.ndarray:
+        """
+        1-based ranks of 'values', ties sharing their average rank.
+        """
+        order = np.argsort(values, kind="mergesort")
+        sorted_values = values[order]
+        _, first, counts = np.unique(sorted_values, return_index=True, return_counts=True)
+        average = first + (counts + 1) / 2.0
+        ranks = np.empty(len(values), dtype="float64")
+        ranks[order] = np.repeat(average, counts)
+        return ranks
+
+
+    @classmethod
+    def compute_metrics(cls, probabilities: np.ndarray, labels: np.ndarray, class_names: list, calibration_bins: int = 10) -> dict:
+        """
+        Computes every metric from the saved softmax outputs, without looping over images.
+
+        Args:
+            probabilities (np.ndarray): Softmax outputs, shape (N, classes).
+            labels (np.ndarray): True class indices, shape (N,).
+            class_names (list): Class names in output order.
+            calibration_bins (int): Number of confidence bins of the reliability diagram.
+
+        Returns:
+            dict: loss, accuracy, confusion matrix, per-class precision/recall/F1 and
+            one-vs-rest ROC-AUC, macro averages and calibration (ECE, Brier score, bins).
+        """
+        probabilities = np.asarray(probabilities, dtype="float64")
+        labels = np.asarray(labels, dtype="int64")
+        n, k = probabilities.shape
+        predicted = probabilities.argmax(axis=1)
+        correct = predicted == labels
+        one_hot = np.eye(k)[labels]
+
+        # Confusion matrix: rows = true class, columns = predicted class
+        confusion = np.bincount(labels * k + predicted, minlength=k * k).reshape(k, k)
+        true_positives = np.diag(confusion).astype("float64")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            precision = np.nan_to_num(true_positives / confusion.sum(axis=0))
+            recall = np.nan_to_num(true_positives / confusion.sum(axis=1))
+            f1 = np.nan_to_num(2 * precision * recall / (precision + recall))
+
+        # One-vs-rest ROC-AUC through the rank-sum (Mann-Whitney U) statistic
+        positives = one_hot.sum(axis=0)
+        negatives = n - positives
+        ranks = np.apply_along_axis(cls._average_ranks, 0, probabilities)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            auc = ((ranks * one_hot).sum(axis=0) - positives * (positives + 1) / 2) / (positives * negatives)
+        auc = np.where((positives > 0) & (negatives > 0), auc, np.nan)
+
+        # Calibration: accuracy vs confidence of the predicted class, per confidence bin
+        confidence = probabilities.max(axis=1)
+        bins = np.minimum((confidence * calibration_bins).astype("int64"), calibration_bins - 1)
+        bin_counts = np.bincount(bins, minlength=calibration_bins)
+        bin_confidence = np.bincount(bins, weights=confidence, minlength=calibration_bins)
+        bin_correct = np.bincount(bins, weights=correct, minlength=calibration_bins)
+        filled = bin_counts > 0
+        ece = float(np.abs(bin_correct[filled] - bin_confidence[filled]).sum() / n)
+
+        loss = float(-np.log(np.clip(probabilities[np.arange(n), labels], 1e-7, 1.0)).mean())
+        valid_auc = auc[~np.isnan(auc)]
+
+        return {
+            "loss": loss,
+            "accuracy": float(correct.mean()),
+            "images": int(n),
+            "class_names": list(class_names),
+            "confusion_matrix": confusion.tolist(),
+            "per_class": {
+                name: {
+                    "precision": float(precision[i]),
+                    "recall": float(recall[i]),
+                    "f1": float(f1[i]),
+                    "roc_auc": None if np.isnan(auc[i]) else float(auc[i]),
+                    "support": int(positives[i]),
+                }
+                for i, name in enumerate(class_names)
+            },
+            "macro_precision": float(precision.mean()),
+            "macro_recall": float(recall.mean()),
+            "macro_f1": float(f1.mean()),
+            "macro_roc_auc": float(valid_auc.mean()) if valid_auc.size else None,
+            "calibration": {
+                "ece": ece,
+                "brier": float(((probabilities - one_hot) ** 2).sum(axis=1).mean()),
+                "bins": [
+                    {
+                        "upper": round((b + 1) / calibration_bins, 4),
+                        "count": int(bin_counts[b]),
+                        "confidence": float(bin_confidence[b] / bin_counts[b]),
+                        "accuracy": float(bin_correct[b] / bin_counts[b]),
+                    }
+                    for b in np.flatnonzero(filled)
+                ],
+            },
+        }
+
 
     def evaluation(self):
         """
         Executes the evaluation process:
-        1. Loads the model.
-        2. Prepares the validation generator.
-        3. Calculates loss and accuracy scores.
+        1. Predicts the validation split once (or reuses the saved predictions).
+        2. Computes every metric from the saved probabilities.
+        3. Saves the scores.
         """
-        self.model = self.load_model(self.config.path_of_model)
-        self._valid_generator()
-        self.score = self.model.evaluate(self.valid_generator)
+        self.predict()
+        self.scores = self.compute_metrics(
+            self.probabilities, self.labels, self.class_names, self.config.calibration_bins
+        )
+        logging.info(
+            f"Evaluation: loss {self.scores['loss']:.4f}, accuracy {self.scores['accuracy']:.4f}, "
+            f"macro ROC-AUC {self.scores['macro_roc_auc']}, ECE {self.scores['calibration']['ece']:.4f}"
+        )
         self.save_score()
 
     def save_score(self):
         """
         Saves the resulting evaluation metrics to a local JSON file.
         """
-        scores = {"loss": self.score[0], "accuracy": self.score[1]}
-        save_json(path=Path("scores.json"), data=scores)
+        save_json(path=Path("scores.json"), data=self.scores)
+
+
+    def _flat_metrics(self) -> dict:
+        """
+        Scalar metrics in the flat form MLflow expects.
+        """
+        metrics = {
+            "loss": self.scores["loss"],
+            "accuracy": self.scores["accuracy"],
+            "macro_precision": self.scores["macro_precision"],
+            "macro_recall": self.scores["macro_recall"],
+            "macro_f1": self.scores["macro_f1"],
+            "ece": self.scores["calibration"]["ece"],
+            "brier": self.scores["calibration"]["brier"],
+        }
+        if self.scores["macro_roc_auc"] is not None:
+            metrics["macro_roc_auc"] = self.scores["macro_roc_auc"]
+        for name, values in self.scores["per_class"].items():
+            for metric in ("precision", "recall", "f1", "roc_auc"):
+                if values[metric] is not None:
+                    metrics[f"{metric}_{name}"] = values[metric]
+        return metrics
+
 
-    
     def log_into_mlflow(self):
         """
         Logs the evaluation results and parameters into MLflow for experiment tracking.
-        Handles both local and remote (like DagsHub) tracking URIs.
+        Handles both local and remote (like DagsHub) tracking URIs: runs go to
+        MLFLOW_TRACKING_URI when it is set, otherwise to the local ./mlruns.
         """
         mlflow.set_registry_uri(self.config.mlflow_uri)
         tracking_url_type_store = urlparse(mlflow.get_tracking_uri()).scheme
-        
+
         with mlflow.start_run():
             # Log hyperparameters used for this run
             mlflow.log_params(self.config.all_params)
-            
-            # Log the final evaluation metrics
-            mlflow.log_metrics(
-                {"loss": self.score[0], "accuracy": self.score[1]}
-            )
-            
+
+            # Log the final evaluation metrics, the full report and the raw predictions
+            mlflow.log_metrics(self._flat_metrics())
+            mlflow.log_dict(self.scores, "scores.json")
+            mlflow.log_artifact(str(self.config.probabilities_path))
+            mlflow.log_artifact(str(self.config.labels_path))
+
+            # The model is only loaded when the saved predictions could not be reused
+            model = getattr(self, "model", None) or self.load_model(self.config.path_of_model)
+
             # Logic for registering the model in MLflow's Model Registry
             # Model registry requires a remote database connection; it doesn't work with simple 'file' storage.
             if tracking_url_type_store != "file":
                 # Register the model with a name
-                mlflow.keras.log_model(self.model, "model", registered_model_name="VGG16Model")
+                mlflow.keras.log_model(model, "model", registered_model_name="VGG16Model")
             else:
                 # Just log the model artifact locally
-                mlflow.keras.log_model(self.model, "model")
+                mlflow.keras.log_model(model, "model")
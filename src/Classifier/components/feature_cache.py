@@ -0,0 +1,172 @@
+import os
+import json
+import hashlib
+import numpy as np
+import tensorflow as tf
+from pathlib import Path
+from src.logger import logging
+
+
+class FeatureCache:
+    """
+    Component for caching the output of the frozen convolutional base.
+
+    When every VGG16 layer is frozen, the 'block5_pool' output of an image never
+    changes, so it only has to be computed once. The features are stored in a
+    memory-mapped .npy file, with an index keyed by file path and content hash:
+    unchanged images are reused on the next run, new or modified images are
+    recomputed. The whole cache is dropped when the base model changes: other
+    pre-trained WEIGHTS, another PRECISION_POLICY or another feature shape.
+
+    Layout of 'cache_dir':
+        features.npy  -> float32 array of shape (N, 7, 7, 512), one row per image
+        index.json    -> {"model": {...}, "feature_shape": [...], "files": {path: {"sha256", "size", "mtime", "row"}}}
+    """
+    def __init__(self, cache_dir: Path, feature_model: tf.keras.Model, image_size: list, batch_size: int,
+                 model_key: dict = None):
+        """
+        Args:
+            cache_dir (Path): Folder holding 'features.npy' and 'index.json'.
+            feature_model (tf.keras.Model): Frozen base model mapping images to features.
+            image_size (list): (height, width) images are resized to before the base model.
+            batch_size (int): Images per forward pass while filling the cache.
+            model_key (dict, optional): Identifies the base model (e.g., WEIGHTS and
+                PRECISION_POLICY); cached features computed under another key are discarded.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.feature_model = feature_model
+        self.image_size = tuple(image_size)
+        self.batch_size = batch_size
+        self.model_key = dict(model_key or {}, image_size=list(self.image_size))
+        self.features_path = self.cache_dir / "features.npy"
+        self.index_path = self.cache_dir / "index.json"
+
+
+    @staticmethod
+    def _file_hash(path: str) -> str:
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                sha.update(block)
+        return sha.hexdigest()
+
+
+    def _load_index(self) -> dict:
+        if self.index_path.exists() and self.features_path.exists():
+            with open(self.index_path) as f:
+                return json.load(f)
+        return {"model": None, "feature_shape": None, "files": {}}
+
+
+    def _fingerprint(self, path: str, previous: dict) -> dict:
+        """
+        Returns the size/mtime/hash of a file. The (possibly slow) content hash is
+        only recomputed when size or modification time differ from the index.
+        """
+        stat = os.stat(path)
+        if previous and previous["size"] == stat.st_size and previous["mtime"] == stat.st_mtime:
+            sha256 = previous["sha256"]
+        else:
+            sha256 = self._file_hash(path)
+        return {"sha256": sha256, "size": stat.st_size, "mtime": stat.st_mtime}
+
+
+    def _compute(self, filepaths: list) -> np.ndarray:
+        """
+        Runs the frozen base model over 'filepaths' (decode/resize in parallel with tf.data).
+        """
+        image_size = self.image_size
+
+        def load(path):
+            image = tf.io.decode_image(tf.io.read_file(path), channels=3, expand_animations=False)
+            image = tf.image.resize(image, image_size, method="bilinear")
+            return image / 255.0                      # Same rescale as the training generator
+
+        dataset = tf.data.Dataset.from_tensor_slices(filepaths)
+        dataset = dataset.map(load, num_parallel_calls=tf.data.AUTOTUNE)
+        dataset = dataset.batch(self.batch_size).prefetch(tf.data.AUTOTUNE)
+        return self.feature_model.predict(dataset, verbose=0)
+
+
+    def features_for(self, filepaths: list) -> np.ndarray:
+        """
+        Returns the cached features for 'filepaths' as a read-only memory map,
+        with row i belonging to filepaths[i]. Missing or changed images are
+        pushed through the base model; everything else is copied from the cache.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        index = self._load_index()
+        feature_shape = tuple(self.feature_model.output.shape[1:])
+        if index.get("model") != self.model_key or \
+                (index["feature_shape"] is not None and tuple(index["feature_shape"]) != feature_shape):
+            # Base model changed (new WEIGHTS, PRECISION_POLICY or IMAGE_SIZE): the old cache is useless
+            if index["files"]:
+                logging.info(f"Feature cache: base model changed to {self.model_key}, recomputing every image")
+            index = {"model": None, "feature_shape": None, "files": {}}
+
+        old_features = np.load(self.features_path, mmap_mode="r") if index["files"] else None
+        entries, reuse, missing = {}, [], []
+        for row, path in enumerate(filepaths):
+            previous = index["files"].get(path)
+            entry = self._fingerprint(path, previous)
+            entry["row"] = row
+            entries[path] = entry
+            if previous and previous["sha256"] == entry["sha256"]:
+                reuse.append((row, previous["row"]))
+            else:
+                missing.append(row)
+
+        logging.info(f"Feature cache: {len(reuse)} images reused, {len(missing)} to compute")
+
+        if not missing and len(index["files"]) == len(filepaths) and all(new == old for new, old in reuse):
+            # Cache already holds exactly these images in this order: read it as is.
+            # Nothing is written, so several processes (e.g., sweep trials) can share it.
+            return old_features
+
+        # Write the new cache next to the old one, then swap, so an interrupted run
+        # never leaves a half-written cache behind.
+        tmp_path = self.cache_dir / "features.tmp.npy"
+        new_features = np.lib.format.open_memmap(
+            tmp_path, mode="w+", dtype="float32", shape=(len(filepaths),) + feature_shape
+        )
+        for new_row, old_row in reuse:
+            new_features[new_row] = old_features[old_row]
+
+        for start in range(0, len(missing), self.batch_size * 32):
+            rows = missing[start:start + self.batch_size * 32]
+            new_features[rows] = self._compute([filepaths[row] for row in rows])
+
+        new_features.flush()
+        del new_features, old_features
+        os.replace(tmp_path, self.features_path)
+        with open(self.index_path, "w") as f:
+            json.dump({"model": self.model_key, "feature_shape": list(feature_shape), "files": entries}, f)
+
+        return np.load(self.features_path, mmap_mode="r")
+
+
+class CachedFeatureSequence(tf.keras.utils.PyDataset):
+    """
+    Feeds (features, one-hot label) batches straight from the memory-mapped cache,
+    reshuffling every epoch, so the whole feature array never has to fit in RAM.
+    """
+    def __init__(self, features: np.ndarray, labels: np.ndarray, num_classes: int, batch_size: int, shuffle: bool, **kwargs):
+        super().__init__(**kwargs)
+        self.features = features
+        self.labels = np.eye(num_classes, dtype="float32")[labels]
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.order = np.arange(len(labels))
+        self.on_epoch_end()
+
+    def __len__(self):
+        return int(np.ceil(len(self.order) / self.batch_size))
+
+    def __getitem__(self, index):
+        # Sorted indices keep reads from the memory map mostly sequential
+        rows = np.sort(self.order[index * self.batch_size:(index + 1) * self.batch_size])
+        return self.features[rows], self.labels[rows]
+
+    def on_epoch_end(self):
+        if self.shuffle:
+            np.random.shuffle(self.order)
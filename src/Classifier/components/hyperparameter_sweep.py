@@ -0,0 +1,298 @@
+import os
+import math
+import time
+import random
+import itertools
+import traceback
+import dataclasses
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from src.Classifier.entity.config_entity import SweepConfig
+from src.Classifier.utils.common import save_json, split_cores, limit_threads
+from src.logger import logging
+
+
+# params.yaml keys a trial may override, and the TrainingConfig field each one maps to.
+# IMAGE_SIZE, CLASSES, WEIGHTS and PRECISION_POLICY are fixed by the shared base model.
+SWEEPABLE_PARAMS = {
+    "LEARNING_RATE": "params_learning_rate",
+    "BATCH_SIZE": "params_batch_size",
+    "AUGMENTATION": "params_is_augmentation",
+    "EPOCHS": "params_epochs",
+    "INPUT_PIPELINE": "params_input_pipeline",
+    "TRAINING_MODE": "params_training_mode",
+    "JIT_COMPILE": "params_jit_compile",
+    "EARLY_STOPPING": "params_early_stopping",
+    "EARLY_STOPPING_PATIENCE": "params_early_stopping_patience",
+}
+
+
+def _limit_threads(core_queue, threads: int):
+    """
+    Process pool initializer: pins the worker to its own slice of cores and caps
+    every thread pool to that slice, before TensorFlow creates its runtime.
+    """
+    limit_threads(core_queue.get(), threads)
+
+
+def warm_feature_cache():
+    """
+    Fills the shared feature cache once, before bottleneck trials start reading it.
+    """
+    from src.Classifier.config.configuration import ConfigurationManager
+    from src.Classifier.components.training import Training
+
+    training = Training(config=ConfigurationManager().get_training_config())
+    training.get_base_model()
+    training.cached_features()
+
+
+def run_trial(trial_id: str, params: dict, trial_dir: str) -> dict:
+    """
+    Trains and evaluates one configuration inside a pool worker.
+
+    The base model, the extracted dataset, the shards and the feature cache are
+    read from their usual artifact paths and shared by every trial; everything
+    a trial writes (model, checkpoints, reports, predictions) goes to 'trial_dir'.
+
+    Returns:
+        dict: trial id, params, status, metrics (or the error) and duration.
+    """
+    from src.Classifier.config.configuration import ConfigurationManager
+    from src.Classifier.components.training import Training
+    from src.Classifier.components.evaluation import Evaluation
+    import tensorflow as tf
+
+    # Pool workers run several trials in a row: drop the previous trial's models,
+    # graphs and layer-name counters so memory stays flat and trials stay independent.
+    # (max_tasks_per_child=1 would also do, but would lose the worker's pinned cores.)
+    tf.keras.backend.clear_session()
+
+    start = time.perf_counter()
+    trial_dir = Path(trial_dir)
+    os.makedirs(trial_dir, exist_ok=True)
+    result = {"trial_id": trial_id, "params": params, "trial_dir": str(trial_dir)}
+
+    try:
+        config_manager = ConfigurationManager()
+        overrides = {SWEEPABLE_PARAMS[key]: value for key, value in params.items()}
+        training_config = dataclasses.replace(
+            config_manager.get_training_config(),
+            root_dir=trial_dir,
+            trained_model_path=trial_dir / "model.h5",
+            class_indices_path=trial_dir / "class_indices.json",
+            validation_cache_path=trial_dir / "validation_cache",
+            throughput_report_path=trial_dir / "throughput.json",
+            checkpoint_dir=trial_dir / "checkpoints",
+            profile_report_path=trial_dir / "profile.json",
+            profile_trace_dir=trial_dir / "profile_trace",
+            params_profile=False,
+            **overrides
+        )
+
+        training = Training(config=training_config)
+        training.get_base_model()
+        if training_config.params_training_mode == "bottleneck":
+            training.train_on_cached_features()
+        else:
+            training.prepare_inputs()
+            training.train()
+
+        eval_config = dataclasses.replace(
+            config_manager.get_evaluation_config(),
+            path_of_model=training_config.trained_model_path,
+            params_batch_size=training_config.params_batch_size,
+            params_input_pipeline=training_config.params_input_pipeline,
+            root_dir=trial_dir,
+            probabilities_path=trial_dir / "probabilities.npy",
+            labels_path=trial_dir / "labels.npy",
+        )
+        evaluation = Evaluation(eval_config)
+        evaluation.predict()
+        scores = Evaluation.compute_metrics(
+            evaluation.probabilities, evaluation.labels, evaluation.class_names, eval_config.calibration_bins
+        )
+        save_json(path=trial_dir / "scores.json", data=scores)
+
+        result["status"] = "succeeded"
+        result["metrics"] = {
+            "loss": scores["loss"],
+            "accuracy": scores["accuracy"],
+            "macro_f1": scores["macro_f1"],
+            "macro_roc_auc": scores["macro_roc_auc"],
+            "ece": scores["calibration"]["ece"],
+        }
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = f"{type(e).__name__}: {e}"
+        result["traceback"] = traceback.format_exc()
+
+    result["seconds"] = round(time.perf_counter() - start, 2)
+    return result
+
+
+class HyperparameterSweep:
+    """
+    HYPERPARAMETER SWEEP
+    --------------------
+    Trains and evaluates many configurations of stage 03/04 concurrently.
+
+    - Trials come from the SWEEP section of params.yaml: the full 'grid' of the
+      listed values, or NUM_TRIALS 'random' draws (lists are sampled, and
+      {low, high, log} ranges are drawn from).
+    - Trials run in a process pool. Every worker is pinned to its own slice of
+      cores and its TensorFlow/OpenMP thread pools are capped to that slice,
+      so concurrent trials do not fight over the same cores.
+    - The expensive shared inputs (extracted dataset, shards, base model,
+      feature cache) are prepared once by the regular stages and only read by
+      the trials.
+    - Results are ranked into one leaderboard (JSON) and logged to MLflow as
+      one parent run with a nested run per trial.
+    """
+    def __init__(self, config: SweepConfig):
+        """
+        Initializes the sweep with configuration.
+        """
+        self.config = config
+
+
+    def trials(self) -> list:
+        """
+        Expands the search space into a list of parameter dictionaries.
+        """
+        space = dict(self.config.params_space)
+        unknown = set(space) - set(SWEEPABLE_PARAMS)
+        if unknown:
+            raise ValueError(f"Cannot sweep {sorted(unknown)}; supported: {sorted(SWEEPABLE_PARAMS)}")
+
+        if self.config.params_strategy == "grid":
+            if any(not isinstance(values, list) for values in space.values()):
+                raise ValueError("Grid search needs a list of values for every parameter")
+            keys = list(space)
+            return [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+
+        if self.config.params_strategy == "random":
+            rng = random.Random(self.config.params_seed)
+
+            def draw(values):
+                if isinstance(values, list):
+                    return rng.choice(values)
+                low, high = float(values["low"]), float(values["high"])
+                if values.get("log"):
+                    return 10 ** rng.uniform(math.log10(low), math.log10(high))
+                return rng.uniform(low, high)
+
+            return [{key: draw(values) for key, values in space.items()} for _ in range(self.config.params_num_trials)]
+
+        raise ValueError(f"Unknown SWEEP STRATEGY: {self.config.params_strategy}")
+
+
+    def _leaderboard(self, results: list) -> list:
+        """
+        Succeeded trials ranked by the configured metric, failed trials last.
+        """
+        metric = self.config.metric
+        lower_is_better = metric in ("loss", "ece")
+        succeeded = [r for r in results if r["status"] == "succeeded" and r["metrics"].get(metric) is not None]
+        succeeded.sort(key=lambda r: r["metrics"][metric], reverse=not lower_is_better)
+        failed = [r for r in results if r not in succeeded]
+        board = []
+        for rank, result in enumerate(succeeded + failed, start=1):
+            entry = {key: value for key, value in result.items() if key != "traceback"}
+            entry["rank"] = rank if result in succeeded else None
+            board.append(entry)
+        return board
+
+
+    def _log_into_mlflow(self, sweep_id: str, leaderboard: list):
+        """
+        One parent run for the sweep, one nested run per trial (logged from this process only).
+        """
+        import mlflow
+
+        if self.config.mlflow_uri:
+            mlflow.set_tracking_uri(self.config.mlflow_uri)
+        mlflow.set_experiment("hyperparameter_sweep")
+        with mlflow.start_run(run_name=sweep_id):
+            mlflow.log_params({
+                "strategy": self.config.params_strategy,
+                "trials": len(leaderboard),
+                "max_workers": self.config.max_workers,
+                "metric": self.config.metric,
+            })
+            mlflow.log_dict({"leaderboard": leaderboard}, "leaderboard.json")
+            best = leaderboard[0] if leaderboard and leaderboard[0]["rank"] == 1 else None
+            if best:
+                mlflow.log_metrics({f"best_{k}": v for k, v in best["metrics"].items() if v is not None})
+
+            for entry in leaderboard:
+                with mlflow.start_run(run_name=entry["trial_id"], nested=True):
+                    mlflow.log_params(entry["params"])
+                    mlflow.set_tag("status", entry["status"])
+                    if entry["status"] == "succeeded":
+                        mlflow.log_metrics({k: v for k, v in entry["metrics"].items() if v is not None})
+                        mlflow.log_metric("seconds", entry["seconds"])
+                    else:
+                        mlflow.set_tag("error", entry["error"][:500])
+
+
+    def run(self) -> list:
+        """
+        Runs every trial and writes '<root_dir>/<sweep id>/leaderboard.json'.
+
+        Returns:
+            list: The leaderboard, best trial first.
+        """
+        trials = self.trials()
+        sweep_id = time.strftime("sweep_%Y%m%d_%H%M%S")
+        sweep_dir = Path(self.config.root_dir) / sweep_id
+        os.makedirs(sweep_dir, exist_ok=True)
+        save_json(path=sweep_dir / "trials.json", data={"trials": trials})
+
+        workers = max(1, min(self.config.max_workers, len(trials)))
+        slices, threads = split_cores(workers, self.config.threads_per_trial)
+        logging.info(f"Sweep {sweep_id}: {len(trials)} trials on {workers} workers x {threads} threads")
+
+        # 'spawn' gives every worker a fresh interpreter, so the thread limits are
+        # applied before TensorFlow initializes (and no TF state is forked)
+        context = multiprocessing.get_context("spawn")
+        core_queue = context.Queue()
+        for cores in slices:
+            core_queue.put(cores)
+
+        results = []
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                 initializer=_limit_threads, initargs=(core_queue, threads)) as pool:
+            if any(params.get("TRAINING_MODE", self.config.params_training_mode) == "bottleneck" for params in trials):
+                # Computed once here; concurrent trials then only read the cache
+                pool.submit(warm_feature_cache).result()
+
+            futures = [
+                pool.submit(run_trial, f"trial_{i:03d}", params, str(sweep_dir / f"trial_{i:03d}"))
+                for i, params in enumerate(trials)
+            ]
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                if result["status"] == "succeeded":
+                    logging.info(f"{result['trial_id']} {result['params']}: {result['metrics']} ({result['seconds']}s)")
+                else:
+                    logging.error(f"{result['trial_id']} {result['params']} failed: {result['error']}")
+                # Keep a partial leaderboard on disk while the sweep runs
+                save_json(path=sweep_dir / "leaderboard.json", data={"leaderboard": self._leaderboard(results)})
+
+        leaderboard = self._leaderboard(results)
+        save_json(path=sweep_dir / "leaderboard.json", data={
+            "sweep_id": sweep_id,
+            "metric": self.config.metric,
+            "strategy": self.config.params_strategy,
+            "leaderboard": leaderboard,
+        })
+        logging.info(f"Sweep leaderboard saved at: {sweep_dir / 'leaderboard.json'}")
+
+        try:
+            self._log_into_mlflow(sweep_id, leaderboard)
+        except Exception as e:
+            logging.warning(f"Could not log the sweep to MLflow: {e}")
+        return leaderboard
@@ -0,0 +1,183 @@
+import os
+import time
+import shutil
+import numpy as np
+import tensorflow as tf
+from pathlib import Path
+from src.Classifier.entity.config_entity import ModelExportConfig
+from src.Classifier.utils.common import list_image_files, save_json
+from src.logger import logging
+
+
+class ModelExport:
+    """
+    Component for exporting the trained model to lean inference formats.
+
+    - SavedModel: inference-only graph, no Keras training stack needed to serve it.
+    - TFLite: a single flatbuffer served by the lightweight TFLite interpreter,
+      optionally quantized ('dynamic' range or full 'int8' with a calibration
+      subset of the dataset).
+
+    A report compares size, latency and accuracy of the TFLite model against
+    the original .h5 on the same images.
+    """
+    def __init__(self, config: ModelExportConfig):
+        """
+        Initializes the export component with configuration.
+        """
+        self.config = config
+
+
+    def load_model(self):
+        """
+        Loads the trained Keras model produced by the training stage.
+        """
+        self.model = tf.keras.models.load_model(self.config.path_of_model)
+
+
+    def _sample_images(self):
+        """
+        Picks a fixed (seeded) random subset of the validation split for calibration and comparison.
+
+        Images get the same preprocessing as in training and in serving (resize,
+        then rescale to [0, 1], see PredictionPipeline.load_image), so the int8
+        ranges are calibrated on what the app feeds the model and the accuracy
+        report matches what users get.
+        """
+        filepaths, labels, _ = list_image_files(
+            self.config.training_data, validation_split=self.config.params_validation_split, subset="validation"
+        )
+        rng = np.random.default_rng(0)
+        count = min(self.config.params_calibration_samples, len(filepaths))
+        chosen = np.sort(rng.choice(len(filepaths), size=count, replace=False))
+
+        target_size = tuple(self.config.params_image_size[:-1])
+        images = np.stack([
+            tf.keras.utils.img_to_array(tf.keras.utils.load_img(filepaths[i], target_size=target_size))
+            for i in chosen
+        ])
+        self.sample_images = images.astype("float32") / 255.0     # Same rescale as the training pipelines
+        self.sample_labels = np.asarray(labels)[chosen]
+
+
+    def export_saved_model(self):
+        """
+        Writes an inference-only SavedModel.
+        """
+        self.model.export(str(self.config.saved_model_dir))
+        logging.info(f"SavedModel exported to: {self.config.saved_model_dir}")
+
+
+    def export_tflite(self):
+        """
+        Converts the SavedModel to TFLite with the quantization chosen in params.yaml.
+        Inputs and outputs stay float32 in every mode, so callers never change.
+        """
+        quantization = self.config.params_quantization
+        converter = tf.lite.TFLiteConverter.from_saved_model(str(self.config.saved_model_dir))
+
+        if quantization in ("dynamic", "int8"):
+            # Weights stored as int8 (~4x smaller)
+            converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        if quantization == "int8":
+            # Activations quantized too, ranges calibrated on real CT slices
+            converter.representative_dataset = lambda: ([image[None]] for image in self.sample_images)
+            converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        elif quantization not in ("none", "dynamic"):
+            raise ValueError(f"Unknown EXPORT_QUANTIZATION: {quantization}")
+
+        with open(self.config.tflite_model_path, "wb") as f:
+            f.write(converter.convert())
+        logging.info(f"TFLite model ({quantization}) exported to: {self.config.tflite_model_path}")
+
+
+    def copy_label_map(self):
+        """
+        Copies the training label map next to the exported models (the predictor reads it from there).
+
+        Raises:
+            FileNotFoundError: If the training stage wrote no label map (it is an output of this stage).
+        """
+        label_map = Path(self.config.path_of_model).parent / "class_indices.json"
+        if not label_map.exists():
+            raise FileNotFoundError(f"No label map found at {label_map}; re-run the training stage")
+        shutil.copy(label_map, Path(self.config.tflite_model_path).parent / label_map.name)
+
+
+    @staticmethod
+    def _benchmark(predict_fn, images: np.ndarray, labels: np.ndarray) -> dict:
+        """
+        Single-image latency (after one warm-up call) and accuracy of 'predict_fn' on the sample.
+        """
+        predict_fn(images[:1])
+        latencies, predictions = [], []
+        for image in images:
+            start = time.perf_counter()
+            output = predict_fn(image[None])
+            latencies.append((time.perf_counter() - start) * 1000)
+            predictions.append(int(np.argmax(output)))
+        return {
+            "latency_ms_mean": round(float(np.mean(latencies)), 3),
+            "latency_ms_p50": round(float(np.percentile(latencies, 50)), 3),
+            "latency_ms_p99": round(float(np.percentile(latencies, 99)), 3),
+            "accuracy": round(float(np.mean(np.asarray(predictions) == labels)), 4),
+        }
+
+
+    @staticmethod
+    def _size_mb(path: Path) -> float:
+        if os.path.isdir(path):
+            size = sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+        else:
+            size = os.path.getsize(path)
+        return round(size / (1024 * 1024), 2)
+
+
+    def compare(self):
+        """
+        Writes the size / latency / accuracy comparison between the .h5 and TFLite models.
+        """
+        interpreter = tf.lite.Interpreter(
+            model_path=str(self.config.tflite_model_path), num_threads=self.config.num_threads
+        )
+        interpreter.allocate_tensors()
+        input_index = interpreter.get_input_details()[0]["index"]
+        output_index = interpreter.get_output_details()[0]["index"]
+
+        def tflite_predict(batch):
+            interpreter.set_tensor(input_index, batch)
+            interpreter.invoke()
+            return interpreter.get_tensor(output_index)
+
+        keras_stats = self._benchmark(lambda batch: self.model(batch, training=False), self.sample_images, self.sample_labels)
+        tflite_stats = self._benchmark(tflite_predict, self.sample_images, self.sample_labels)
+
+        report = {
+            "quantization": self.config.params_quantization,
+            "samples": int(len(self.sample_labels)),
+            "num_threads": self.config.num_threads,
+            "size_mb": {
+                "h5": self._size_mb(self.config.path_of_model),
+                "saved_model": self._size_mb(self.config.saved_model_dir),
+                "tflite": self._size_mb(self.config.tflite_model_path),
+            },
+            "h5": keras_stats,
+            "tflite": tflite_stats,
+            "delta": {
+                "latency_ms_mean": round(tflite_stats["latency_ms_mean"] - keras_stats["latency_ms_mean"], 3),
+                "accuracy": round(tflite_stats["accuracy"] - keras_stats["accuracy"], 4),
+            },
+        }
+        save_json(path=self.config.report_path, data=report)
+
+
+    def export(self):
+        """
+        Runs the whole export: load, SavedModel, TFLite, comparison report.
+        """
+        self.load_model()
+        self._sample_images()
+        self.export_saved_model()
+        self.export_tflite()
+        self.copy_label_map()
+        self.compare()
@@ -4,6 +4,7 @@ from zipfile import ZipFile
 import tensorflow as tf
 from pathlib import Path
 from src.Classifier.entity.config_entity import PrepareBaseModelConfig
+from src.Classifier.utils.common import set_precision_policy
 
 
 class PrepareBaseModel:
@@ -27,6 +28,9 @@ class PrepareBaseModel:
         VGG16 is a famous deep learning architecture. 'imagenet' weights mean it 
         already has 'knowledge' from millions of generic images.
         """
+        # Layers pick up the global dtype policy when they are created
+        set_precision_policy(self.config.params_precision_policy)
+
         self.model = tf.keras.applications.vgg16.VGG16(
             input_shape=self.config.params_image_size,
             weights=self.config.params_weights,
@@ -39,7 +43,7 @@ class PrepareBaseModel:
     
 
     @staticmethod
-    def _prepare_full_model(model, classes, freeze_all, freeze_till, learning_rate):
+    def _prepare_full_model(model, classes, freeze_all, freeze_till, learning_rate, jit_compile=False):
         """
         Technical Core: Adapting the model for our specific task.
         
@@ -60,9 +64,12 @@ class PrepareBaseModel:
         
         # 3. Dense Layer: The actual 'brain' that decides the class.
         # 'softmax' activation converts the output into probabilities for each class.
+        # The head always runs in float32 so the softmax stays numerically stable
+        # under a mixed precision policy.
         prediction = tf.keras.layers.Dense(
             units=classes,
-            activation="softmax"
+            activation="softmax",
+            dtype="float32"
         )(flatten_in)
 
         # Create the full model integrating the base and our custom classification head
@@ -75,7 +82,8 @@ class PrepareBaseModel:
         full_model.compile(
             optimizer=tf.keras.optimizers.SGD(learning_rate=learning_rate),
             loss=tf.keras.losses.CategoricalCrossentropy(),
-            metrics=["accuracy"]
+            metrics=["accuracy"],
+            jit_compile=jit_compile          # XLA compilation of the train/predict steps
         )
 
         full_model.summary()
@@ -91,7 +99,8 @@ class PrepareBaseModel:
             classes=self.config.params_classes,
             freeze_all=True,              # Freeze VGG16 layers (Transfer Learning)
             freeze_till=None,
-            learning_rate=self.config.params_learning_rate
+            learning_rate=self.config.params_learning_rate,
+            jit_compile=self.config.params_jit_compile
         )
 
         # Saves the newly updated model ready for training
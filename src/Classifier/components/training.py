@@ -1,12 +1,240 @@
 import os
+import json
 import urllib.request as request
 from zipfile import ZipFile
+import numpy as np
 import tensorflow as tf
 import time
 from src.Classifier.entity.config_entity import TrainingConfig
+from src.Classifier.utils.common import list_image_files, save_json, set_precision_policy
+from src.Classifier.components.feature_cache import FeatureCache, CachedFeatureSequence
+from src.Classifier.components.data_sharding import ShardReader
+from src.logger import logging
 from pathlib import Path
 
 
+class ThroughputCallback(tf.keras.callbacks.Callback):
+    """
+    Keras callback that measures how many training images per second the
+    input pipeline + model actually process in each epoch, and how long a
+    single training step takes.
+
+    It is attached to every training run so input pipelines and precision /
+    XLA settings can be compared on the same machine. The median step time is
+    reported because the first steps include graph tracing and XLA compilation.
+    """
+    def __init__(self, batch_size: int, pipeline_name: str, run_labels: dict = None):
+        super().__init__()
+        self.batch_size = batch_size
+        self.pipeline_name = pipeline_name
+        self.run_labels = run_labels or {}
+        self.epochs = []
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._steps = 0
+        self._step_times = []
+        self._start = time.perf_counter()
+
+    def on_train_batch_begin(self, batch, logs=None):
+        self._step_start = time.perf_counter()
+
+    def on_train_batch_end(self, batch, logs=None):
+        self._steps += 1
+        self._step_times.append(time.perf_counter() - self._step_start)
+
+    def on_epoch_end(self, epoch, logs=None):
+        seconds = time.perf_counter() - self._start
+        images = self._steps * self.batch_size
+        images_per_sec = images / seconds if seconds > 0 else 0.0
+        step_ms = float(np.median(self._step_times)) * 1000 if self._step_times else 0.0
+        self.epochs.append({
+            "epoch": epoch + 1,
+            "seconds": round(seconds, 3),
+            "images": images,
+            "images_per_sec": round(images_per_sec, 2),
+            "median_step_ms": round(step_ms, 2)
+        })
+        logging.info(
+            f"[{self.pipeline_name} {self.run_labels}] epoch {epoch + 1}: "
+            f"{images_per_sec:.1f} images/sec, {step_ms:.1f} ms/step ({seconds:.1f}s)"
+        )
+
+    def report(self) -> dict:
+        """
+        Summary of every epoch, saved next to the trained model.
+        """
+        rates = [e["images_per_sec"] for e in self.epochs]
+        steps = [e["median_step_ms"] for e in self.epochs]
+        return {
+            "input_pipeline": self.pipeline_name,
+            "batch_size": self.batch_size,
+            **self.run_labels,
+            "mean_images_per_sec": round(sum(rates) / len(rates), 2) if rates else 0.0,
+            "mean_step_ms": round(sum(steps) / len(steps), 2) if steps else 0.0,
+            "epochs": self.epochs
+        }
+
+
+class StepProfiler:
+    """
+    Splits every training step into the time spent waiting for the input
+    pipeline (decode, resize, augmentation) and the time spent in the model
+    (forward + backward pass and weight update).
+
+    'Training.profile' pulls each batch from the input pipeline itself and then
+    runs one synchronous train step, so the two phases can be timed separately,
+    which 'fit' (where the next batch is fetched inside the train function)
+    does not allow.
+    """
+    def __init__(self, batch_size: int, warmup_steps: int = 3):
+        self.batch_size = batch_size
+        self.warmup_steps = warmup_steps   # Graph tracing / XLA compilation, reported apart
+        self.data_wait = []
+        self.compute = []
+
+    def record(self, data_seconds: float, compute_seconds: float):
+        self.data_wait.append(data_seconds * 1000)
+        self.compute.append(compute_seconds * 1000)
+
+    @staticmethod
+    def _stats(samples_ms) -> dict:
+        samples = np.asarray(samples_ms)
+        return {
+            "mean_ms": round(float(samples.mean()), 2),
+            "p50_ms": round(float(np.percentile(samples, 50)), 2),
+            "p90_ms": round(float(np.percentile(samples, 90)), 2),
+        }
+
+    def report(self) -> dict:
+        """
+        Summary of the measured steps (warm-up steps excluded).
+        """
+        data_wait = np.asarray(self.data_wait[self.warmup_steps:])
+        compute = np.asarray(self.compute[self.warmup_steps:])
+        if data_wait.size == 0:
+            raise ValueError(f"PROFILE_STEPS must be larger than the {self.warmup_steps} warm-up steps")
+        step_ms = float((data_wait + compute).mean())
+        data_fraction = float(data_wait.sum() / (data_wait.sum() + compute.sum()))
+        return {
+            "batch_size": self.batch_size,
+            "measured_steps": int(data_wait.size),
+            "warmup_steps_ms": [round(d + c, 2) for d, c in zip(self.data_wait[:self.warmup_steps], self.compute[:self.warmup_steps])],
+            "data_wait": self._stats(data_wait),
+            "compute": self._stats(compute),
+            "mean_step_ms": round(step_ms, 2),
+            "data_wait_fraction": round(data_fraction, 3),
+            # What each side could sustain on its own, and what the two together achieved
+            "input_images_per_sec": round(self.batch_size * 1000 / max(float(data_wait.mean()), 1e-6), 1),
+            "compute_images_per_sec": round(self.batch_size * 1000 / max(float(compute.mean()), 1e-6), 1),
+            "images_per_sec": round(self.batch_size * 1000 / step_ms, 1),
+            "bound": "input" if data_fraction > 0.5 else "compute",
+        }
+
+
+class ResumableCheckpoint(tf.keras.callbacks.Callback):
+    """
+    Keras callback that periodically saves the model *and* its optimizer state,
+    so an interrupted stage 03 can pick up where it stopped.
+
+    The full model is written in the native '.keras' format (which includes the
+    optimizer variables) to '<checkpoint_dir>/last.keras', together with a small
+    'state.json' recording the next epoch to run. Files are written to a
+    temporary name first and then renamed, so a crash mid-save never corrupts
+    the previous checkpoint.
+
+    With a step frequency, a resumed run restarts the interrupted epoch from
+    the latest saved weights.
+
+    'state.json' also records the run's hyperparameters (epochs, learning rate,
+    batch size, image size, ...): a checkpoint left by a run with other
+    settings is discarded and training starts fresh.
+    """
+    def __init__(self, checkpoint_dir: Path, save_freq="epoch", run_params: dict = None):
+        """
+        Args:
+            checkpoint_dir (Path): Where 'last.keras' and 'state.json' are kept.
+            save_freq: 'epoch' or a number of training steps between checkpoints.
+            run_params (dict, optional): Hyperparameters a checkpoint is only valid for.
+        """
+        super().__init__()
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.save_freq = save_freq
+        self.run_params = run_params
+        self._epoch = 0
+        self._steps = 0
+
+    @staticmethod
+    def paths(checkpoint_dir: Path):
+        return Path(checkpoint_dir) / "last.keras", Path(checkpoint_dir) / "state.json"
+
+    def _save(self, next_epoch: int):
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        model_path, state_path = self.paths(self.checkpoint_dir)
+        tmp_path = self.checkpoint_dir / "last.tmp.keras"
+        self.model.save(tmp_path)
+        os.replace(tmp_path, model_path)
+        save_json(path=state_path, data={"epoch": next_epoch, "step": self._steps, "params": self.run_params})
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._epoch = epoch
+
+    def on_train_batch_end(self, batch, logs=None):
+        self._steps += 1
+        if self.save_freq != "epoch" and self._steps % int(self.save_freq) == 0:
+            self._save(next_epoch=self._epoch)
+
+    def on_epoch_end(self, epoch, logs=None):
+        if self.save_freq == "epoch":
+            self._save(next_epoch=epoch + 1)
+
+    @classmethod
+    def restore(cls, model: tf.keras.Model, checkpoint_dir: Path, run_params: dict = None) -> int:
+        """
+        Loads the last checkpoint (weights and optimizer state) into an already
+        compiled 'model'.
+
+        Args:
+            run_params (dict, optional): Hyperparameters of this run; a checkpoint
+                saved with different ones is removed instead of restored.
+
+        Returns:
+            int: The epoch to resume from (0 when there is no checkpoint).
+        """
+        model_path, state_path = cls.paths(checkpoint_dir)
+        if not (model_path.exists() and state_path.exists()):
+            return 0
+
+        with open(state_path) as f:
+            state = json.load(f)
+        if state.get("params") != run_params:
+            logging.info(
+                f"Ignoring checkpoint {model_path}: saved with {state.get('params')}, "
+                f"this run uses {run_params}; training from scratch"
+            )
+            cls.clear(checkpoint_dir)
+            return 0
+
+        saved = tf.keras.models.load_model(model_path)
+        model.set_weights(saved.get_weights())
+        if not model.optimizer.built:
+            model.optimizer.build(model.trainable_variables)
+        for variable, saved_variable in zip(model.optimizer.variables, saved.optimizer.variables):
+            variable.assign(saved_variable)
+
+        initial_epoch = state["epoch"]
+        logging.info(f"Resuming training from checkpoint {model_path} at epoch {initial_epoch + 1}")
+        return initial_epoch
+
+    @classmethod
+    def clear(cls, checkpoint_dir: Path):
+        """
+        Removes the checkpoint once training has completed.
+        """
+        for path in cls.paths(checkpoint_dir):
+            if path.exists():
+                os.remove(path)
+
+
 class Training:
     """
     Component for training the deep learning model.
@@ -24,6 +252,8 @@ class Training:
         Loads the pre-trained updated base model from the specified path.
         This model includes the VGG16 base and your custom classification layers.
         """
+        # Must match the policy the model was prepared with (see params.yaml)
+        set_precision_policy(self.config.params_precision_policy)
         self.model = tf.keras.models.load_model(
             self.config.updated_base_model_path
         )
@@ -36,7 +266,7 @@ class Training:
         # Arguments common to both training and validation generators
         datagenerator_kwargs = dict(
             rescale = 1./255,          # Normalize pixel values from [0, 255] to [0, 1]
-            validation_split=0.20      # Reserve 20% of the images for verification (validation)
+            validation_split=self.config.params_validation_split  # Reserve VALIDATION_SPLIT of the images for verification (validation)
         )
 
         # Arguments controlling the flow of images during training
@@ -80,6 +310,119 @@ class Training:
             **dataflow_kwargs
         )
 
+        self.train_samples = self.train_generator.samples
+        self.valid_samples = self.valid_generator.samples
+        self.class_indices = self.train_generator.class_indices
+
+
+    @staticmethod
+    def _augmentation_layers():
+        """
+        Vectorized equivalent of the ImageDataGenerator augmentation, applied to whole batches.
+        (Shear has no built-in preprocessing layer and is left out.)
+        """
+        return tf.keras.Sequential([
+            tf.keras.layers.RandomRotation(40 / 360, fill_mode="nearest"),        # Up to 40 degrees
+            tf.keras.layers.RandomFlip("horizontal"),                             # Mirror images horizontally
+            tf.keras.layers.RandomTranslation(0.2, 0.2, fill_mode="nearest"),     # Shift vertically/horizontally
+            tf.keras.layers.RandomZoom(0.2, fill_mode="nearest"),                 # Randomly zoom in/out
+        ])
+
+
+    def train_valid_dataset(self):
+        """
+        Creates training and validation tf.data pipelines (alternative to 'train_valid_generator').
+
+        - Files are listed once, with the same per-class VALIDATION_SPLIT as flow_from_directory.
+        - JPEG decode and resize run in parallel (num_parallel_calls=AUTOTUNE).
+        - The resized validation set is optionally cached in memory or on disk,
+          so it is decoded only once for the whole run.
+        - Augmentation runs as batched tensor ops instead of per-image Python code.
+        - Both pipelines prefetch so the model never waits on the next batch.
+        """
+        AUTOTUNE = tf.data.AUTOTUNE
+        image_size = tuple(self.config.params_image_size[:-1])
+        batch_size = self.config.params_batch_size
+
+        train_files, train_labels, class_names = list_image_files(
+            self.config.training_data, validation_split=self.config.params_validation_split, subset="training"
+        )
+        valid_files, valid_labels, _ = list_image_files(
+            self.config.training_data, validation_split=self.config.params_validation_split, subset="validation"
+        )
+        num_classes = len(class_names)
+
+        def load(path, label):
+            image = tf.io.decode_image(tf.io.read_file(path), channels=3, expand_animations=False)
+            image = tf.image.resize(image, image_size, method="bilinear")
+            image = image / 255.0                                    # Same rescale as the generator
+            return image, tf.one_hot(label, num_classes)
+
+        # 1. Validation pipeline: decode once, then serve from the cache
+        valid_ds = tf.data.Dataset.from_tensor_slices((valid_files, valid_labels))
+        valid_ds = valid_ds.map(load, num_parallel_calls=AUTOTUNE).batch(batch_size)
+        if self.config.params_validation_cache == "memory":
+            valid_ds = valid_ds.cache()
+        elif self.config.params_validation_cache == "disk":
+            os.makedirs(os.path.dirname(self.config.validation_cache_path), exist_ok=True)
+            valid_ds = valid_ds.cache(str(self.config.validation_cache_path))
+        self.valid_generator = valid_ds.prefetch(AUTOTUNE)
+
+        # 2. Training pipeline: reshuffle every epoch, optionally augment whole batches
+        train_ds = tf.data.Dataset.from_tensor_slices((train_files, train_labels))
+        train_ds = train_ds.shuffle(len(train_files), reshuffle_each_iteration=True)
+        train_ds = train_ds.map(load, num_parallel_calls=AUTOTUNE).batch(batch_size)
+        if self.config.params_is_augmentation:
+            augment = self._augmentation_layers()
+            train_ds = train_ds.map(
+                lambda x, y: (augment(x, training=True), y), num_parallel_calls=AUTOTUNE
+            )
+        # repeat() because fit() is driven by steps_per_epoch
+        self.train_generator = train_ds.repeat().prefetch(AUTOTUNE)
+
+        self.train_samples = len(train_files)
+        self.valid_samples = len(valid_files)
+        self.class_indices = {name: index for index, name in enumerate(class_names)}
+        logging.info(f"tf.data pipeline: {self.train_samples} training / {self.valid_samples} validation images")
+
+
+    def train_valid_shards(self):
+        """
+        Streams training and validation batches from the pre-resized shards written
+        by the data sharding stage, instead of reopening every JPEG each epoch.
+        """
+        AUTOTUNE = tf.data.AUTOTUNE
+        batch_size = self.config.params_batch_size
+        reader = ShardReader(self.config.shard_index_file)
+
+        self.valid_generator = reader.dataset("validation", batch_size).prefetch(AUTOTUNE)
+
+        train_ds = reader.dataset("training", batch_size, shuffle=True, repeat=True)
+        if self.config.params_is_augmentation:
+            augment = self._augmentation_layers()
+            train_ds = train_ds.map(
+                lambda x, y: (augment(x, training=True), y), num_parallel_calls=AUTOTUNE
+            )
+        self.train_generator = train_ds.prefetch(AUTOTUNE)
+
+        self.train_samples = reader.count("training")
+        self.valid_samples = reader.count("validation")
+        self.class_indices = reader.class_indices
+
+
+    def prepare_inputs(self):
+        """
+        Builds the input pipeline selected by INPUT_PIPELINE in params.yaml.
+        """
+        if self.config.params_input_pipeline == "tf_data":
+            self.train_valid_dataset()
+        elif self.config.params_input_pipeline == "shards":
+            self.train_valid_shards()
+        elif self.config.params_input_pipeline == "generator":
+            self.train_valid_generator()
+        else:
+            raise ValueError(f"Unknown INPUT_PIPELINE: {self.config.params_input_pipeline}")
+
     
     @staticmethod
     def save_model(path: Path, model: tf.keras.Model):
@@ -89,35 +432,253 @@ class Training:
         model.save(path)
 
 
+    def save_class_indices(self):
+        """
+        Saves the {class name: output index} mapping of the training data next to the
+        model, so the predictor labels the softmax outputs in the right order.
+        """
+        save_json(path=self.config.class_indices_path, data=self.class_indices)
+
+
+    def _training_callbacks(self, checkpoint_dir: Path) -> list:
+        """
+        Checkpointing (always) and early stopping (if enabled in params.yaml).
+        """
+        callbacks = [ResumableCheckpoint(
+            checkpoint_dir, save_freq=self.config.params_checkpoint_freq, run_params=self._checkpoint_params()
+        )]
+        if self.config.params_early_stopping:
+            callbacks.append(tf.keras.callbacks.EarlyStopping(
+                monitor=self.config.params_early_stopping_monitor,
+                patience=self.config.params_early_stopping_patience,
+                restore_best_weights=True       # Keep the best epoch, not the last one
+            ))
+        return callbacks
+
+
+    def _checkpoint_params(self) -> dict:
+        """
+        Settings a checkpoint must have been saved with to be resumed.
+        """
+        return {
+            "epochs": self.config.params_epochs,
+            "learning_rate": self.config.params_learning_rate,
+            "batch_size": self.config.params_batch_size,
+            "image_size": list(self.config.params_image_size),
+            "augmentation": self.config.params_is_augmentation,
+            "validation_split": self.config.params_validation_split,
+            "training_mode": self.config.params_training_mode,
+        }
+
+
+    def _run_labels(self) -> dict:
+        """
+        Settings recorded with every throughput/step-time report.
+        """
+        return {
+            "precision_policy": self.config.params_precision_policy,
+            "jit_compile": self.config.params_jit_compile
+        }
+
+
+    def _compile(self):
+        """
+        CRITICAL FIX FOR NOTBOOK ERROR:
+        When loading a saved model for training, TensorFlow sometimes misses the optimizer variables.
+        Re-compiling the model here with a fresh SGD optimizer instance solves the "Unknown variable" issue.
+        """
+        self.model.compile(
+            optimizer = tf.keras.optimizers.SGD(learning_rate=self.config.params_learning_rate),
+            loss = tf.keras.losses.CategoricalCrossentropy(),
+            metrics = ["accuracy"],
+            jit_compile = self.config.params_jit_compile   # XLA-compile the train step (params.yaml)
+        )
+
+
+    def profile(self) -> dict:
+        """
+        Profiling mode (PROFILE in params.yaml): runs PROFILE_STEPS training steps
+        and reports where the step time goes.
+
+        - Data wait: time to get the next batch from the selected input pipeline.
+        - Compute: one synchronous train step (forward, backward, weight update).
+        - Optionally, a TensorFlow profiler trace is captured for the steps in
+          PROFILE_TRACE_STEPS ([first, last]); open it in TensorBoard's Profile tab.
+
+        The steps update the weights of 'self.model': reload the base model
+        (get_base_model) before training for real.
+
+        Returns:
+            dict: The report, also saved to 'profile_report_path'.
+        """
+        self._compile()
+        profiler = StepProfiler(self.config.params_batch_size)
+        trace_steps = self.config.params_profile_trace_steps or []
+        trace_start, trace_stop = trace_steps if trace_steps else (-1, -1)
+        iterator = iter(self.train_generator)
+
+        for step in range(self.config.params_profile_steps):
+            if step == trace_start:
+                tf.profiler.experimental.start(str(self.config.profile_trace_dir))
+            with tf.profiler.experimental.Trace("train", step_num=step, _r=1):
+                start = time.perf_counter()
+                x, y = next(iterator)
+                fetched = time.perf_counter()
+                # train_on_batch returns numpy values, so the step has finished when it returns
+                self.model.train_on_batch(x, y)
+                done = time.perf_counter()
+            profiler.record(fetched - start, done - fetched)
+            if step == trace_stop:
+                tf.profiler.experimental.stop()
+        if trace_start <= self.config.params_profile_steps - 1 < trace_stop:
+            tf.profiler.experimental.stop()
+
+        report = {"input_pipeline": self.config.params_input_pipeline, **self._run_labels(), **profiler.report()}
+        report["trace_dir"] = str(self.config.profile_trace_dir) if trace_steps else None
+        save_json(path=self.config.profile_report_path, data=report)
+        logging.info(
+            f"Profile [{report['input_pipeline']}]: {report['data_wait']['mean_ms']} ms data wait + "
+            f"{report['compute']['mean_ms']} ms compute per step, {report['images_per_sec']} images/sec "
+            f"({report['bound']}-bound)"
+        )
+        return report
+
+
     def train(self):
         """
         Performs the model training.
         Includes a re-compilation step to ensure fresh optimizer state and avoid "Unknown variable" errors.
         """
         # Calculate how many steps (batches) are needed to see the whole data in one epoch
-        self.steps_per_epoch = self.train_generator.samples // self.train_generator.batch_size
-        self.validation_steps = self.valid_generator.samples // self.valid_generator.batch_size
+        self.steps_per_epoch = self.train_samples // self.config.params_batch_size
+        self.validation_steps = self.valid_samples // self.config.params_batch_size
 
-        # CRITICAL FIX FOR NOTBOOK ERROR: 
-        # When loading a saved model for training, TensorFlow sometimes misses the optimizer variables.
-        # Re-compiling the model here with a fresh SGD optimizer instance solves the "Unknown variable" issue.
-        self.model.compile(
-            optimizer = tf.keras.optimizers.SGD(learning_rate=self.config.params_learning_rate),
-            loss = tf.keras.losses.CategoricalCrossentropy(),
-            metrics = ["accuracy"]
+        self._compile()
+
+        # Measures images/sec and step time per epoch for the selected configuration
+        throughput = ThroughputCallback(
+            self.config.params_batch_size, self.config.params_input_pipeline, self._run_labels()
         )
 
+        # Resume from the last checkpoint (weights + optimizer state) if a previous run was interrupted
+        checkpoint_dir = self.config.checkpoint_dir
+        initial_epoch = ResumableCheckpoint.restore(self.model, checkpoint_dir, self._checkpoint_params())
+
         # Start the training process
         self.model.fit(
             self.train_generator,
             epochs=self.config.params_epochs,
+            initial_epoch=initial_epoch,
             steps_per_epoch=self.steps_per_epoch,
             validation_steps=self.validation_steps,
-            validation_data=self.valid_generator
+            validation_data=self.valid_generator,
+            callbacks=[throughput] + self._training_callbacks(checkpoint_dir)
+        )
+        save_json(path=self.config.throughput_report_path, data=throughput.report())
+
+        # Save the finalized model after training is complete, with its label map
+        self.save_model(
+            path=self.config.trained_model_path,
+            model=self.model
+        )
+        self.save_class_indices()
+        ResumableCheckpoint.clear(checkpoint_dir)
+
+
+    def cached_features(self, feature_layer: str = "block5_pool"):
+        """
+        Splits the dataset like the other pipelines and returns the cached frozen-base
+        features of every image (training rows first, validation rows after).
+        Only new or changed images go through the base model.
+
+        Returns:
+            tuple: (features memmap, training labels, validation labels, class names).
+        """
+        feature_output = self.model.get_layer(feature_layer)
+        head_start = self.model.layers.index(feature_output) + 1
+        if any(layer.trainable and layer.weights for layer in self.model.layers[:head_start]):
+            raise ValueError("Bottleneck training requires a fully frozen base model (freeze_all=True)")
+
+        # 1. Same VALIDATION_SPLIT as the other pipelines; training rows first, validation rows after
+        train_files, train_labels, class_names = list_image_files(
+            self.config.training_data, validation_split=self.config.params_validation_split, subset="training"
+        )
+        valid_files, valid_labels, _ = list_image_files(
+            self.config.training_data, validation_split=self.config.params_validation_split, subset="validation"
+        )
+        self.train_samples = len(train_files)
+        self.valid_samples = len(valid_files)
+        self.class_indices = {name: index for index, name in enumerate(class_names)}
+
+        # 2. Run the frozen base once (only new/changed images are recomputed)
+        base = tf.keras.models.Model(inputs=self.model.input, outputs=feature_output.output)
+        cache = FeatureCache(
+            cache_dir=self.config.feature_cache_dir,
+            feature_model=base,
+            image_size=self.config.params_image_size[:-1],
+            batch_size=self.config.params_batch_size,
+            model_key={"weights": self.config.params_weights, "precision_policy": self.config.params_precision_policy}
+        )
+        features = cache.features_for(train_files + valid_files)
+        return features, train_labels, valid_labels, class_names
+
+
+    def train_on_cached_features(self, feature_layer: str = "block5_pool"):
+        """
+        Bottleneck training: trains only the classification head on cached base-model features.
+
+        Because every VGG16 layer is frozen, the convolutional stack is run once over
+        the dataset (see FeatureCache) and each epoch then only touches the
+        Flatten + Dense head. The head layers are the same layer objects as in the
+        full model, so once the head is trained the full model already carries the
+        new weights and is saved as the usual 'model.h5'.
+        """
+        head_start = self.model.layers.index(self.model.get_layer(feature_layer)) + 1
+
+        if self.config.params_is_augmentation:
+            logging.warning("AUGMENTATION is ignored in bottleneck mode: features are computed once per image")
+
+        # 1-2. Split the dataset and fetch the cached frozen-base features
+        features, train_labels, valid_labels, class_names = self.cached_features(feature_layer)
+
+        # 3. Rebuild the head on top of a feature-shaped input, sharing the layers of the full model
+        head_input = tf.keras.Input(shape=features.shape[1:])
+        x = head_input
+        for layer in self.model.layers[head_start:]:
+            x = layer(x)
+        head = tf.keras.models.Model(inputs=head_input, outputs=x)
+        head.compile(
+            optimizer=tf.keras.optimizers.SGD(learning_rate=self.config.params_learning_rate),
+            loss=tf.keras.losses.CategoricalCrossentropy(),
+            metrics=["accuracy"],
+            jit_compile=self.config.params_jit_compile
+        )
+
+        num_classes = len(class_names)
+        batch_size = self.config.params_batch_size
+        train_seq = CachedFeatureSequence(
+            features[:self.train_samples], np.asarray(train_labels), num_classes, batch_size, shuffle=True
+        )
+        valid_seq = CachedFeatureSequence(
+            features[self.train_samples:], np.asarray(valid_labels), num_classes, batch_size, shuffle=False
+        )
+
+        throughput = ThroughputCallback(batch_size, "bottleneck", self._run_labels())
+        checkpoint_dir = Path(self.config.checkpoint_dir) / "head"
+        initial_epoch = ResumableCheckpoint.restore(head, checkpoint_dir, self._checkpoint_params())
+        head.fit(
+            train_seq,
+            epochs=self.config.params_epochs,
+            initial_epoch=initial_epoch,
+            validation_data=valid_seq,
+            callbacks=[throughput] + self._training_callbacks(checkpoint_dir)
         )
+        save_json(path=self.config.throughput_report_path, data=throughput.report())
 
-        # Save the finalized model after training is complete
+        # 4. The head weights live in the full VGG16 model too: save it as usual
         self.save_model(
             path=self.config.trained_model_path,
             model=self.model
         )
+        self.save_class_indices()
+        ResumableCheckpoint.clear(checkpoint_dir)
@@ -1,7 +1,8 @@
 import os
 from src.Classifier.constants import *
 from src.Classifier.utils.common import read_yaml, create_directories
-from src.Classifier.entity.config_entity import (DataIngestionConfig, PrepareBaseModelConfig, TrainingConfig, EvaluationConfig)
+from src.Classifier.entity.config_entity import (DataIngestionConfig, DataShardingConfig, PrepareBaseModelConfig, TrainingConfig, EvaluationConfig,
+                                                  SweepConfig, ModelExportConfig, PredictionConfig, TrainingJobsConfig)
 class ConfigurationManager:
     """
     CONFIGURATION MANAGER
@@ -37,11 +38,37 @@ class ConfigurationManager:
             root_dir=Path(config.root_dir),
             source_URL=config.source_URL,
             local_data_file=Path(config.local_data_file),
-            unzip_dir=Path(config.unzip_dir)
+            unzip_dir=Path(config.unzip_dir),
+            source_sha256=config.source_sha256,
+            extract_workers=config.extract_workers,
+            extract_resize=config.extract_resize
         )
         
         return data_ingestion_config
 
+    def get_data_sharding_config(self) -> DataShardingConfig:
+        """
+        Extracts data sharding configuration and return DataShardingConfig object.
+        The shards are built from the dataset extracted by the data ingestion stage.
+        """
+        config = self.config.data_sharding
+
+        # Ensure the directory for storing the shards exists
+        create_directories([config.root_dir])
+
+        data_sharding_config = DataShardingConfig(
+            root_dir=Path(config.root_dir),
+            index_file=Path(config.index_file),
+            source_data=Path(os.path.join(self.config.data_ingestion.unzip_dir, "kidney-ct-scan-image")),
+            images_per_shard=config.images_per_shard,
+            num_workers=config.num_workers,
+            params_validation_split=self.params.VALIDATION_SPLIT,
+            params_image_size=self.params.IMAGE_SIZE,
+            params_input_pipeline=self.params.INPUT_PIPELINE
+        )
+
+        return data_sharding_config
+
     def get_prepare_base_model_config(self) -> PrepareBaseModelConfig:
         """
         Extracts prepare base model configuration and return PrepareBaseModelConfig object.
@@ -61,7 +88,9 @@ class ConfigurationManager:
             params_learning_rate=self.params.LEARNING_RATE,
             params_include_top=self.params.INCLUDE_TOP,
             params_weights=self.params.WEIGHTS,
-            params_classes=self.params.CLASSES
+            params_classes=self.params.CLASSES,
+            params_precision_policy=self.params.PRECISION_POLICY,
+            params_jit_compile=self.params.JIT_COMPILE
         )
 
         return prepare_base_model_config
@@ -86,13 +115,35 @@ class ConfigurationManager:
         training_config = TrainingConfig(
             root_dir=Path(training.root_dir),
             trained_model_path=Path(training.trained_model_path),
+            class_indices_path=Path(training.class_indices_path),
             updated_base_model_path=Path(prepare_base_model.updated_base_model_path),
             training_data=Path(training_data),
             params_epochs=params.EPOCHS,
             params_batch_size=params.BATCH_SIZE,
             params_is_augmentation=params.AUGMENTATION,
             params_image_size=params.IMAGE_SIZE,
-            params_learning_rate=params.LEARNING_RATE
+            params_learning_rate=params.LEARNING_RATE,
+            params_validation_split=params.VALIDATION_SPLIT,
+            validation_cache_path=Path(training.validation_cache_path),
+            throughput_report_path=Path(training.throughput_report_path),
+            params_input_pipeline=params.INPUT_PIPELINE,
+            params_validation_cache=params.VALIDATION_CACHE,
+            feature_cache_dir=Path(training.feature_cache_dir),
+            params_training_mode=params.TRAINING_MODE,
+            shard_index_file=Path(self.config.data_sharding.index_file),
+            params_precision_policy=params.PRECISION_POLICY,
+            params_weights=params.WEIGHTS,
+            params_jit_compile=params.JIT_COMPILE,
+            checkpoint_dir=Path(training.checkpoint_dir),
+            params_checkpoint_freq=params.CHECKPOINT_FREQ,
+            params_early_stopping=params.EARLY_STOPPING,
+            params_early_stopping_monitor=params.EARLY_STOPPING_MONITOR,
+            params_early_stopping_patience=params.EARLY_STOPPING_PATIENCE,
+            profile_report_path=Path(training.profile_report_path),
+            profile_trace_dir=Path(training.profile_trace_dir),
+            params_profile=params.PROFILE,
+            params_profile_steps=params.PROFILE_STEPS,
+            params_profile_trace_steps=params.PROFILE_TRACE_STEPS
         )
 
         return training_config
@@ -101,8 +152,13 @@ class ConfigurationManager:
     def get_evaluation_config(self) -> EvaluationConfig:
         """
         Extracts evaluation configuration and return EvaluationConfig object.
-        Maps the model path, data path, and MLflow URI for experiment tracking.
+        Maps the model path, data path, saved predictions and MLflow URI for experiment tracking.
         """
+        config = self.config.evaluation
+
+        # Ensure the directory for the saved predictions exists
+        create_directories([config.root_dir])
+
         eval_config = EvaluationConfig(
             path_of_model="artifacts/training/model.h5", # Pointing to the latest trained model
             training_data="artifacts/data_ingestion/kidney-ct-scan-image", # Dataset for validation
@@ -110,7 +166,130 @@ class ConfigurationManager:
             mlflow_uri="https://dagshub.com/ayukhanalsh100/kidney_disease_classification_project.mlflow",
             all_params=self.params, # Passing hyperparameters to log them in MLflow
             params_image_size=self.params.IMAGE_SIZE,
-            params_batch_size=self.params.BATCH_SIZE
+            params_batch_size=self.params.BATCH_SIZE,
+            shard_index_file=Path(self.config.data_sharding.index_file),
+            params_input_pipeline=self.params.INPUT_PIPELINE,
+            root_dir=Path(config.root_dir),
+            probabilities_path=Path(config.probabilities_path),
+            labels_path=Path(config.labels_path),
+            params_validation_split=self.params.VALIDATION_SPLIT,
+            calibration_bins=config.calibration_bins
         )
         return eval_config
 
+
+    def get_sweep_config(self) -> SweepConfig:
+        """
+        Extracts hyperparameter sweep configuration and return SweepConfig object.
+        The search space comes from the SWEEP section of params.yaml.
+        """
+        config = self.config.sweep
+        sweep = self.params.SWEEP
+
+        # Ensure the directory for the sweeps exists
+        create_directories([config.root_dir])
+
+        sweep_config = SweepConfig(
+            root_dir=Path(config.root_dir),
+            max_workers=config.max_workers,
+            threads_per_trial=config.threads_per_trial,
+            metric=config.metric,
+            mlflow_uri=config.mlflow_uri,
+            params_strategy=sweep.STRATEGY,
+            params_num_trials=sweep.NUM_TRIALS,
+            params_seed=sweep.SEED,
+            params_space=sweep.SPACE,
+            params_training_mode=self.params.TRAINING_MODE
+        )
+
+        return sweep_config
+
+
+    def get_model_export_config(self) -> ModelExportConfig:
+        """
+        Extracts model export configuration and return ModelExportConfig object.
+        The exported model is the one produced by the training stage.
+        """
+        config = self.config.model_export
+
+        # Ensure the directory for the exported models exists
+        create_directories([config.root_dir])
+
+        model_export_config = ModelExportConfig(
+            root_dir=Path(config.root_dir),
+            path_of_model=Path(self.config.training.trained_model_path),
+            saved_model_dir=Path(config.saved_model_dir),
+            tflite_model_path=Path(config.tflite_model_path),
+            report_path=Path(config.report_path),
+            training_data=Path(os.path.join(self.config.data_ingestion.unzip_dir, "kidney-ct-scan-image")),
+            num_threads=config.num_threads,
+            params_image_size=self.params.IMAGE_SIZE,
+            params_quantization=self.params.EXPORT_QUANTIZATION,
+            params_calibration_samples=self.params.CALIBRATION_SAMPLES,
+            params_validation_split=self.params.VALIDATION_SPLIT
+        )
+
+        return model_export_config
+
+
+    def get_prediction_config(self) -> PredictionConfig:
+        """
+        Extracts prediction (serving) configuration and return PredictionConfig object.
+        Maps the deployed model path, the request batching, caching, upload and the multi-image settings.
+        """
+        config = self.config.prediction
+        batching = config.batching
+
+        prediction_config = PredictionConfig(
+            model_path=Path(config.model_path),
+            tflite_threads=config.tflite_threads,
+            load_mode=config.load_mode,
+            params_image_size=self.params.IMAGE_SIZE,
+            batching_enabled=batching.enabled,
+            max_batch_size=batching.max_batch_size,
+            max_wait_ms=batching.max_wait_ms,
+            max_queue_size=batching.max_queue_size,
+            bulk_chunk_size=config.bulk.chunk_size,
+            bulk_decode_workers=config.bulk.decode_workers,
+            hot_reload_enabled=config.hot_reload.enabled,
+            watch_path=Path(config.hot_reload.watch_path),
+            poll_seconds=config.hot_reload.poll_seconds,
+            cache_enabled=config.cache.enabled,
+            cache_max_entries=config.cache.max_entries,
+            cache_disk_dir=Path(config.cache.disk_dir) if config.cache.disk_dir else None,
+            cache_disk_max_age_days=config.cache.disk_max_age_days,
+            max_upload_bytes=int(config.upload.max_mb * 1024 * 1024),
+            upload_chunk_bytes=int(config.upload.chunk_kb * 1024),
+            upload_keep_bytes=int(config.upload.keep_mb * 1024 * 1024),
+            worker_pool_enabled=config.worker_pool.enabled,
+            pool_workers=config.worker_pool.workers,
+            pool_threads_per_worker=config.worker_pool.threads_per_worker,
+            pool_max_batch_size=config.worker_pool.max_batch_size,
+            pool_max_queue_size=config.worker_pool.max_queue_size,
+            pool_timeout_s=config.worker_pool.timeout_s,
+            inference_workers=config.async_serving.inference_workers,
+            max_pending_inferences=config.async_serving.max_pending
+        )
+
+        return prediction_config
+
+
+    def get_training_jobs_config(self) -> TrainingJobsConfig:
+        """
+        Extracts the background training job configuration and return TrainingJobsConfig object.
+        """
+        config = self.config.training_jobs
+
+        # Ensure the directory for job logs exists
+        create_directories([config.log_dir])
+
+        training_jobs_config = TrainingJobsConfig(
+            log_dir=Path(config.log_dir),
+            command=config.command,
+            niceness=config.niceness,
+            cpu_affinity=config.cpu_affinity,
+            num_threads=config.num_threads,
+            max_jobs=config.max_jobs
+        )
+
+        return training_jobs_config
@@ -11,6 +11,25 @@ class DataIngestionConfig:
     source_URL: str       # URL from which the data will be downloaded
     local_data_file: Path # Path where the downloaded zip file will be saved
     unzip_dir: Path       # Directory where the zip file will be extracted
+    source_sha256: str = None  # Expected SHA-256 of the zip; an existing matching file is never downloaded again
+    extract_workers: int = 8   # Threads used to extract changed zip members
+    extract_resize: list = None # Optional (width, height) images are downscaled to during extraction
+
+
+@dataclass(frozen=True)
+class DataShardingConfig:
+    """
+    Configuration for the data sharding component.
+    Defines where the pre-resized shard files are written and how large they are.
+    """
+    root_dir: Path                # Directory holding the shard files
+    index_file: Path              # JSON index listing the shards of each subset
+    source_data: Path             # Extracted dataset (class-per-folder images)
+    images_per_shard: int         # Number of images packed into one shard file
+    num_workers: int              # Threads decoding/resizing images in parallel
+    params_validation_split: float  # Fraction of each class written to the 'validation' shards
+    params_image_size: list       # Resolution images are resized to (e.g., [224, 224, 3])
+    params_input_pipeline: str    # Shards are only written when this is 'shards'
 
 
 @dataclass(frozen=True)
@@ -27,6 +46,8 @@ class PrepareBaseModelConfig:
     params_include_top: bool       # Whether to include the original fully-connected top layer of the pre-trained model
     params_weights: str            # Specifies the pre-trained weights to use (e.g., "imagenet")
     params_classes: int            # Number of output classes for our classification task
+    params_precision_policy: str   # Keras dtype policy: 'float32', 'mixed_bfloat16' or 'mixed_float16'
+    params_jit_compile: bool       # Compile the model with XLA (jit_compile=True)
 
 
 @dataclass(frozen=True)
@@ -40,6 +61,7 @@ class TrainingConfig:
     """
     root_dir: Path                # Directory where training logs and results are saved
     trained_model_path: Path      # Full path (including filename) to save the final trained .h5 model
+    class_indices_path: Path      # {class name: output index} label map saved next to the trained model
     updated_base_model_path: Path # Path to the custom base model (the one with your added top layers)
     training_data: Path           # Folder containing the dataset (e.g., 'Normal' and 'Tumor' subfolders)
     params_epochs: int            # How many times the model sees the entire dataset
@@ -47,6 +69,27 @@ class TrainingConfig:
     params_is_augmentation: bool  # Toggle for 'Data Augmentation' to help prevent overfitting
     params_image_size: list       # Image resolution as defined in params.yaml (e.g., [224, 224, 3])
     params_learning_rate: float   # The step size for the optimizer during weight updates
+    params_validation_split: float  # Fraction of each class held out for validation (VALIDATION_SPLIT)
+    validation_cache_path: Path   # File prefix used when the tf.data validation set is cached on disk
+    throughput_report_path: Path  # JSON report of input images/sec per epoch
+    params_input_pipeline: str    # 'generator' (ImageDataGenerator), 'tf_data' (parallel tf.data pipeline) or 'shards'
+    params_validation_cache: str  # tf.data only: cache resized validation images in 'memory', on 'disk' or 'none'
+    feature_cache_dir: Path       # Where frozen-base (block5_pool) features are cached
+    params_training_mode: str     # 'end_to_end' (full model every epoch) or 'bottleneck' (train the head on cached features)
+    shard_index_file: Path        # Index of the pre-resized shards (INPUT_PIPELINE: shards)
+    params_precision_policy: str  # Keras dtype policy (must match the one used to prepare the base model)
+    params_weights: str           # Pre-trained weights of the base model (e.g., 'imagenet'); part of the feature cache key
+    params_jit_compile: bool      # Compile the training step with XLA
+    checkpoint_dir: Path          # Last checkpoint (model + optimizer state) used to resume interrupted runs
+    params_checkpoint_freq: object         # 'epoch' or a number of steps between checkpoints
+    params_early_stopping: bool            # Stop once the monitored metric stops improving
+    params_early_stopping_monitor: str     # Metric watched by early stopping (e.g., 'val_loss')
+    params_early_stopping_patience: int    # Epochs without improvement before stopping
+    profile_report_path: Path              # JSON report written by the profiling mode
+    profile_trace_dir: Path                # TensorFlow profiler trace (TensorBoard logdir)
+    params_profile: bool                   # Profile PROFILE_STEPS steps before training
+    params_profile_steps: int              # Number of steps measured in profiling mode
+    params_profile_trace_steps: list       # [first, last] step of the profiler trace; empty = no trace
 
 
 @dataclass(frozen=True)
@@ -60,4 +103,97 @@ class EvaluationConfig:
     all_params: dict        # All hyperparameters from params.yaml for logging purposes
     mlflow_uri: str         # Remote URI for MLflow (e.g., DagsHub tracking URL)
     params_image_size: list # Expected image resolution
-    params_batch_size: int  # Number of images to process in each evaluation batch
\ No newline at end of file
+    params_batch_size: int  # Number of images to process in each evaluation batch
+    shard_index_file: Path  # Index of the pre-resized shards (INPUT_PIPELINE: shards)
+    params_input_pipeline: str # 'shards' streams the validation shards instead of reading JPEGs
+    root_dir: Path          # Directory holding the saved predictions
+    probabilities_path: Path # Softmax outputs of the validation split (.npy)
+    labels_path: Path       # True labels of the validation split (.npy)
+    params_validation_split: float # Fraction of each class used for validation (VALIDATION_SPLIT, same as training)
+    calibration_bins: int   # Confidence bins used for the calibration metrics
+
+@dataclass(frozen=True)
+class SweepConfig:
+    """
+    Configuration for the hyperparameter sweep runner.
+    Defines the search space and how trials share the machine.
+    """
+    root_dir: Path                # Parent directory of every sweep
+    max_workers: int              # Trials trained concurrently
+    threads_per_trial: int        # Cores/threads given to each trial (None = split all cores evenly)
+    metric: str                   # Metric the leaderboard is ranked by
+    mlflow_uri: str               # MLflow tracking URI (None = MLflow default)
+    params_strategy: str          # 'grid' or 'random'
+    params_num_trials: int        # Number of random draws (random search only)
+    params_seed: int              # Seed of the random search
+    params_space: dict            # {params.yaml key: list of values or {low, high, log}}
+    params_training_mode: str     # Default TRAINING_MODE for trials that do not sweep it
+
+
+@dataclass(frozen=True)
+class ModelExportConfig:
+    """
+    Configuration for the model export component.
+    Defines where the inference formats are written and how the TFLite model is quantized.
+    """
+    root_dir: Path                # Directory holding every exported artifact
+    path_of_model: Path           # Trained .h5 model to export
+    saved_model_dir: Path         # Inference-only SavedModel directory
+    tflite_model_path: Path       # Exported .tflite file
+    report_path: Path             # JSON comparison (size, latency, accuracy) of .h5 vs .tflite
+    training_data: Path           # Dataset; calibration images come from its validation split
+    num_threads: int              # TFLite interpreter threads used in the comparison
+    params_image_size: list       # Expected image resolution (e.g., [224, 224, 3])
+    params_quantization: str      # 'none', 'dynamic' (int8 weights) or 'int8' (weights and activations)
+    params_calibration_samples: int  # Images used to calibrate 'int8' and to compare both models
+    params_validation_split: float   # Validation split the calibration images are drawn from
+
+
+@dataclass(frozen=True)
+class PredictionConfig:
+    """
+    Configuration for the serving (prediction) side of the project.
+    Defines which model is served, how concurrent requests are batched and cached.
+    """
+    model_path: Path              # Path to the deployed .h5 (or .tflite) model used by the web app
+    tflite_threads: int           # Interpreter threads when a .tflite model is served
+    load_mode: str                # 'preload' (at startup) or 'lazy' (on first request)
+    params_image_size: list       # Expected image resolution (e.g., [224, 224, 3])
+    batching_enabled: bool        # Group concurrent requests into one model.predict call
+    max_batch_size: int           # Largest batch handed to the model at once
+    max_wait_ms: float            # Longest time a request waits for others to join its batch
+    max_queue_size: int           # Bound on queued requests (back-pressure)
+    bulk_chunk_size: int          # Images per model call for multi-image requests
+    bulk_decode_workers: int      # Threads used to decode/resize multi-image requests
+    hot_reload_enabled: bool      # Watch 'watch_path' and swap in new models without a restart
+    watch_path: Path              # Model file watched for new versions
+    poll_seconds: float           # Seconds between two checks of 'watch_path'
+    cache_enabled: bool           # Reuse the probabilities of images already classified
+    cache_max_entries: int        # In-memory LRU size (per worker)
+    cache_disk_dir: Path          # Shared on-disk cache (None = memory only)
+    cache_disk_max_age_days: float  # Disk entries of versions unused this long are removed
+    max_upload_bytes: int         # Largest request body accepted
+    upload_chunk_bytes: int       # Chunk size used to stream raw/multipart uploads
+    upload_keep_bytes: int        # Largest upload buffer a thread keeps for reuse
+    worker_pool_enabled: bool     # Run decode + model in pinned worker processes
+    pool_workers: int             # Number of worker processes
+    pool_threads_per_worker: int  # Cores/intra-op threads per worker (None = even split)
+    pool_max_batch_size: int      # Largest batch a worker runs at once
+    pool_max_queue_size: int      # Bound on images in flight across the workers
+    pool_timeout_s: float         # Longest wait for a worker's result
+    inference_workers: int        # Inference threads of the asyncio server
+    max_pending_inferences: int   # Requests the asyncio server queues before answering 429
+
+
+@dataclass(frozen=True)
+class TrainingJobsConfig:
+    """
+    Configuration for the background training job runner behind /train.
+    Defines the command that is run and how its CPU usage is limited.
+    """
+    log_dir: Path                 # One log file per job is written here
+    command: str                  # Command line of a training run (e.g., 'dvc repro')
+    niceness: int                 # Added to the process niceness (higher = lower priority)
+    cpu_affinity: list            # Cores the training process may run on (None = any)
+    num_threads: int              # Thread limit for TF/OpenMP in the training process (None = no limit)
+    max_jobs: int                 # Finished jobs kept on disk; older ones are deleted
@@ -0,0 +1,169 @@
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+
+import numpy as np
+
+from src.logger import logging
+
+
+class BatcherStats:
+    """
+    Thread-safe counters describing how the micro-batcher is behaving.
+
+    Records the distribution of flushed batch sizes and how long each request
+    waited in the queue, which is what we need to tune max_batch_size and
+    max_wait_ms against p99 latency.
+    """
+    def __init__(self, window: int = 10000):
+        """
+        Args:
+            window (int): How many of the most recent queue-wait samples to keep for percentiles.
+        """
+        self._lock = threading.Lock()
+        self.batch_sizes = Counter()
+        self.queue_waits_ms = deque(maxlen=window)
+        self.batches = 0
+        self.requests = 0
+        self.rejected = 0
+
+    def record_batch(self, size: int, waits_ms: list):
+        with self._lock:
+            self.batches += 1
+            self.requests += size
+            self.batch_sizes[size] += 1
+            self.queue_waits_ms.extend(waits_ms)
+
+    def record_rejected(self):
+        with self._lock:
+            self.rejected += 1
+
+    def snapshot(self) -> dict:
+        """
+        Returns a JSON-serialisable summary of the counters.
+        """
+        with self._lock:
+            waits = np.asarray(self.queue_waits_ms, dtype="float64")
+            sizes = dict(sorted(self.batch_sizes.items()))
+            summary = {
+                "batches": self.batches,
+                "requests": self.requests,
+                "rejected": self.rejected,
+                "mean_batch_size": (self.requests / self.batches) if self.batches else 0.0,
+                "batch_size_histogram": {str(k): v for k, v in sizes.items()},
+            }
+        if waits.size:
+            p50, p90, p99 = np.percentile(waits, [50, 90, 99])
+            summary["queue_wait_ms"] = {
+                "p50": float(p50), "p90": float(p90), "p99": float(p99), "max": float(waits.max())
+            }
+        else:
+            summary["queue_wait_ms"] = {}
+        return summary
+
+
+class MicroBatcher:
+    """
+    DYNAMIC MICRO-BATCHING
+    ----------------------
+    Queues single-image requests coming from concurrent web workers and hands
+    them to the model in one batch. A batch is flushed when either
+    'max_batch_size' requests are waiting or the oldest request has waited
+    'max_wait_ms'. Each caller gets a Future that resolves to its own row of
+    the model output.
+
+    VGG16 on CPU is much cheaper per image at batch 8-32 than at batch 1, so
+    under load this trades a few milliseconds of queueing for throughput.
+    """
+    _STOP = object()
+
+    def __init__(self, predict_fn, max_batch_size: int = 16, max_wait_ms: float = 10, max_queue_size: int = 256):
+        """
+        Args:
+            predict_fn (callable): Maps a (N, H, W, C) array to an (N, classes) array,
+                e.g. 'PredictionPipeline.predict_proba'.
+            max_batch_size (int): Largest batch handed to 'predict_fn'.
+            max_wait_ms (float): Longest time the oldest queued request waits before a flush.
+            max_queue_size (int): Requests beyond this bound are rejected with 'queue.Full'.
+        """
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.stats = BatcherStats()
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, tensor: np.ndarray) -> Future:
+        """
+        Queues one preprocessed image (H, W, C) for the next batch.
+
+        Returns:
+            Future: Resolves to the model output row for this image.
+
+        Raises:
+            queue.Full: If the queue is at capacity (caller should shed load).
+        """
+        future = Future()
+        try:
+            self._queue.put_nowait((tensor, future, time.perf_counter()))
+        except queue.Full:
+            self.stats.record_rejected()
+            raise
+        return future
+
+    def predict(self, tensor: np.ndarray, timeout: float = None) -> np.ndarray:
+        """
+        Convenience wrapper: submit one image and block until its result is ready.
+        """
+        return self.submit(tensor).result(timeout=timeout)
+
+    def close(self):
+        """
+        Stops the background worker after the already queued requests are served.
+        """
+        self._queue.put(self._STOP)
+        self._worker.join()
+
+    def _collect(self, first):
+        """
+        Gathers more requests behind 'first' until the batch is full or the deadline passes.
+        """
+        batch = [first]
+        deadline = first[2] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is self._STOP:
+                # Re-queue the sentinel so the run loop stops after this batch
+                self._queue.put(item)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is self._STOP:
+                return
+            batch = self._collect(first)
+
+            tensors, futures, enqueued = zip(*batch)
+            started = time.perf_counter()
+            self.stats.record_batch(len(batch), [(started - t) * 1000.0 for t in enqueued])
+
+            try:
+                outputs = self.predict_fn(np.stack(tensors))
+            except Exception as e:
+                logging.exception(e)
+                for future in futures:
+                    future.set_exception(e)
+                continue
+
+            for future, output in zip(futures, outputs):
+                future.set_result(output)
@@ -0,0 +1,85 @@
+import queue
+import asyncio
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from src.logger import logging
+
+
+class InferenceExecutor:
+    """
+    BOUNDED INFERENCE EXECUTOR
+    --------------------------
+    Runs the CPU-bound part of a request (Base64/image decode, resize, model
+    call) for the asyncio server on a small dedicated thread pool, so the event
+    loop only ever does request I/O.
+
+    At most 'max_workers' jobs run at once (TensorFlow already spreads one
+    forward pass over several cores) and at most 'max_pending' wait for a
+    thread. Beyond that 'run' raises 'queue.Full' immediately, so an overloaded
+    server answers HTTP 429 instead of building an unbounded backlog.
+    """
+    def __init__(self, max_workers: int = 2, max_pending: int = 64):
+        """
+        Args:
+            max_workers (int): Inference threads.
+            max_pending (int): Jobs allowed to wait for a free thread.
+        """
+        self.max_workers = max(1, int(max_workers))
+        self.max_pending = max(0, int(max_pending))
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_pending)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _release(self, future):
+        with self._lock:
+            self.in_flight -= 1
+            if future is not None:
+                self.completed += 1
+        self._slots.release()
+
+    async def run(self, fn, *args):
+        """
+        Runs 'fn(*args)' on an inference thread and waits for it without blocking the event loop.
+
+        The job keeps the caller's context (e.g., the request id used in log lines).
+        If the awaiting request is cancelled (client gone), a job that has not
+        started yet is dropped.
+
+        Raises:
+            queue.Full: If 'max_workers + max_pending' jobs are already admitted.
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise queue.Full
+        with self._lock:
+            self.in_flight += 1
+        try:
+            future = self._pool.submit(contextvars.copy_context().run, fn, *args)
+        except BaseException:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self):
+        """
+        Stops accepting jobs and waits for the running ones.
+        """
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        logging.info(f"Inference executor stopped: {self.snapshot()}")
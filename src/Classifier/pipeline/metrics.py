@@ -0,0 +1,121 @@
+"""
+SERVICE METRICS
+---------------
+Prometheus metrics of the prediction service, exposed by the /metrics route.
+
+- kidney_http_requests_total{route, method, status}      request counter
+- kidney_http_request_seconds{route}                     end-to-end latency histogram
+- kidney_http_requests_in_flight{route}                  requests being served right now
+- kidney_request_phase_seconds{route, phase}             where a request spends its time:
+      base64_decode (JSON) or body_read (raw/multipart upload), cache_lookup,
+      image_decode (decode + resize),
+      model (forward pass, including the micro-batch queue wait), serialization
+- kidney_model_forward_seconds{model_version}            time of the actual model calls
+- kidney_model_batch_size                                images per model call
+- kidney_model_info{model_version}                       1 for the version being served
+
+Under gunicorn (several worker processes) set PROMETHEUS_MULTIPROC_DIR to an
+empty directory before starting; every worker then writes its samples there
+and /metrics aggregates all workers.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from prometheus_client import (Counter, Gauge, Histogram, CollectorRegistry, REGISTRY,
+                               CONTENT_TYPE_LATEST, generate_latest)
+
+
+# Latency buckets (seconds) sized for a CPU VGG16: sub-ms decode phases up to multi-second queues
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUESTS = Counter(
+    "kidney_http_requests_total", "HTTP requests served", ["route", "method", "status"]
+)
+REQUEST_LATENCY = Histogram(
+    "kidney_http_request_seconds", "End-to-end request latency", ["route"], buckets=LATENCY_BUCKETS
+)
+IN_FLIGHT = Gauge(
+    "kidney_http_requests_in_flight", "Requests currently being served", ["route"], multiprocess_mode="livesum"
+)
+PHASE_LATENCY = Histogram(
+    "kidney_request_phase_seconds", "Time spent in each phase of a request", ["route", "phase"], buckets=LATENCY_BUCKETS
+)
+FORWARD_LATENCY = Histogram(
+    "kidney_model_forward_seconds", "Duration of one model call", ["model_version"], buckets=LATENCY_BUCKETS
+)
+FORWARD_BATCH_SIZE = Histogram(
+    "kidney_model_batch_size", "Images per model call", buckets=(1, 2, 4, 8, 16, 32, 64, 128)
+)
+MODEL_INFO = Gauge(
+    "kidney_model_info", "Model version currently served (value is 1)", ["model_version"], multiprocess_mode="liveall"
+)
+
+
+@contextmanager
+def phase(route: str, name: str):
+    """
+    Times the enclosed block as phase 'name' of a request to 'route'.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        PHASE_LATENCY.labels(route, name).observe(time.perf_counter() - start)
+
+
+def timed_forward(predict_fn, version_fn):
+    """
+    Wraps a model call (e.g., PredictionPipeline.predict_proba) so every call is timed.
+
+    Args:
+        predict_fn: Function taking a (N, H, W, 3) batch and returning probabilities.
+        version_fn: Function returning the model version served at call time.
+    """
+    def predict(batch, *args):
+        start = time.perf_counter()
+        output = predict_fn(batch, *args)
+        FORWARD_LATENCY.labels(version_fn()).observe(time.perf_counter() - start)
+        FORWARD_BATCH_SIZE.observe(len(batch))
+        return output
+    return predict
+
+
+_served_version = None
+
+
+def set_model_version(version: str):
+    """
+    Marks 'version' as the served model (model swap callback).
+    """
+    global _served_version
+    if _served_version is not None and _served_version != version:
+        # Zero first: in multiprocess mode 'remove' does not reach the other workers' files
+        MODEL_INFO.labels(_served_version).set(0)
+        MODEL_INFO.remove(_served_version)
+    MODEL_INFO.labels(version).set(1)
+    _served_version = version
+
+
+def request_started(route: str):
+    IN_FLIGHT.labels(route).inc()
+
+
+def request_finished(route: str, method: str, status: int, seconds: float):
+    IN_FLIGHT.labels(route).dec()
+    REQUESTS.labels(route, method, str(status)).inc()
+    REQUEST_LATENCY.labels(route).observe(seconds)
+
+
+def render():
+    """
+    Returns (body, content type) of the /metrics response.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
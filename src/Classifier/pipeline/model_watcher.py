@@ -0,0 +1,77 @@
+import os
+import threading
+from src.Classifier.pipeline.served_model import file_version
+from src.logger import logging
+
+
+class ModelWatcher:
+    """
+    Background thread that hot-reloads the served model when its file changes.
+
+    It polls the watched file's size and modification time. Once a change has
+    been stable for one full poll interval (so a model that is still being
+    written is never picked up), it asks the served model (PredictionPipeline,
+    or PooledModel with the worker pool) to load, warm up and swap in the new
+    model. A model that fails to load or warm up is logged and skipped; the
+    current model keeps serving.
+
+    A watched file that already differs from the served model when the watcher
+    starts (e.g., training finished while the server was down) is loaded too.
+    """
+    def __init__(self, pipeline, watch_path, poll_seconds: float = 5.0):
+        """
+        Args:
+            pipeline (ServedModel): The PredictionPipeline / PooledModel whose model is replaced.
+            watch_path (str | Path): Model file to watch (e.g., artifacts/training/model.h5).
+            poll_seconds (float): Seconds between two checks of the file.
+        """
+        self.pipeline = pipeline
+        self.watch_path = watch_path
+        self.poll_seconds = poll_seconds
+        self._stop = threading.Event()
+        self._last_seen = self._signature() if self._serves_watched_file() else None
+        self._thread = threading.Thread(target=self._run, name="model-watcher", daemon=True)
+
+    def _signature(self):
+        try:
+            stat = os.stat(self.watch_path)
+            return stat.st_size, stat.st_mtime
+        except FileNotFoundError:
+            return None
+
+    def _serves_watched_file(self) -> bool:
+        """
+        True if the watched file (or its absence) needs no reload: compares its
+        content hash with the version actually being served.
+        """
+        try:
+            return file_version(self.watch_path) == self.pipeline.model_version
+        except FileNotFoundError:
+            return True
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        pending = None
+        while not self._stop.wait(self.poll_seconds):
+            signature = self._signature()
+            if signature is None or signature == self._last_seen:
+                pending = None
+                continue
+            if signature != pending:
+                # Changed since the last poll: wait until it stops changing
+                pending = signature
+                continue
+
+            self._last_seen, pending = signature, None
+            try:
+                version = self.pipeline.reload_model(self.watch_path)
+                logging.info(f"Hot-reloaded model {self.watch_path} (version {version})")
+            except Exception as e:
+                logging.exception(e)
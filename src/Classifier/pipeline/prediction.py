@@ -1,71 +1,224 @@
+import io
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from tensorflow.keras.models import load_model
 from tensorflow.keras.preprocessing import image
 import os
 import tensorflow as tf
+from src.Classifier.pipeline.served_model import ServedModel
+from src.Classifier.pipeline.tflite_model import TFLiteModel
+from src.Classifier.pipeline.upload import decode_image, RESCALE
 
 
-class PredictionPipeline:
+class PredictionPipeline(ServedModel):
     """
     PREDICTION PIPELINE
     -------------------
-    This class handles the end-to-end process of taking a raw image and 
+    This class handles the end-to-end process of taking a raw image and
     predicting whether it shows a Kidney Tumor or is Normal.
-    
+
     It encapsulates:
-    1. Loading the trained model (.h5 file).
+    1. Loading the trained model (.h5 file, or a .tflite export served by 'TFLiteModel').
     2. Preprocessing the image to match the model's expected input.
     3. Running the prediction and interpreting the result.
+
+    The image can be given as a file path (CLI usage), as raw encoded bytes
+    (e.g., a decoded base64 upload) or as an already decoded NumPy array,
+    so the web app never has to round-trip through a file on disk.
+
+    Versioning, hot swaps ('reload_model' / 'rollback_model'), the label map
+    and the interpretation of the outputs come from 'ServedModel'
+    (served_model.py); this class loads and runs the model in this process.
     """
-    def __init__(self, filename):
+    def __init__(self, filename=None, model_path=os.path.join("model", "model.h5"), image_size=(224, 224),
+                 tflite_threads=4):
         """
         Initializes the pipeline with the path to the image to be classified.
         Loads the pre-trained model once during startup for better performance.
-        
+
         Args:
-            filename (str): The path to the image file (e.g., 'inputImage.jpg').
+            filename (str, optional): The default image file to classify (e.g., 'inputImage.jpg').
+                Only used when 'predict' is called without an explicit image.
+            model_path (str): Path to the trained Keras model.
+            image_size (tuple): (height, width) the model was trained on (224x224 for VGG16).
+            tflite_threads (int): Interpreter threads when a .tflite model is served.
         """
         self.filename = filename
+        self.tflite_threads = tflite_threads
         # Load model once during initialization to improve prediction speed
         # We load the model from the artifacts directory created during the Training stage.
         # This is the 'final' model after weights have been optimized.
-        self.model = load_model(os.path.join("model","model.h5"))
+        super().__init__(model_path, image_size)
+
+
+    def _load_model(self, model_path):
+        """
+        Loads the model file: a .tflite export through 'TFLiteModel', anything else with Keras.
+        """
+        if str(model_path).endswith(".tflite"):
+            return TFLiteModel(model_path, num_threads=self.tflite_threads)
+        return load_model(model_path)
+
+
+    def warm_up(self, state: dict = None):
+        """
+        Runs one prediction on a blank image: builds the inference graph before the
+        model takes traffic and rejects models whose output is not a probability
+        vector with one entry per class of the label map.
+
+        Args:
+            state (dict, optional): Loaded model (see '_load_version') to check; defaults to the one being served.
+        """
+        state = state if state is not None else self._current
+        blank = np.zeros((1,) + self.image_size + (3,), dtype="float32")
+        output = np.asarray(state["model"](blank, training=False))
+        if output.ndim != 2 or output.shape[0] != 1 or not np.all(np.isfinite(output)) \
+                or not np.isclose(output.sum(), 1.0, atol=1e-3):
+            raise ValueError(f"Warm-up prediction failed, got output {output!r}")
+        if output.shape[1] != len(state["class_names"]):
+            raise ValueError(
+                f"Model has {output.shape[1]} outputs but the label map lists {len(state['class_names'])} classes"
+            )
+
+
+    def load_image(self, source=None) -> np.ndarray:
+        """
+        Turns any supported image source into a preprocessed (height, width, 3) float32 array,
+        rescaled to [0, 1] exactly like the images the model was trained on.
+
+        Args:
+            source: One of
+                - None: falls back to 'self.filename'.
+                - str / Path: path to an image file on disk.
+                - bytes / bytearray / memoryview: an encoded image (JPEG, PNG, ...) held in memory.
+                - np.ndarray: an already decoded image (H, W, 3), (H, W) or (1, H, W, 3), pixels in [0, 255].
+
+        Returns:
+            np.ndarray: The image resized to 'self.image_size' with shape (height, width, 3).
+        """
+        if source is None:
+            source = self.filename
+
+        if isinstance(source, (str, Path)):
+            # File-based path (CLI callers): same behaviour as before
+            test_image = image.load_img(source, target_size=self.image_size)
+            return image.img_to_array(test_image) * RESCALE
+
+        if isinstance(source, bytes):
+            # In-memory path: decode the encoded bytes without touching the disk
+            # (BytesIO shares an immutable bytes object instead of copying it)
+            test_image = image.load_img(io.BytesIO(source), target_size=self.image_size)
+            return image.img_to_array(test_image) * RESCALE
+
+        if isinstance(source, (bytearray, memoryview)):
+            # Upload buffer: decode in place (BytesIO would copy the whole body, and
+            # load_img only takes BytesIO); decode_image rescales too
+            return decode_image(source, self.image_size)
+
+        if isinstance(source, np.ndarray):
+            array = source
+            if array.ndim == 4 and array.shape[0] == 1:
+                array = array[0]
+            if array.ndim == 2:
+                array = np.stack([array] * 3, axis=-1)
+            if array.ndim != 3 or array.shape[-1] != 3:
+                raise ValueError(f"Expected an RGB image array, got shape {source.shape}")
+            array = array.astype("float32")
+            if array.shape[:2] != self.image_size:
+                # 'nearest' matches the interpolation used by 'load_img'
+                array = tf.image.resize(array, self.image_size, method="nearest").numpy()
+            return array * RESCALE
+
+        raise TypeError(f"Unsupported image source type: {type(source).__name__}")
+
 
-    
-    def predict(self):
+    def predict_proba(self, batch: np.ndarray, state: dict = None) -> np.ndarray:
+        """
+        Runs the model on an already preprocessed batch of images.
+
+        Used directly by the request batcher, which stacks several requests
+        into a single (N, 224, 224, 3) tensor before calling the model.
+
+        Args:
+            batch (np.ndarray): Preprocessed images with shape (N, height, width, 3).
+            state (dict, optional): Model to use (see 'state'); defaults to the one being served.
+
+        Returns:
+            np.ndarray: Softmax probabilities with shape (N, classes).
+        """
+        model = (state or self._current)["model"]
+        # Calling the model directly avoids the per-call dataset setup of
+        # 'model.predict', which dominates the cost of small serving batches.
+        return np.asarray(model(batch, training=False))
+
+
+    def predict_many(self, sources, chunk_size: int = 32, workers: int = 8, predict_fn=None,
+                     class_names: list = None) -> list:
+        """
+        Classifies many images at once.
+
+        Images are decoded and resized in parallel threads (PIL releases the GIL
+        while doing so) and fed to the model in fixed-size chunks. The next chunk
+        is decoded while the model is busy with the current one, and at most two
+        chunks are held in memory, so thousands of slices can be sent in one call.
+
+        Args:
+            sources (iterable): Images as file paths, encoded bytes or arrays (see 'load_image').
+            chunk_size (int): Number of images per model call.
+            workers (int): Number of decode threads.
+            predict_fn (optional): Replaces 'predict_proba' for the model calls (e.g., a timed wrapper).
+            class_names (list, optional): Labels of the model 'predict_fn' runs; defaults to the served model's.
+
+        Returns:
+            list: One dictionary per input image, in input order.
+        """
+        sources = list(sources)
+        chunk_size = max(1, int(chunk_size))
+        predict_fn = predict_fn or self.predict_proba
+        results = []
+
+        with ThreadPoolExecutor(max_workers=max(1, int(workers))) as pool:
+            def submit_chunk(start):
+                return [pool.submit(self.load_image, source) for source in sources[start:start + chunk_size]]
+
+            pending = submit_chunk(0)
+            for start in range(0, len(sources), chunk_size):
+                current = pending
+                # Start decoding the next chunk before running the model on this one
+                pending = submit_chunk(start + chunk_size)
+
+                batch = np.stack([future.result() for future in current])
+                results.extend(self.interpret_many(predict_fn(batch), class_names))
+
+        return results
+
+
+    def predict(self, source=None):
         """
         Runs the prediction loop: Load -> Preprocess -> Predict -> Interpret.
-        
+
+        Args:
+            source (optional): The image to classify (file path, encoded bytes or array).
+                Defaults to the filename given at construction time.
+
         Returns:
-            list: A list containing a dictionary with the prediction result (e.g., 'Tumor' or 'Normal').
+            list: A list containing a dictionary with the prediction result (e.g., 'Tumor' or 'Normal')
+            and the class probabilities.
         """
-        # Reference the pre-loaded model
-        model = self.model
-
-        # 1. Load the image from the specified path
-        # target_size must match the resolution the model was trained on (224x224 for VGG16)
-        imagename = self.filename
-        test_image = image.load_img(imagename, target_size=(224, 224))
-        
-        # 2. Convert the image (RGB) into a numerical array of pixels
-        test_image = image.img_to_array(test_image)
-        
-        # 3. Expand Dimensions:
-        # Keras expects a "batch" of images. Even for one image, we need to make it 
+        # 1. Load the image (from disk, memory or an array) and convert it into
+        # a numerical array of pixels. target_size must match the resolution
+        # the model was trained on (224x224 for VGG16)
+        test_image = self.load_image(source)
+
+        # 2. Expand Dimensions:
+        # Keras expects a "batch" of images. Even for one image, we need to make it
         # look like a list of images: (224, 224, 3) -> (1, 224, 224, 3)
         test_image = np.expand_dims(test_image, axis=0)
-        
-        # 4. Model Prediction:
-        # model.predict returns probabilities for each class. 
-        # argmax picks the index with the highest probability.
-        result = np.argmax(model.predict(test_image), axis=1)
-        print(f"Prediction index: {result}")
-
-        # 5. Result Interpretation:
-        # In our dataset, we typically map indices to human-readable labels.
-        if result[0] == 1:
-            prediction = 'Tumor'
-            return [{"image": prediction}]
-        else:
-            prediction = 'Normal'
-            return [{"image": prediction}]
\ No newline at end of file
+
+        # 3. Model Prediction:
+        # model.predict returns probabilities for each class.
+        probabilities = self.predict_proba(test_image)
+
+        # 4. Result Interpretation
+        return self.interpret(probabilities[0])
@@ -0,0 +1,193 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from src.logger import logging
+
+
+class PredictionCache:
+    """
+    CONTENT-ADDRESSED PREDICTION CACHE
+    ----------------------------------
+    Remembers the softmax output of images that were already classified, so a
+    resubmitted slice skips JPEG decode, resize and the VGG16 forward pass.
+
+    - Key: SHA-256 of the decoded image bytes + the served model version, so a
+      new model can never answer with an old model's probabilities.
+    - Memory: a bounded LRU, private to each worker process.
+    - Disk (optional): one small JSON file per entry under '<disk_dir>/<model version>/',
+      shared by every worker (and surviving restarts). Files are written to a
+      temporary name and renamed, so readers never see a partial entry.
+    - 'invalidate' is registered as a model swap callback: it empties the LRU and
+      calls 'prune_disk', which removes the disk entries of the versions nobody
+      wrote to for 'disk_max_age_days' (recent ones are kept: another worker may
+      still serve them). The servers also call 'prune_disk' at startup, so the
+      disk store stays bounded even when no model is ever swapped in.
+
+    Probabilities are cached (not the formatted response), so single-image and
+    batch endpoints share entries.
+    """
+    def __init__(self, max_entries: int = 4096, disk_dir: Path = None, disk_max_age_days: float = 7):
+        """
+        Args:
+            max_entries (int): Number of images kept in memory (least recently used are dropped).
+            disk_dir (Path, optional): Shared on-disk store; None keeps the cache in memory only.
+            disk_max_age_days (float): Disk entries of versions not written to for this long are pruned.
+        """
+        self.max_entries = max_entries
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_age_days = disk_max_age_days
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+
+    # Part of every key: bump it when the serving preprocessing changes, so
+    # probabilities computed from differently preprocessed inputs are never reused
+    PREPROCESSING = "rescale-1/255"
+
+    @classmethod
+    def key(cls, image_bytes, model_version: str) -> str:
+        """
+        Cache key of an encoded image for a given model version.
+        """
+        sha = hashlib.sha256(f"{model_version}:{cls.PREPROCESSING}".encode())
+        sha.update(image_bytes)
+        return f"{model_version}-{sha.hexdigest()}"
+
+
+    def _disk_path(self, key: str) -> Path:
+        model_version, digest = key.split("-", 1)
+        return self.disk_dir / model_version / digest[:2] / f"{digest}.json"
+
+
+    def get(self, key: str):
+        """
+        Returns the cached probabilities (np.ndarray, shape (classes,)) or None.
+        """
+        with self._lock:
+            probabilities = self._entries.get(key)
+            if probabilities is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return probabilities
+
+        if self.disk_dir is not None:
+            try:
+                with open(self._disk_path(key)) as f:
+                    probabilities = np.asarray(json.load(f), dtype="float32")
+            except (OSError, ValueError):
+                probabilities = None
+            if probabilities is not None:
+                self._remember(key, probabilities)
+                with self._lock:
+                    self.hits += 1
+                    self.disk_hits += 1
+                return probabilities
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+
+    def _remember(self, key: str, probabilities: np.ndarray):
+        with self._lock:
+            self._entries[key] = probabilities
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+
+    def put(self, key: str, probabilities):
+        """
+        Stores the probabilities of one image.
+        """
+        probabilities = np.array(probabilities, dtype="float32")
+        probabilities.flags.writeable = False     # Shared between requests
+        self._remember(key, probabilities)
+
+        if self.disk_dir is not None:
+            path = self._disk_path(key)
+            try:
+                os.makedirs(path.parent, exist_ok=True)
+                tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+                with open(tmp_path, "w") as f:
+                    json.dump(probabilities.tolist(), f)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logging.warning(f"Could not write prediction cache entry {path}: {e}")
+
+
+    def invalidate(self, model_version: str):
+        """
+        Model swap callback: empties the in-memory LRU (its keys carry the version,
+        so this only frees memory) and prunes the disk entries of stale versions.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+        logging.info(f"Prediction cache invalidated for model version {model_version}")
+        self.prune_disk(keep_version=model_version)
+
+
+    def prune_disk(self, max_age_days: float = None, keep_version: str = None) -> list:
+        """
+        Startup/model swap cleanup: removes the disk entries of model versions that
+        were not written to for 'max_age_days' (an entry's file is written when
+        a prediction is cached, so a version still served keeps fresh files).
+
+        Args:
+            max_age_days (float, optional): Age of the newest entry above which a version
+                is removed; defaults to 'disk_max_age_days'.
+            keep_version (str, optional): Version never removed (e.g., the one being served).
+
+        Returns:
+            list: The removed versions.
+        """
+        if self.disk_dir is None or not self.disk_dir.exists():
+            return []
+        if max_age_days is None:
+            max_age_days = self.disk_max_age_days
+        cutoff = time.time() - max_age_days * 86400
+        removed = []
+        for version_dir in self.disk_dir.iterdir():
+            if not version_dir.is_dir() or version_dir.name == keep_version:
+                continue
+            newest = max((path.stat().st_mtime for path in version_dir.rglob("*.json")), default=0)
+            if newest < cutoff:
+                shutil.rmtree(version_dir, ignore_errors=True)
+                removed.append(version_dir.name)
+        if removed:
+            logging.info(f"Prediction cache: removed disk entries of versions {removed}")
+        return removed
+
+
+    def snapshot(self) -> dict:
+        """
+        Returns a JSON-serialisable summary of the counters.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "disk_dir": str(self.disk_dir) if self.disk_dir else None,
+            }
@@ -0,0 +1,220 @@
+import json
+import time
+import hashlib
+import threading
+import numpy as np
+from pathlib import Path
+from src.logger import logging
+
+
+# Written next to the trained model by the training stage ({class name: output index})
+LABEL_MAP_FILE = "class_indices.json"
+
+
+def file_version(model_path) -> str:
+    """
+    Short content hash of a model file: the version it is served (and cached) under.
+    """
+    sha = hashlib.sha256()
+    with open(model_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(block)
+    return sha.hexdigest()[:16]
+
+
+class ServedModel:
+    """
+    SERVED MODEL
+    ------------
+    Which model version is being served, with its label map, and the mapping of
+    its softmax outputs to the response format of the web app.
+
+    This part needs neither TensorFlow nor the model itself: 'PredictionPipeline'
+    adds loading and running the model in this process, while 'PooledModel'
+    (worker_pool.py) leaves that to the worker processes, so a web process
+    fronting a worker pool holds no copy of the model.
+
+    The served model can be replaced while the app is running ('reload_model'):
+    the new version is loaded and warmed up on the side, then swapped in with a
+    single reference assignment, and the previous one is kept for 'rollback_model'.
+
+    Class names come from the 'class_indices.json' label map saved next to the
+    model at training time, so they always match the model's output order (and
+    any number of classes). Every result carries the per-class probabilities.
+    """
+    # Used when a model has no label map next to it (models trained before it was saved)
+    default_class_names = ["Normal", "Tumor"]
+
+    def __init__(self, model_path, image_size=(224, 224)):
+        """
+        Args:
+            model_path (str): Path to the trained model (.h5/.keras or .tflite).
+            image_size (tuple): (height, width) the model was trained on (224x224 for VGG16).
+        """
+        self.image_size = tuple(image_size)
+        self._swap_lock = threading.Lock()
+        self._previous = None
+        # Called with the new version after every swap (e.g., to invalidate caches)
+        self.on_model_swap = []
+        self._current = self._load_version(model_path)
+
+
+    @property
+    def model(self):
+        """
+        The model currently being served (None when it runs in other processes).
+        """
+        return self._current["model"]
+
+
+    @property
+    def class_names(self) -> list:
+        """
+        Class names in the order of the served model's softmax outputs.
+        """
+        return self._current["class_names"]
+
+
+    @property
+    def model_version(self) -> str:
+        """
+        Short content hash of the served model file; changes whenever the model is swapped.
+        """
+        return self._current["version"]
+
+
+    @property
+    def state(self) -> dict:
+        """
+        The served model together with its version and label map. A swap replaces
+        the whole dict, so a request holding it keeps a consistent model and version.
+        """
+        return self._current
+
+
+    def model_info(self) -> dict:
+        info = {k: v for k, v in self._current.items() if k != "model"}
+        info["previous_version"] = self._previous["version"] if self._previous else None
+        return info
+
+
+    @classmethod
+    def load_class_names(cls, model_path) -> list:
+        """
+        Reads the label map saved next to 'model_path' and returns the class names
+        ordered by output index; falls back to 'default_class_names'.
+        """
+        label_map_path = Path(model_path).parent / LABEL_MAP_FILE
+        if not label_map_path.exists():
+            logging.warning(f"No {LABEL_MAP_FILE} next to {model_path}, using default labels {cls.default_class_names}")
+            return list(cls.default_class_names)
+        with open(label_map_path) as f:
+            class_indices = json.load(f)
+        return [name for name, _ in sorted(class_indices.items(), key=lambda item: item[1])]
+
+
+    def _load_model(self, model_path):
+        """
+        Loads the model file in this process; nothing to load here (see 'PredictionPipeline').
+        """
+        return None
+
+
+    def _load_version(self, model_path) -> dict:
+        """
+        Loads a model file and describes it (path, content hash, label map, load time).
+        """
+        return {
+            "model": self._load_model(model_path),
+            "class_names": self.load_class_names(model_path),
+            "version": file_version(model_path),
+            "path": str(model_path),
+            "loaded_at": time.time(),
+        }
+
+
+    def warm_up(self, state: dict = None):
+        """
+        Checks a loaded version before it takes traffic; nothing to run here (see 'PredictionPipeline').
+        """
+
+
+    def _swap(self, new_state: dict):
+        self._previous, self._current = self._current, new_state
+        logging.info(f"Serving model version {new_state['version']} from {new_state['path']}")
+        for callback in self.on_model_swap:
+            callback(new_state["version"])
+
+
+    def reload_model(self, model_path) -> str:
+        """
+        Loads 'model_path', warms it up and atomically swaps it in.
+        Requests already running finish on the old model; the old model is kept for rollback.
+
+        Raises:
+            ValueError: If the warm-up prediction fails (the current model stays in place).
+
+        Returns:
+            str: The version now being served.
+        """
+        with self._swap_lock:
+            new_state = self._load_version(model_path)
+            if new_state["version"] == self.model_version:
+                return self.model_version
+            self.warm_up(new_state)
+            self._swap(new_state)
+            return self.model_version
+
+
+    def rollback_model(self) -> str:
+        """
+        Swaps back to the previously served model (instantly, it is still in memory).
+
+        Returns:
+            str: The version now being served.
+        """
+        with self._swap_lock:
+            if self._previous is None:
+                raise ValueError("No previous model to roll back to")
+            self._swap(self._previous)
+            return self.model_version
+
+
+    def interpret(self, probabilities: np.ndarray, class_names: list = None) -> list:
+        """
+        Maps the softmax output of a single image to the response format used by the web app.
+
+        Args:
+            probabilities (np.ndarray): Class probabilities for one image, shape (classes,).
+            class_names (list, optional): Labels of the model that produced them
+                (e.g., a pinned 'state["class_names"]'); defaults to the served model's.
+
+        Returns:
+            list: A list containing one dictionary with the predicted class (e.g., 'Tumor' or 'Normal'),
+            its probability ('confidence') and the probability of every class.
+        """
+        # Same vectorized path as whole batches, with a batch of one
+        return self.interpret_many(np.asarray(probabilities)[None], class_names)
+
+
+    def interpret_many(self, probabilities: np.ndarray, class_names: list = None) -> list:
+        """
+        Maps the softmax output of a whole batch to per-image results in one vectorized step.
+
+        Args:
+            probabilities (np.ndarray): Class probabilities with shape (N, classes).
+            class_names (list, optional): Labels of the model that produced them; defaults to the served model's.
+
+        Returns:
+            list: One dictionary per image with the predicted class, its probability and every class probability.
+        """
+        probabilities = np.asarray(probabilities, dtype="float64")
+        class_names = class_names or self.class_names
+        best = np.argmax(probabilities, axis=1)
+        labels = np.asarray(class_names)[best]
+        confidences = np.round(probabilities[np.arange(len(best)), best], 6).tolist()
+        rounded = np.round(probabilities, 6).tolist()
+        return [
+            {"image": str(label), "confidence": confidence, "probabilities": dict(zip(class_names, row))}
+            for label, confidence, row in zip(labels, confidences, rounded)
+        ]
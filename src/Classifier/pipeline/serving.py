@@ -0,0 +1,61 @@
+import numpy as np
+
+# Relative on purpose: the servers import this package as 'Classifier.pipeline',
+# and the metrics must be the very module they register and render
+from . import metrics
+
+
+def classify_image(server, image_bytes, route: str = "/predict", serving: tuple = None) -> np.ndarray:
+    """
+    The /predict pipeline shared by the Flask (app.py) and asyncio (asgi_app.py)
+    servers: cache lookup, then decode + model, then cache write.
+
+    The served version is read once, so the lookup, the model call and the cache
+    write all use it. The model runs in the worker pool, through the
+    micro-batcher, or directly on the pinned model, whichever 'server' has set
+    up. The batcher and the pool run whatever model is current when the image
+    reaches them, so their result is only cached if no swap happened meanwhile.
+
+    Args:
+        server: The ClientApp / AsyncClientApp: 'classifier', 'prediction_cache',
+            'worker_pool', 'batcher', 'forward' and 'serving_state'.
+        image_bytes (bytes | bytearray | memoryview): The encoded image.
+        route (str): Route label of the phase metrics.
+        serving (tuple, optional): (version, state) from 'server.serving_state()', when the
+            caller read it already (e.g., to label the result with 'state["class_names"]').
+
+    Returns:
+        np.ndarray: The class probabilities, shape (classes,).
+
+    Raises:
+        queue.Full: The batcher or the worker pool queue is full.
+        TimeoutError: The worker pool did not answer in time.
+        ValueError: The worker pool could not decode the image.
+        RuntimeError: The worker pool has no working worker.
+    """
+    version, state = serving or server.serving_state()
+    cache = server.prediction_cache
+    if cache is not None:
+        with metrics.phase(route, "cache_lookup"):
+            cache_key = cache.key(image_bytes, version)
+            probabilities = cache.get(cache_key)
+        if probabilities is not None:
+            return probabilities
+
+    if server.worker_pool is not None:
+        # Decoding and the model both run in a worker process
+        with metrics.phase(route, "model"):
+            probabilities = server.worker_pool.predict(image_bytes)
+    else:
+        with metrics.phase(route, "image_decode"):
+            tensor = server.classifier.load_image(image_bytes)
+        with metrics.phase(route, "model"):
+            if server.batcher is not None:
+                # The preprocessed tensor joins the next micro-batch
+                probabilities = server.batcher.predict(tensor)
+            else:
+                probabilities = server.forward(tensor[None], state)[0]
+
+    if cache is not None and server.serving_state()[0] == version:
+        cache.put(cache_key, probabilities)
+    return probabilities
@@ -0,0 +1,53 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent.parent))
+
+from src.Classifier.config.configuration import ConfigurationManager
+from src.Classifier.components.data_sharding import DataSharding
+from src.logger import logging
+
+
+STAGE_NAME = "Data Sharding"
+
+
+class DataShardingTrainingPipeline:
+    """
+    Orchestrates the data sharding stage.
+    Runs right after data ingestion (stage 1b) and packs the extracted images into
+    a few large, pre-resized shard files that training and evaluation can stream.
+    """
+    def __init__(self):
+        pass
+
+    def main(self):
+        """
+        Executes the data sharding steps:
+        1. Initialize ConfigurationManager and fetch DataShardingConfig.
+        2. Instantiate the DataSharding component.
+        3. Decode, resize and write every image into the shards.
+        """
+        # Step 1: Manage and fetch the sharding configuration
+        config = ConfigurationManager()
+        data_sharding_config = config.get_data_sharding_config()
+
+        # Step 2: Initialize the DataSharding component
+        data_sharding = DataSharding(config=data_sharding_config)
+
+        # Step 3: Write the shard files and their index
+        data_sharding.create_shards()
+
+
+if __name__ == '__main__':
+    try:
+        logging.info(f"*******************")
+        logging.info(f">>>>>> stage {STAGE_NAME} started <<<<<<")
+
+        # Instantiate and run the pipeline stage
+        data_sharding_pipeline = DataShardingTrainingPipeline()
+        data_sharding_pipeline.main()
+
+        logging.info(f">>>>>> stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
+    except Exception as e:
+        # Log any errors encountered while writing the shards
+        logging.exception(e)
+        raise e
@@ -36,8 +36,18 @@ class ModelTrainingPipeline:
         
         # Step 3: Run the training workflow:
         training.get_base_model()         # 1. Load the customized VGG16 model from artifacts
-        training.train_valid_generator()  # 2. Prepare the images (normalization & augmentation)
-        training.train()                  # 3. Start training and save the final result
+        if training_config.params_training_mode == "bottleneck":
+            if training_config.params_profile:
+                logging.warning("PROFILE is ignored in bottleneck mode")
+            # 2-3. Cache frozen-base features once, train only the head, save the full model
+            training.train_on_cached_features()
+        else:
+            training.prepare_inputs()     # 2. Prepare the images (generator or tf.data, per params.yaml)
+            if training_config.params_profile:
+                # Optional: measure data-wait vs compute time, then start again from the untouched base model
+                training.profile()
+                training.get_base_model()
+            training.train()              # 3. Start training and save the final result
 
 
 if __name__ == '__main__':
@@ -0,0 +1,53 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent.parent))
+
+from src.Classifier.config.configuration import ConfigurationManager
+from src.Classifier.components.model_export import ModelExport
+from src.logger import logging
+
+
+STAGE_NAME = "Model Export"
+
+
+class ModelExportTrainingPipeline:
+    """
+    Orchestrates the model export stage.
+    Runs after evaluation (stage 04) and converts the trained .h5 model into lean inference
+    formats (SavedModel and a quantized TFLite file) for serving.
+    """
+    def __init__(self):
+        pass
+
+    def main(self):
+        """
+        Executes the model export steps:
+        1. Initialize ConfigurationManager and fetch ModelExportConfig.
+        2. Instantiate the ModelExport component.
+        3. Export SavedModel and TFLite, then write the comparison report.
+        """
+        # Step 1: Manage and fetch the export configuration
+        config = ConfigurationManager()
+        model_export_config = config.get_model_export_config()
+
+        # Step 2: Initialize the ModelExport component
+        model_export = ModelExport(config=model_export_config)
+
+        # Step 3: Export the model and compare it against the original
+        model_export.export()
+
+
+if __name__ == '__main__':
+    try:
+        logging.info(f"*******************")
+        logging.info(f">>>>>> stage {STAGE_NAME} started <<<<<<")
+
+        # Instantiate and run the pipeline stage
+        model_export_pipeline = ModelExportTrainingPipeline()
+        model_export_pipeline.main()
+
+        logging.info(f">>>>>> stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
+    except Exception as e:
+        # Log any errors encountered during the export
+        logging.exception(e)
+        raise e
@@ -0,0 +1,59 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent.parent))
+
+from src.Classifier.config.configuration import ConfigurationManager
+from src.Classifier.components.hyperparameter_sweep import HyperparameterSweep
+from src.logger import logging
+
+
+STAGE_NAME = "Hyperparameter Sweep"
+
+
+class HyperparameterSweepPipeline:
+    """
+    Orchestrates a hyperparameter sweep over stages 03 (training) and 04 (evaluation).
+
+    Not part of 'dvc repro': run it on demand once stages 01, 01b and 02 have
+    produced the dataset, shards and base model that every trial shares:
+
+        dvc repro prepare_base_model data_sharding
+        python src/Classifier/pipeline/sweep.py
+    """
+    def __init__(self):
+        pass
+
+    def main(self):
+        """
+        Executes the sweep:
+        1. Initialize ConfigurationManager and fetch SweepConfig.
+        2. Instantiate the HyperparameterSweep component.
+        3. Run every trial and write the leaderboard.
+        """
+        # Step 1: Manage and fetch the sweep configuration (search space from params.yaml)
+        config = ConfigurationManager()
+        sweep_config = config.get_sweep_config()
+
+        # Step 2: Initialize the HyperparameterSweep component
+        sweep = HyperparameterSweep(config=sweep_config)
+
+        # Step 3: Train/evaluate every trial concurrently and rank them
+        return sweep.run()
+
+
+if __name__ == '__main__':
+    try:
+        logging.info(f"*******************")
+        logging.info(f">>>>>> {STAGE_NAME} started <<<<<<")
+
+        # Instantiate and run the sweep
+        sweep_pipeline = HyperparameterSweepPipeline()
+        leaderboard = sweep_pipeline.main()
+        if leaderboard and leaderboard[0]["rank"] == 1:
+            logging.info(f"Best trial: {leaderboard[0]['trial_id']} {leaderboard[0]['params']} {leaderboard[0]['metrics']}")
+
+        logging.info(f">>>>>> {STAGE_NAME} completed <<<<<<\n\nx==========x")
+    except Exception as e:
+        # Log any errors encountered during the sweep
+        logging.exception(e)
+        raise e
@@ -0,0 +1,40 @@
+import threading
+import numpy as np
+
+
+class TFLiteModel:
+    """
+    Makes a .tflite model callable like a Keras model: 'model(batch, training=False)'.
+
+    Uses the standalone 'tflite_runtime' interpreter when it is installed (a few MB
+    instead of the full TensorFlow), else the one bundled with TensorFlow. An
+    interpreter is not thread-safe, so calls are serialized with a lock; the
+    interpreter itself runs each call on 'num_threads' threads.
+    """
+    def __init__(self, model_path, num_threads: int = 4):
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+
+            Interpreter = tf.lite.Interpreter
+
+        self._lock = threading.Lock()
+        self._interpreter = Interpreter(model_path=str(model_path), num_threads=num_threads)
+        self._interpreter.allocate_tensors()
+        self._input = self._interpreter.get_input_details()[0]
+        self._output_index = self._interpreter.get_output_details()[0]["index"]
+        self._batch_size = int(self._input["shape"][0])
+
+    def __call__(self, batch, training=False) -> np.ndarray:
+        batch = np.ascontiguousarray(batch, dtype=self._input["dtype"])
+        with self._lock:
+            if batch.shape[0] != self._batch_size:
+                # Re-plan the tensors only when the batch size actually changes
+                self._interpreter.resize_tensor_input(self._input["index"], batch.shape)
+                self._interpreter.allocate_tensors()
+                self._batch_size = batch.shape[0]
+            self._interpreter.set_tensor(self._input["index"], batch)
+            self._interpreter.invoke()
+            # Copy: the output buffer is reused by the next invoke()
+            return self._interpreter.get_tensor(self._output_index).copy()
@@ -0,0 +1,429 @@
+import os
+import re
+import json
+import time
+import uuid
+import shlex
+import shutil
+import signal
+import threading
+import contextlib
+import subprocess
+from pathlib import Path
+from src.Classifier.entity.config_entity import TrainingJobsConfig
+from src.logger import logging
+
+try:
+    import fcntl
+except ImportError:             # Windows
+    fcntl = None
+    import msvcrt
+
+
+JOB_ID_PATTERN = re.compile(r"^[0-9a-f]{12}$")
+FINISHED = ("succeeded", "failed", "cancelled")
+
+
+class FileLock:
+    """
+    Lock shared by every process on the machine (gunicorn/uvicorn workers
+    included), held through an OS lock on 'path'. The OS releases it when
+    the holding process exits, so a crashed worker never leaves it stuck.
+    """
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        file = open(self.path, "a+b")
+        try:
+            if fcntl is not None:
+                fcntl.flock(file.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            else:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+        except OSError:
+            file.close()
+            return False
+        self._file = file
+        return True
+
+    def release(self):
+        file, self._file = self._file, None
+        if fcntl is None:
+            file.seek(0)
+            msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+        file.close()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def _process_start(pid: int):
+    """
+    Start time of process 'pid' in clock ticks since boot (Linux, from /proc),
+    which tells it apart from a later process given the same pid.
+    Returns None if the process does not exist or /proc is not available.
+    """
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # The command name may contain spaces: the fields after it are fixed
+            return int(f.read().rsplit(")", 1)[1].split()[19])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class TrainingJob:
+    """
+    State of one background pipeline run, stored as '<log_dir>/<job_id>.json'.
+    """
+    def __init__(self, job_id: str, log_path: Path):
+        self.job_id = job_id
+        self.log_path = log_path
+        self.status = "queued"      # queued -> running -> succeeded / failed / cancelled
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.returncode = None
+        self.pid = None             # Training process (and process group) while running
+        self.pid_start = None       # Its start time (see '_process_start'), to detect a reused pid
+        self.runner_pid = None      # Server process supervising it
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "returncode": self.returncode,
+        }
+
+    def to_state(self) -> dict:
+        return {**self.to_dict(), "pid": self.pid, "pid_start": self.pid_start, "runner_pid": self.runner_pid}
+
+    @classmethod
+    def from_state(cls, state: dict, log_dir: Path) -> "TrainingJob":
+        job = cls(state["job_id"], Path(log_dir) / f"{state['job_id']}.log")
+        for name in ("status", "created_at", "started_at", "finished_at", "returncode", "pid", "pid_start",
+                     "runner_pid"):
+            setattr(job, name, state.get(name))
+        return job
+
+
+class TrainingJobManager:
+    """
+    BACKGROUND TRAINING JOBS
+    ------------------------
+    Runs the training pipeline ('dvc repro' by default) in a separate process so
+    the web server keeps answering /predict while a retrain is going on.
+
+    - Job state lives on disk ('<log_dir>/<job_id>.json'), so every server
+      process (e.g., each gunicorn or uvicorn worker) sees every job: status,
+      log tail and cancel work whichever worker answers the request.
+    - Jobs are queued and run one at a time across all processes: each process
+      has a runner thread, and only the one holding the pipeline lock
+      ('<log_dir>/pipeline.lock') starts the next queued job.
+    - The child process runs with a lower CPU priority (niceness), optionally
+      pinned to a subset of cores, and with capped TensorFlow/OpenMP thread
+      pools so it cannot starve the inference threads.
+    - Output goes to '<log_dir>/<job_id>.log', which can be tailed while it runs.
+    - Queued or running jobs can be cancelled.
+    - Only the last 'max_jobs' finished jobs are kept (state and log).
+    """
+    def __init__(self, config: TrainingJobsConfig, poll_seconds: float = 2.0):
+        """
+        Initializes the manager and starts the background runner thread.
+
+        Args:
+            config (TrainingJobsConfig): Command, resource limits and log directory.
+            poll_seconds (float): How often the runner looks for queued jobs.
+        """
+        self.config = config
+        self.log_dir = Path(self.config.log_dir)
+        os.makedirs(self.log_dir, exist_ok=True)
+        self.poll_seconds = poll_seconds
+        # Short-lived: guards reading/writing job files. Long-lived: held while a pipeline runs.
+        self._state_lock = FileLock(self.log_dir / "jobs.lock")
+        self._pipeline_lock = FileLock(self.log_dir / "pipeline.lock")
+        self._thread_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._runner = threading.Thread(target=self._run_forever, name="training-jobs", daemon=True)
+        self._runner.start()
+
+
+    @contextlib.contextmanager
+    def _locked(self):
+        with self._thread_lock, self._state_lock:
+            yield
+
+
+    def _state_path(self, job_id: str) -> Path:
+        return self.log_dir / f"{job_id}.json"
+
+
+    def _read(self, job_id: str) -> TrainingJob:
+        if not JOB_ID_PATTERN.match(job_id or ""):
+            return None
+        try:
+            with open(self._state_path(job_id), encoding="utf-8") as f:
+                return TrainingJob.from_state(json.load(f), self.log_dir)
+        except (OSError, ValueError):
+            return None
+
+
+    def _write(self, job: TrainingJob):
+        # Write then rename, so another process never reads a half-written file
+        path = self._state_path(job.job_id)
+        temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(job.to_state(), f)
+        os.replace(temporary, path)
+
+
+    def _all_jobs(self) -> list:
+        jobs = (self._read(path.stem) for path in self.log_dir.glob("*.json"))
+        return sorted((job for job in jobs if job is not None), key=lambda job: job.created_at)
+
+
+    def submit(self) -> TrainingJob:
+        """
+        Queues a new pipeline run and returns it immediately.
+        """
+        job_id = uuid.uuid4().hex[:12]
+        job = TrainingJob(job_id, self.log_dir / f"{job_id}.log")
+        with self._locked():
+            self._write(job)
+            self._prune()
+        self._wakeup.set()
+        logging.info(f"Training job {job_id} queued")
+        return job
+
+
+    def get(self, job_id: str) -> TrainingJob:
+        return self._read(job_id)
+
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancels a queued job, or stops a running one (the whole process group),
+        whichever server process started it.
+
+        Returns:
+            bool: False if the job is unknown or already finished.
+        """
+        with self._locked():
+            job = self._read(job_id)
+            if job is None or job.status not in ("queued", "running"):
+                return False
+            running = job.status == "running"
+            job.status = "cancelled"
+            if not running:
+                job.finished_at = time.time()
+            self._write(job)
+
+        if running:
+            # The runner also polls the state file and stops the process itself;
+            # signalling here makes it immediate and works from any process.
+            logging.info(f"Cancelling training job {job_id}")
+            self._signal_job(job, signal.SIGTERM)
+        return True
+
+
+    def tail(self, job_id: str, lines: int = 100) -> str:
+        """
+        Returns the last 'lines' lines of a job's log without reading the whole file.
+        """
+        job = self._read(job_id)
+        if job is None or not os.path.exists(job.log_path):
+            return ""
+        with open(job.log_path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            end = f.tell()
+            block, data = 8192, b""
+            while end > 0 and data.count(b"\n") <= lines:
+                start = max(0, end - block)
+                f.seek(start)
+                data = f.read(end - start) + data
+                end = start
+        return b"\n".join(data.splitlines()[-lines:]).decode("utf-8", errors="replace")
+
+
+    def _prune(self):
+        """
+        Deletes the oldest finished jobs (state and log) beyond 'max_jobs'.
+        """
+        finished = [job for job in self._all_jobs() if job.status in FINISHED]
+        for job in finished[:max(0, len(finished) - self.config.max_jobs)]:
+            for path in (self._state_path(job.job_id), job.log_path):
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(path)
+
+
+    def _child_env(self) -> dict:
+        """
+        Environment of the training process, with bounded thread pools.
+        """
+        env = dict(os.environ)
+        if self.config.num_threads:
+            threads = str(self.config.num_threads)
+            env.update({
+                "OMP_NUM_THREADS": threads,
+                "MKL_NUM_THREADS": threads,
+                "TF_NUM_INTRAOP_THREADS": threads,
+                "TF_NUM_INTEROP_THREADS": "1",
+            })
+        return env
+
+
+    def _command(self) -> list:
+        """
+        Command line of a run, prefixed with 'nice' and 'taskset' where available,
+        so the limits apply from the first instruction and are inherited by
+        every stage 'dvc' spawns (no preexec_fn: it is unsafe in a threaded server).
+        """
+        command = shlex.split(self.config.command)
+        if self.config.cpu_affinity and shutil.which("taskset"):
+            command = ["taskset", "-c", ",".join(str(core) for core in self.config.cpu_affinity)] + command
+        if self.config.niceness and shutil.which("nice"):
+            command = ["nice", "-n", str(self.config.niceness)] + command
+        return command
+
+
+    def _limit_resources(self, pid: int):
+        """
+        Fallback when 'nice'/'taskset' are not installed: applies the limits to
+        the started process (POSIX only; stages it spawns later inherit them).
+        """
+        if self.config.niceness and not shutil.which("nice") and hasattr(os, "setpriority"):
+            os.setpriority(os.PRIO_PROCESS, pid, os.getpriority(os.PRIO_PROCESS, pid) + self.config.niceness)
+        if self.config.cpu_affinity and not shutil.which("taskset") and hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(pid, set(self.config.cpu_affinity))
+
+
+    @staticmethod
+    def _signal(pid: int, signum: int):
+        if not pid:
+            return
+        with contextlib.suppress(ProcessLookupError, PermissionError):
+            if os.name == "posix":
+                # The job runs in its own session: stop 'dvc' and every stage it spawned
+                os.killpg(pid, signum)
+            else:
+                os.kill(pid, signum)
+
+
+    def _signal_job(self, job: TrainingJob, signum: int):
+        """
+        Signals a job's process group from its saved pid, unless the pid now
+        belongs to another process: a stale job's pid may have been reused.
+        A pid whose process is gone is still signalled (its group may live on,
+        and Linux does not hand out a pid still used as a process group id).
+        Without /proc the process cannot be verified, so it is left alone.
+        """
+        if not job.pid or job.pid_start is None:
+            return
+        current = _process_start(job.pid)
+        if current is not None and current != job.pid_start:
+            logging.warning(f"Training job {job.job_id}: pid {job.pid} belongs to another process now, not signalled")
+            return
+        self._signal(job.pid, signum)
+
+
+    def _terminate(self, process: subprocess.Popen, grace_seconds: float = 10):
+        if process.poll() is not None:
+            return
+        self._signal(process.pid, signal.SIGTERM)
+        try:
+            process.wait(timeout=grace_seconds)
+        except subprocess.TimeoutExpired:
+            self._signal(process.pid, getattr(signal, "SIGKILL", signal.SIGTERM))
+
+
+    def _claim_next(self) -> TrainingJob:
+        """
+        Marks the oldest queued job as running by this process (caller holds the pipeline lock).
+        Jobs left 'running' by a server process that died are marked failed first.
+        """
+        with self._locked():
+            jobs = self._all_jobs()
+            for job in jobs:
+                if job.status == "running":
+                    # Nobody else can hold the pipeline lock, so its runner is gone
+                    job.status, job.finished_at = "failed", time.time()
+                    self._write(job)
+                    self._signal_job(job, signal.SIGTERM)
+            job = next((job for job in jobs if job.status == "queued"), None)
+            if job is not None:
+                job.status, job.started_at, job.runner_pid = "running", time.time(), os.getpid()
+                self._write(job)
+            return job
+
+
+    def _run(self, job: TrainingJob) -> int:
+        with open(job.log_path, "wb") as log_file:
+            process = subprocess.Popen(
+                self._command(),
+                stdout=log_file,
+                stderr=subprocess.STDOUT,
+                env=self._child_env(),
+                start_new_session=os.name == "posix",
+            )
+            try:
+                self._limit_resources(process.pid)
+            except OSError as e:
+                logging.warning(f"Could not limit training job {job.job_id}: {e}")
+            with self._locked():
+                current = self._read(job.job_id)
+                job.pid, job.pid_start = process.pid, _process_start(process.pid)
+                if current is not None and current.status == "cancelled":
+                    job.status = "cancelled"
+                self._write(job)
+
+            # Poll instead of a plain wait: a cancel may come from another process
+            while process.poll() is None:
+                if job.status == "cancelled" or getattr(self._read(job.job_id), "status", None) == "cancelled":
+                    job.status = "cancelled"
+                    self._terminate(process)
+                    break
+                try:
+                    process.wait(timeout=self.poll_seconds)
+                except subprocess.TimeoutExpired:
+                    pass
+            return process.wait()
+
+
+    def _run_forever(self):
+        while True:
+            self._wakeup.wait(self.poll_seconds)
+            self._wakeup.clear()
+            if not self._pipeline_lock.acquire(blocking=False):
+                continue                # Another process is running a job
+            try:
+                job = self._claim_next()
+                if job is None:
+                    continue
+                try:
+                    returncode = self._run(job)
+                except Exception as e:
+                    logging.exception(e)
+                    returncode = -1
+
+                with self._locked():
+                    current = self._read(job.job_id)
+                    if current is not None and current.status == "cancelled":
+                        job.status = "cancelled"
+                    job.returncode = returncode
+                    job.finished_at = time.time()
+                    job.pid = job.pid_start = None
+                    if job.status != "cancelled":
+                        job.status = "succeeded" if returncode == 0 else "failed"
+                    self._write(job)
+                logging.info(f"Training job {job.job_id} finished: {job.status} (return code {returncode})")
+                self._wakeup.set()      # Look for the next queued job right away
+            finally:
+                self._pipeline_lock.release()
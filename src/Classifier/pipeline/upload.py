@@ -0,0 +1,206 @@
+import io
+import threading
+import numpy as np
+from PIL import Image
+
+
+# Same input scaling as training, evaluation and the export calibration ([0, 255] -> [0, 1])
+RESCALE = 1.0 / 255
+
+
+class BufferWriter(io.RawIOBase):
+    """
+    File-like object writing into a reusable bytearray instead of a new buffer.
+
+    It is both the destination of an upload (request body or multipart file)
+    and a readable file over what was written, so it can be handed to
+    anything that expects an uploaded file.
+    """
+    def __init__(self, owner: "UploadBuffers", buffer: bytearray):
+        super().__init__()
+        self.owner = owner
+        self.buffer = buffer
+        self.size = 0
+        self.position = 0
+
+    def readable(self):
+        return True
+
+    def writable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def reserve(self, capacity: int):
+        """
+        Makes room for 'capacity' bytes in total. A bigger buffer replaces the
+        old one (instead of resizing it) so views handed out earlier stay valid.
+        """
+        if capacity <= len(self.buffer):
+            return
+        buffer = bytearray(max(capacity, 2 * len(self.buffer)))
+        buffer[:self.size] = memoryview(self.buffer)[:self.size]
+        self.buffer = buffer
+        self.owner.keep(buffer)
+
+    def write(self, data) -> int:
+        data = memoryview(data).cast("B")
+        end = self.position + len(data)
+        self.reserve(end)
+        self.buffer[self.position:end] = data
+        self.position = end
+        self.size = max(self.size, end)
+        return len(data)
+
+    def fill_from(self, stream, chunk_size: int = 64 * 1024, expected_length: int = None) -> int:
+        """
+        Copies 'stream' (e.g., the WSGI input) into the buffer chunk by chunk,
+        reading straight into the buffer's free space.
+
+        Args:
+            stream: Any object with 'readinto' (or 'read').
+            chunk_size (int): Bytes requested from the stream per call.
+            expected_length (int, optional): Content-Length, to size the buffer once up front.
+
+        Returns:
+            int: Number of bytes read.
+        """
+        if expected_length:
+            self.reserve(self.position + expected_length)
+        readinto = getattr(stream, "readinto", None)
+        while True:
+            self.reserve(self.position + chunk_size)
+            window = memoryview(self.buffer)[self.position:self.position + chunk_size]
+            if readinto is not None:
+                count = readinto(window)
+            else:
+                data = stream.read(chunk_size)
+                count = len(data)
+                window[:count] = data
+            window.release()
+            if not count:
+                break
+            self.position += count
+            self.size = max(self.size, self.position)
+        return self.size
+
+    def readinto(self, target) -> int:
+        count = min(len(target), self.size - self.position)
+        target[:count] = memoryview(self.buffer)[self.position:self.position + count]
+        self.position += count
+        return count
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self.position, io.SEEK_END: self.size}[whence]
+        self.position = max(0, base + offset)
+        return self.position
+
+    def tell(self) -> int:
+        return self.position
+
+    def getbuffer(self) -> memoryview:
+        """
+        Zero-copy view of everything written so far.
+        """
+        return memoryview(self.buffer)[:self.size]
+
+
+class MemoryviewReader(io.RawIOBase):
+    """
+    Read-only file over a memoryview. Unlike io.BytesIO, wrapping the view does
+    not copy it, so an image decoder can read an upload in place.
+    """
+    def __init__(self, view):
+        super().__init__()
+        self.view = memoryview(view).cast("B")
+        self.position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, target) -> int:
+        count = min(len(target), len(self.view) - self.position)
+        target[:count] = self.view[self.position:self.position + count]
+        self.position += count
+        return count
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self.position, io.SEEK_END: len(self.view)}[whence]
+        self.position = max(0, base + offset)
+        return self.position
+
+    def tell(self) -> int:
+        return self.position
+
+
+class UploadBuffers:
+    """
+    REUSABLE UPLOAD BUFFERS
+    -----------------------
+    One bytearray per request thread, reused by every upload that thread
+    serves. A raw or multipart image body is streamed into it in chunks and
+    decoded straight from it, so a request never builds the body as a
+    Python string, never base64-decodes it and never allocates a fresh
+    body-sized buffer once the thread has served an image that large.
+
+    A thread serves one request at a time, so its buffer is free again as
+    soon as the image has been decoded into a tensor.
+
+    Reuse only pays off when requests are served by a fixed set of long-lived
+    threads (gunicorn '--threads', Werkzeug's threaded dev server creates a
+    new thread per request and gets nothing from it). Memory grows with the
+    number of threads, so a buffer that grew past 'max_kept_bytes' for an
+    unusually large upload is released after that request instead of kept.
+    """
+    def __init__(self, initial_bytes: int = 1024 * 1024, max_kept_bytes: int = 8 * 1024 * 1024):
+        """
+        Args:
+            initial_bytes (int): Size of a thread's buffer before it first grows.
+            max_kept_bytes (int): Largest buffer a thread keeps for its next request.
+        """
+        self.initial_bytes = initial_bytes
+        self.max_kept_bytes = max(initial_bytes, max_kept_bytes)
+        self._local = threading.local()
+
+    def keep(self, buffer: bytearray):
+        # An oversized buffer lives only as long as the writer using it
+        self._local.buffer = buffer if len(buffer) <= self.max_kept_bytes else None
+
+    def writer(self) -> BufferWriter:
+        """
+        Empty writer over the calling thread's buffer.
+        """
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = bytearray(self.initial_bytes)
+            self.keep(buffer)
+        return BufferWriter(self, buffer)
+
+
+def decode_image(source, image_size) -> np.ndarray:
+    """
+    Decodes an encoded image (bytes, bytearray or memoryview) without copying
+    it first, preprocessed like keras' load_img + img_to_array (RGB,
+    nearest-neighbour resize to 'image_size', float32) and then rescaled to
+    [0, 1] like the training inputs.
+
+    Needs only NumPy and Pillow, so processes that must not import TensorFlow can use it.
+
+    Args:
+        source: The encoded image (JPEG, PNG, ...).
+        image_size (tuple): (height, width) of the output.
+
+    Returns:
+        np.ndarray: Array of shape (height, width, 3).
+    """
+    target = (image_size[1], image_size[0])
+    with Image.open(MemoryviewReader(source)) as decoded:
+        if decoded.mode != "RGB":
+            decoded = decoded.convert("RGB")
+        if decoded.size != target:
+            decoded = decoded.resize(target, Image.NEAREST)
+        return np.asarray(decoded, dtype="float32") * np.float32(RESCALE)
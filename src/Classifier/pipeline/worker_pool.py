@@ -0,0 +1,458 @@
+import os
+import time
+import queue
+import itertools
+import threading
+import multiprocessing
+from concurrent.futures import Future
+
+import numpy as np
+
+from src.Classifier.utils.common import split_cores, limit_threads
+from src.Classifier.pipeline.upload import decode_image
+from src.Classifier.pipeline.served_model import ServedModel
+from src.logger import logging
+
+
+# Loading TensorFlow and a model in a fresh process can take a while
+STARTUP_TIMEOUT_S = 300
+
+
+def _load_model(model_path, threads: int):
+    """
+    Loads the served model inside a worker. A .tflite file is opened by the TFLite
+    interpreter, which memory-maps it, so the file pages are shared between workers.
+    Delegates (XNNPACK, on by default) may still repack the weights into private
+    memory per interpreter: check the per-worker 'pss_mb' in 'snapshot'.
+    """
+    if str(model_path).endswith(".tflite"):
+        from src.Classifier.pipeline.tflite_model import TFLiteModel
+
+        return TFLiteModel(model_path, num_threads=threads)
+
+    import tensorflow as tf
+
+    return tf.keras.models.load_model(model_path)
+
+
+def _worker_main(worker_id: int, cores, threads: int, model_path: str, image_size: tuple,
+                 max_batch_size: int, tasks, results):
+    """
+    Inference worker process: decodes queued images and runs them through the
+    model, up to 'max_batch_size' queued images per model call.
+
+    Messages sent on 'results':
+        ("ready", worker_id, pid) / ("failed", worker_id, error) once at startup,
+        then ("result", worker_id, request_id, probabilities or None, error or None, bad_input).
+    """
+    tflite = str(model_path).endswith(".tflite")
+    # Before the model is loaded: only a .h5 model needs TensorFlow imported
+    limit_threads(cores, threads, inter_op_threads=1, tensorflow=not tflite)
+    try:
+        model = _load_model(model_path, threads)
+        model(np.zeros((1,) + tuple(image_size) + (3,), dtype="float32"), training=False)
+    except Exception as e:
+        results.put(("failed", worker_id, f"{type(e).__name__}: {e}"))
+        return
+    results.put(("ready", worker_id, os.getpid()))
+
+    stopping = False
+    while not stopping:
+        batch = [tasks.get()]
+        while len(batch) < max_batch_size:
+            try:
+                batch.append(tasks.get_nowait())
+            except queue.Empty:
+                break
+        if None in batch:
+            # Stop sentinel: it is always the last message a worker receives
+            stopping = True
+            batch = [task for task in batch if task is not None]
+
+        request_ids, tensors = [], []
+        for request_id, image_bytes in batch:
+            try:
+                tensors.append(decode_image(image_bytes, image_size))
+                request_ids.append(request_id)
+            except Exception as e:
+                results.put(("result", worker_id, request_id, None, f"Could not decode image: {e}", True))
+        if not tensors:
+            continue
+
+        try:
+            probabilities = np.asarray(model(np.stack(tensors), training=False), dtype="float32")
+        except Exception as e:
+            for request_id in request_ids:
+                results.put(("result", worker_id, request_id, None, f"{type(e).__name__}: {e}", False))
+            continue
+        for request_id, row in zip(request_ids, probabilities):
+            results.put(("result", worker_id, request_id, row, None, False))
+
+
+def _memory_usage(pid: int) -> dict:
+    """
+    Resident (RSS) and proportional (PSS) memory of a process in MB, read from
+    /proc on Linux. PSS counts a page shared by N processes as 1/N, so summed
+    over the workers it is what the pool really costs. Empty elsewhere.
+    """
+    usage = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                if name in ("Rss", "Pss"):
+                    usage[f"{name.lower()}_mb"] = round(int(value.split()[0]) / 1024, 1)
+    except (OSError, ValueError):
+        pass
+    return usage
+
+
+class _Worker:
+    """
+    Front-end bookkeeping for one worker process.
+    """
+    def __init__(self, worker_id: int, process, tasks, cores, model_path: str):
+        self.worker_id = worker_id
+        self.process = process
+        self.tasks = tasks
+        self.cores = cores
+        self.model_path = model_path
+        self.in_flight = set()
+        self.ready = threading.Event()
+        self.error = None
+
+
+class InferenceWorkerPool:
+    """
+    MULTI-PROCESS INFERENCE WORKER POOL
+    -----------------------------------
+    Runs image decoding and the model in K worker processes, so per-request
+    Python work no longer serializes on one interpreter's GIL.
+
+    - Every worker is pinned to its own slice of cores, with intra-op threads
+      matching the slice and a single inter-op thread, so workers never fight
+      over the same cores.
+    - The front end sends the encoded image bytes over a per-worker local queue
+      (to the worker with the fewest images in flight) and gets the
+      probabilities back on one shared result queue; a collector thread
+      resolves the caller's Future. Each worker batches whatever is queued
+      for it (up to 'max_batch_size') into one model call.
+    - Weights: a .tflite model is memory-mapped by the TFLite interpreter, so
+      the K workers map one read-only copy of the file from the page cache. How
+      much that saves depends on the delegate: XNNPACK repacks the weights of
+      the layers it runs into each interpreter's own memory, so a worker can
+      still hold most of a copy. 'snapshot' reports each worker's RSS and PSS
+      (proportional set size: shared pages split between the processes
+      mapping them) to measure it. A .h5 model is never shared: every worker
+      holds its own copy.
+    - A worker that dies is restarted; its in-flight requests fail. 'reload'
+      starts workers on a new model and only retires the old ones once the
+      new ones are warm.
+
+    Workers are started with 'spawn', so no TensorFlow state is forked.
+    """
+    def __init__(self, model_path, image_size, workers: int = 2, threads_per_worker: int = None,
+                 max_batch_size: int = 16, max_queue_size: int = 256, timeout_s: float = 30,
+                 model_version: str = None):
+        """
+        Args:
+            model_path (str | Path): Served model (.tflite to share weights, or .h5).
+            image_size (tuple): (height, width) images are resized to.
+            workers (int): Number of worker processes.
+            threads_per_worker (int, optional): Cores and intra-op threads per worker; default is an even split.
+            max_batch_size (int): Largest batch a worker hands to the model.
+            max_queue_size (int): Images in flight across all workers; beyond this 'submit' raises queue.Full.
+            timeout_s (float): Longest time 'predict' waits for a result.
+            model_version (str, optional): Version of 'model_path' (used in cache keys by the caller).
+        """
+        self.model_path = str(model_path)
+        self.model_version = model_version
+        self.image_size = tuple(image_size)
+        self.num_workers = max(1, int(workers))
+        self.threads_per_worker = threads_per_worker
+        self.threads = None
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_queue_size = max_queue_size
+        self.timeout_s = timeout_s
+
+        self._context = multiprocessing.get_context("spawn")
+        self._results = self._context.Queue()
+        self._lock = threading.Lock()
+        self._request_ids = itertools.count()
+        self._worker_ids = itertools.count()
+        self._pending = {}                      # request id -> (Future, worker)
+        self._by_id = {}                        # worker id -> worker
+        self._closed = False
+        self.workers = []
+        self.rejected = 0
+        self.restarts = 0
+
+
+    def start(self):
+        """
+        Starts the collector thread and the workers; returns once every worker is warm.
+        """
+        if not self.model_path.endswith(".tflite"):
+            logging.warning(
+                f"Worker pool serves {self.model_path}: .h5 weights cannot be memory-mapped, "
+                f"each of the {self.num_workers} workers loads its own copy"
+            )
+        self._collector = threading.Thread(target=self._collect, name="worker-pool-collector", daemon=True)
+        self._collector.start()
+        self.workers = self._start_workers(self.model_path)
+        logging.info(
+            f"Inference worker pool ready: {self.num_workers} workers x {self.threads} threads, "
+            f"cores {[sorted(w.cores) if w.cores else 'any' for w in self.workers]}"
+        )
+        return self
+
+
+    def _spawn(self, cores, model_path: str) -> _Worker:
+        worker_id = next(self._worker_ids)
+        tasks = self._context.Queue()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(worker_id, cores, self.threads, model_path, self.image_size, self.max_batch_size, tasks, self._results),
+            name=f"inference-worker-{worker_id}",
+            daemon=True
+        )
+        worker = _Worker(worker_id, process, tasks, cores, model_path)
+        self._by_id[worker_id] = worker
+        process.start()
+        return worker
+
+
+    def _start_workers(self, model_path: str) -> list:
+        """
+        Spawns a full set of workers on 'model_path' and waits until they are warm.
+
+        Raises:
+            RuntimeError: If a worker fails to load the model (the new workers are stopped).
+        """
+        slices, self.threads = split_cores(self.num_workers, self.threads_per_worker)
+        workers = [self._spawn(cores, model_path) for cores in slices]
+
+        deadline = time.monotonic() + STARTUP_TIMEOUT_S
+        for worker in workers:
+            while not worker.ready.wait(1.0):
+                if not worker.process.is_alive() or time.monotonic() > deadline:
+                    worker.error = worker.error or "worker exited or timed out while loading the model"
+                    break
+            if worker.error:
+                for w in workers:
+                    self._stop_worker(w)
+                raise RuntimeError(f"Inference worker {worker.worker_id} could not start: {worker.error}")
+        return workers
+
+
+    def _stop_worker(self, worker: _Worker, timeout: float = 30):
+        worker.tasks.put(None)
+        worker.process.join(timeout)
+        if worker.process.is_alive():
+            worker.process.terminate()
+        self._by_id.pop(worker.worker_id, None)
+
+
+    def submit(self, image_bytes) -> Future:
+        """
+        Queues one encoded image (JPEG/PNG bytes, bytearray or memoryview).
+
+        Returns:
+            Future: Resolves to the image's probability vector.
+
+        Raises:
+            queue.Full: If 'max_queue_size' images are already in flight.
+        """
+        future = Future()
+        image_bytes = bytes(image_bytes)        # A view of an upload buffer cannot be pickled
+        with self._lock:
+            if not self.workers:
+                raise RuntimeError("No inference worker is running")
+            if len(self._pending) >= self.max_queue_size:
+                self.rejected += 1
+                raise queue.Full
+            worker = min(self.workers, key=lambda w: len(w.in_flight))
+            request_id = future.request_id = next(self._request_ids)
+            self._pending[request_id] = (future, worker)
+            worker.in_flight.add(request_id)
+            # Under the lock, so a task can never land behind a worker's stop sentinel
+            worker.tasks.put((request_id, image_bytes))
+        return future
+
+
+    def _result(self, future: Future, request_id: int) -> np.ndarray:
+        try:
+            return future.result(timeout=self.timeout_s)
+        except TimeoutError:
+            with self._lock:
+                _, worker = self._pending.pop(request_id, (None, None))
+                if worker is not None:
+                    worker.in_flight.discard(request_id)
+            raise
+
+
+    def predict(self, image_bytes) -> np.ndarray:
+        """
+        Classifies one encoded image in a worker and waits for its probabilities.
+
+        Raises:
+            queue.Full: Too many images in flight (caller should shed load).
+            TimeoutError: No result within 'timeout_s'.
+            ValueError: The image could not be decoded.
+            RuntimeError: The model call failed, the worker died or the pool is closed.
+        """
+        future = self.submit(image_bytes)
+        return self._result(future, future.request_id)
+
+
+    def predict_many(self, images: list) -> list:
+        """
+        Spreads several encoded images over the workers and returns their probabilities in order.
+        """
+        futures = [self.submit(image_bytes) for image_bytes in images]
+        return [self._result(future, future.request_id) for future in futures]
+
+
+    def _collect(self):
+        """
+        Collector thread: resolves Futures from the result queue and restarts dead workers.
+        """
+        last_check = time.monotonic()
+        while not self._closed:
+            try:
+                message = self._results.get(timeout=1.0)
+            except queue.Empty:
+                message = None
+            if time.monotonic() - last_check >= 1.0:
+                self._check_workers()
+                last_check = time.monotonic()
+            if message is None:
+                continue
+
+            kind, worker = message[0], self._by_id.get(message[1])
+            if kind == "ready" and worker is not None:
+                worker.ready.set()
+            elif kind == "failed" and worker is not None:
+                worker.error = message[2]
+                worker.ready.set()
+            elif kind == "result":
+                _, _, request_id, probabilities, error, bad_input = message
+                with self._lock:
+                    future, owner = self._pending.pop(request_id, (None, None))
+                    if owner is not None:
+                        owner.in_flight.discard(request_id)
+                if future is None:
+                    continue                    # The caller already timed out
+                if error is not None:
+                    # ValueError: the image is the problem; RuntimeError: the model failed
+                    future.set_exception((ValueError if bad_input else RuntimeError)(error))
+                else:
+                    future.set_result(probabilities)
+
+
+    def _check_workers(self):
+        """
+        Restarts serving workers whose process died and fails their in-flight requests.
+        A worker that died before it ever became ready (the model does not load) is not restarted.
+        """
+        with self._lock:
+            orphans = []
+            for worker in [w for w in self.workers if not w.process.is_alive()]:
+                index = self.workers.index(worker)
+                if worker.ready.is_set() and worker.error is None:
+                    logging.error(
+                        f"Inference worker {worker.worker_id} (pid {worker.process.pid}) died "
+                        f"with exit code {worker.process.exitcode}; restarting it"
+                    )
+                    self.workers[index] = self._spawn(worker.cores, worker.model_path)
+                    self.restarts += 1
+                else:
+                    logging.error(f"Inference worker {worker.worker_id} could not start ({worker.error}); dropping it")
+                    self.workers.pop(index)
+                self._by_id.pop(worker.worker_id, None)
+                orphans += [self._pending.pop(request_id)[0] for request_id in worker.in_flight
+                            if request_id in self._pending]
+        for future in orphans:
+            future.set_exception(RuntimeError("Inference worker died while processing the image"))
+
+
+    def reload(self, model_path, model_version: str = None):
+        """
+        Moves the pool to a new model: new workers are started and warmed up
+        first, then take over; the old ones finish their queued images and exit.
+        If the new model fails to start, the old workers keep serving.
+        """
+        new_workers = self._start_workers(str(model_path))
+        with self._lock:
+            old_workers, self.workers = self.workers, new_workers
+            self.model_path, self.model_version = str(model_path), model_version
+        for worker in old_workers:
+            self._stop_worker(worker)
+        logging.info(f"Inference worker pool now serving {model_path} (version {model_version})")
+
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "model_path": self.model_path,
+                "model_version": self.model_version,
+                "threads_per_worker": self.threads,
+                "in_flight": len(self._pending),
+                "rejected": self.rejected,
+                "restarts": self.restarts,
+                "workers": [
+                    {
+                        "worker_id": w.worker_id,
+                        "pid": w.process.pid,
+                        "cores": sorted(w.cores) if w.cores else None,
+                        "in_flight": len(w.in_flight),
+                        "alive": w.process.is_alive(),
+                        **_memory_usage(w.process.pid),
+                    }
+                    for w in self.workers
+                ],
+            }
+
+
+    def close(self):
+        """
+        Stops every worker after its queued images and fails whatever is still pending.
+        """
+        with self._lock:
+            workers, self.workers = self.workers, []
+        for worker in workers:
+            self._stop_worker(worker)
+        self._closed = True
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for future, _ in pending.values():
+            future.set_exception(RuntimeError("Inference worker pool closed"))
+
+
+class PooledModel(ServedModel):
+    """
+    The served model as seen by a web process whose predictions all go through
+    an 'InferenceWorkerPool': only the version (file hash) and the label map
+    are held here, so the web process neither imports TensorFlow nor keeps a
+    (K+1)th copy of the model.
+
+    A swap first moves 'worker_pool' to the new model: its warm workers are
+    the warm-up, and if they fail to start, neither the pool nor the served
+    version change.
+    """
+    def __init__(self, model_path, image_size=(224, 224)):
+        """
+        Args:
+            model_path (str): Path to the trained model (.tflite to share weights, or .h5).
+            image_size (tuple): (height, width) the model was trained on.
+        """
+        # Attached once the pool is started on this model (see app.py)
+        self.worker_pool = None
+        super().__init__(model_path, image_size)
+
+
+    def _swap(self, new_state: dict):
+        if self.worker_pool is not None:
+            # Raises RuntimeError (pool unchanged) if the new workers cannot load the model
+            self.worker_pool.reload(new_state["path"], new_state["version"])
+        super()._swap(new_state)
@@ -24,6 +24,10 @@ from typing import Any
 import base64
 
 
+# File extensions picked up by Keras' 'flow_from_directory'
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".ppm", ".tif", ".tiff")
+
+
 
 @ensure_annotations
 def read_yaml(path_to_yaml: Path) -> ConfigBox:
@@ -147,6 +151,114 @@ def get_size(path: Path) -> str:
     return f"~ {size_in_kb} KB"
 
 
+def list_image_files(directory: Path, validation_split: float = 0.0, subset: str = None):
+    """
+    Lists the images of a class-per-folder dataset exactly like Keras' 'flow_from_directory'.
+
+    Classes are the sorted sub-folder names and, inside each class, files are
+    sorted by path. With a 'validation_split', the first split fraction of every
+    class is the 'validation' subset and the rest is the 'training' subset, so
+    any pipeline built on this list sees the same images as the
+    ImageDataGenerator-based one.
+
+    Args:
+        directory (Path): Dataset root (e.g., 'kidney-ct-scan-image' with 'Normal' and 'Tumor' folders).
+        validation_split (float, optional): Fraction of every class reserved for validation.
+        subset (str, optional): 'training', 'validation' or None for every file.
+
+    Returns:
+        tuple: (list of file paths, list of integer labels, list of class names)
+    """
+    if subset not in (None, "training", "validation"):
+        raise ValueError(f"Invalid subset name: {subset}")
+
+    class_names = sorted(
+        entry for entry in os.listdir(directory) if os.path.isdir(os.path.join(directory, entry))
+    )
+
+    filepaths, labels = [], []
+    for label, class_name in enumerate(class_names):
+        class_dir = os.path.join(directory, class_name)
+        class_files = []
+        for root, _, files in sorted(os.walk(class_dir), key=lambda x: x[0]):
+            for fname in sorted(files):
+                if fname.lower().endswith(IMAGE_EXTENSIONS):
+                    class_files.append(os.path.join(root, fname))
+
+        if subset is not None and validation_split:
+            n = len(class_files)
+            split = (0, validation_split) if subset == "validation" else (validation_split, 1)
+            class_files = class_files[int(split[0] * n):int(split[1] * n)]
+
+        filepaths.extend(class_files)
+        labels.extend([label] * len(class_files))
+
+    return filepaths, labels, class_names
+
+
+def set_precision_policy(policy: str):
+    """
+    Sets the global Keras dtype policy before a model is built or loaded.
+
+    'float32' is the default. 'mixed_bfloat16' runs most layers in bfloat16 and
+    pays off on CPUs with AVX512-BF16/AMX (and on TPUs); 'mixed_float16' is meant
+    for GPUs. Variables always stay in float32.
+
+    Args:
+        policy (str): Keras policy name, e.g. 'float32', 'mixed_bfloat16' or 'mixed_float16'.
+    """
+    import tensorflow as tf  # Imported lazily: most helpers here must not pull in TensorFlow
+
+    tf.keras.mixed_precision.set_global_policy(policy)
+    logging.info(f"Keras dtype policy set to: {policy}")
+
+
+def split_cores(workers: int, threads: int = None):
+    """
+    Splits the cores this process may use into one disjoint slice per worker process.
+
+    Args:
+        workers (int): Number of worker processes.
+        threads (int, optional): Cores per worker; defaults to an even split.
+
+    Returns:
+        tuple: (list of core sets, one per worker, threads per worker). The sets
+        are None when there are fewer cores than requested, so placement is left
+        to the OS rather than oversubscribing one slice.
+    """
+    cores = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count() or 1))
+    threads = threads or max(1, len(cores) // workers)
+    slices = [set(cores[i * threads:(i + 1) * threads]) for i in range(workers)]
+    if any(len(s) < threads for s in slices):
+        slices = [None] * workers
+    return slices, threads
+
+
+def limit_threads(cores, intra_op_threads: int, inter_op_threads: int = 1, tensorflow: bool = True):
+    """
+    Pins the calling process to 'cores' and caps its thread pools (OpenMP, MKL,
+    TensorFlow). Call it at the start of a fresh worker process, before
+    TensorFlow creates its runtime.
+
+    Args:
+        cores (set): Cores to run on (None leaves the affinity unchanged).
+        intra_op_threads (int): Threads used inside one op (e.g., a convolution).
+        inter_op_threads (int): Ops run concurrently.
+        tensorflow (bool): Also configure TensorFlow through tf.config (imports it).
+    """
+    if cores and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+    for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "TF_NUM_INTRAOP_THREADS"):
+        os.environ[variable] = str(intra_op_threads)
+    os.environ["TF_NUM_INTEROP_THREADS"] = str(inter_op_threads)
+
+    if tensorflow:
+        import tensorflow as tf
+
+        tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+        tf.config.threading.set_inter_op_parallelism_threads(inter_op_threads)
+
+
 def decodeImage(imgstring, fileName):
     """
     Decodes a base64 encoded image string and saves it to a file.
@@ -161,6 +273,22 @@ def decodeImage(imgstring, fileName):
         f.close()
 
 
+def decodeImageBytes(imgstring):
+    """
+    Decodes a base64 encoded image string into raw bytes, entirely in memory.
+
+    Unlike 'decodeImage', nothing is written to disk, so concurrent requests
+    never share (or overwrite) a temporary file.
+
+    Args:
+        imgstring (str): The base64 encoded image string.
+
+    Returns:
+        bytes: The encoded image (e.g., JPEG/PNG bytes) ready for decoding.
+    """
+    return base64.b64decode(imgstring)
+
+
 def encodeImageIntoBase64(croppedImagePath):
     """
     Encodes an image file into a base64 string.
@@ -0,0 +1,224 @@
+"""
+DOWNLOAD HELPERS
+----------------
+Streaming, resumable and checksum-verified downloads for the data ingestion stage.
+
+A 'source' knows how to stream bytes from one kind of location (plain HTTP(S),
+Google Drive, or a local file for offline runs) into a partial file, updating a
+SHA-256 hasher as the bytes arrive. 'download_with_checksum' then takes care of
+skipping work when the local file is already correct, resuming interrupted
+transfers and verifying the final hash.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import urllib.error
+import urllib.request
+from pathlib import Path
+from urllib.parse import urlparse
+from src.logger import logging
+
+
+CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+
+def _hash_file(path: Path, hasher=None):
+    """
+    Feeds an existing file into 'hasher' (a new SHA-256 by default) and returns it.
+    """
+    hasher = hasher or hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+            hasher.update(block)
+    return hasher
+
+
+class DownloadSource:
+    """
+    Base class for download sources.
+
+    'fetch' appends the remaining bytes to 'part_path' (which may already hold the
+    first bytes of an interrupted transfer) and returns the SHA-256 hasher of the
+    complete file.
+    """
+    def __init__(self, url: str):
+        self.url = url
+
+    def fetch(self, part_path: Path):
+        raise NotImplementedError
+
+    @staticmethod
+    def _resume_state(part_path: Path):
+        """
+        Returns (bytes already downloaded, hasher seeded with those bytes).
+        """
+        if os.path.exists(part_path):
+            offset = os.path.getsize(part_path)
+            return offset, _hash_file(part_path)
+        return 0, hashlib.sha256()
+
+    @staticmethod
+    def _stream(reader, part_path: Path, mode: str, hasher):
+        with open(part_path, mode) as f:
+            for block in iter(lambda: reader.read(CHUNK_SIZE), b""):
+                f.write(block)
+                hasher.update(block)
+        return hasher
+
+
+class HTTPSource(DownloadSource):
+    """
+    Plain HTTP(S) download, resumed with a 'Range' request when a partial file exists.
+    """
+    def fetch(self, part_path: Path):
+        offset, hasher = self._resume_state(part_path)
+        request = urllib.request.Request(self.url)
+        if offset:
+            request.add_header("Range", f"bytes={offset}-")
+
+        try:
+            response = urllib.request.urlopen(request)
+        except urllib.error.HTTPError as e:
+            if not (offset and e.code == 416):
+                raise
+            # Range starts at or past the end: the partial file may already be complete
+            remote_size = self._remote_size(e)
+            if remote_size == offset:
+                logging.info(f"Partial file already holds all {offset} bytes")
+                return hasher
+            logging.info(f"Partial file ({offset} bytes) does not match the remote file ({remote_size}), restarting download")
+            os.remove(part_path)
+            return self.fetch(part_path)
+
+        with response:
+            if offset and response.status != 206:
+                # Server ignored the Range header: start over
+                logging.info("Server does not support resuming, restarting download")
+                offset, hasher = 0, hashlib.sha256()
+            if offset:
+                logging.info(f"Resuming download at byte {offset}")
+            return self._stream(response, part_path, "ab" if offset else "wb", hasher)
+
+    def _remote_size(self, error) -> int:
+        """
+        Size of the remote file: from the 416 answer's 'Content-Range: bytes */<size>',
+        else from a HEAD request's Content-Length. None if the server gives neither.
+        """
+        content_range = error.headers.get("Content-Range", "")
+        if "/" in content_range and content_range.rsplit("/", 1)[1].strip().isdigit():
+            return int(content_range.rsplit("/", 1)[1])
+        try:
+            with urllib.request.urlopen(urllib.request.Request(self.url, method="HEAD")) as response:
+                length = response.headers.get("Content-Length")
+                return int(length) if length and length.isdigit() else None
+        except OSError:
+            return None
+
+
+class LocalFileSource(DownloadSource):
+    """
+    Copies a local file (path or file:// URL). Useful for offline runs and tests.
+    """
+    def fetch(self, part_path: Path):
+        parsed = urlparse(self.url)
+        path = parsed.path if parsed.scheme == "file" else self.url
+        offset, hasher = self._resume_state(part_path)
+        if offset > os.path.getsize(path):
+            offset, hasher = 0, hashlib.sha256()
+
+        with open(path, "rb") as reader:
+            reader.seek(offset)
+            return self._stream(reader, part_path, "ab" if offset else "wb", hasher)
+
+
+class GoogleDriveSource(DownloadSource):
+    """
+    Google Drive download through 'gdown' (handles share links and confirmation pages).
+
+    gdown resumes partial files itself but does not expose the byte stream, so the
+    finished file is hashed once after the transfer.
+    """
+    def fetch(self, part_path: Path):
+        import gdown
+
+        # 'fuzzy=True' helps gdown handle different types of Drive links
+        gdown.download(self.url, str(part_path), quiet=False, fuzzy=True, resume=True)
+        return _hash_file(part_path)
+
+
+def get_source(url: str) -> DownloadSource:
+    """
+    Picks the download source matching the URL.
+    """
+    parsed = urlparse(url)
+    if parsed.scheme in ("", "file"):
+        return LocalFileSource(url)
+    if parsed.netloc.endswith("drive.google.com"):
+        return GoogleDriveSource(url)
+    if parsed.scheme in ("http", "https"):
+        return HTTPSource(url)
+    raise ValueError(f"Unsupported download URL: {url}")
+
+
+def _read_checksum(path: Path):
+    """
+    Returns the SHA-256 of 'path', reusing the '<path>.sha256' record while the
+    file's size and modification time are unchanged (so unchanged data is never re-read).
+    """
+    record_path = f"{path}.sha256"
+    stat = os.stat(path)
+    if os.path.exists(record_path):
+        with open(record_path) as f:
+            record = json.load(f)
+        if record.get("size") == stat.st_size and record.get("mtime") == stat.st_mtime:
+            return record["sha256"]
+
+    sha256 = _hash_file(path).hexdigest()
+    _write_checksum(path, sha256)
+    return sha256
+
+
+def _write_checksum(path: Path, sha256: str):
+    stat = os.stat(path)
+    with open(f"{path}.sha256", "w") as f:
+        json.dump({"sha256": sha256, "size": stat.st_size, "mtime": stat.st_mtime}, f)
+
+
+def download_with_checksum(source: DownloadSource, destination: Path, expected_sha256: str = None) -> bool:
+    """
+    Downloads 'source' to 'destination' unless a correct copy already exists.
+
+    Args:
+        source (DownloadSource): Where the bytes come from.
+        destination (Path): Final file path (e.g., artifacts/data_ingestion/data.zip).
+        expected_sha256 (str, optional): Expected SHA-256; when missing, an existing file is trusted.
+
+    Raises:
+        ValueError: If the downloaded file does not match 'expected_sha256'.
+
+    Returns:
+        bool: True if a download happened, False if the existing file was reused.
+    """
+    expected = expected_sha256.lower() if expected_sha256 else None
+
+    if os.path.exists(destination):
+        if expected is None or _read_checksum(destination) == expected:
+            logging.info(f"{destination} is up to date, skipping download")
+            return False
+        logging.info(f"{destination} does not match the expected checksum, downloading again")
+        os.remove(destination)
+
+    # Bytes go to '<destination>.part' first, so an interrupted download can be
+    # resumed and is never mistaken for a complete file.
+    part_path = Path(f"{destination}.part")
+    sha256 = source.fetch(part_path).hexdigest()
+
+    if expected is not None and sha256 != expected:
+        os.remove(part_path)
+        raise ValueError(f"Checksum mismatch for {destination}: expected {expected}, got {sha256}")
+
+    shutil.move(part_path, destination)
+    _write_checksum(destination, sha256)
+    return True
@@ -1,16 +1,230 @@
-import logging
+"""
+LOGGING
+-------
+Every module uses this logger through 'from src.logger import logging' and then
+calls 'logging.info(...)', exactly like the standard library module.
+
+- Lazy: nothing is configured at import; the first logging call sets it up.
+- Non-blocking: log calls only put the record on an in-memory queue
+  (QueueHandler). A background thread (QueueListener) does the disk writes,
+  so request threads never wait on file I/O.
+- Rotation: the file rolls over when it reaches LOG_MAX_BYTES or once per
+  LOG_ROTATE_WHEN interval (midnight by default), keeping LOG_BACKUP_COUNT files.
+- Structured: one JSON object per line, carrying the id of the request that
+  logged it (see 'set_request_id'). LOG_FORMAT=text gives the old plain format.
+
+Settings come from environment variables: LOG_DIR (default ./logs), LOG_LEVEL
+(INFO), LOG_FORMAT (json), LOG_MAX_BYTES (10 MB), LOG_BACKUP_COUNT (5),
+LOG_ROTATE_WHEN (midnight).
+"""
+
 import os
+import copy
+import json
+import time
+import queue
+import atexit
+import threading
+import logging as std_logging
+from logging import handlers as log_handlers
+from contextvars import ContextVar
 from datetime import datetime
 
-Log_File = f"log_{datetime.now().strftime('%m_%d_%Y_%H_%M_%S')}.log"  # Create a unique log file name with timestamp.
-logs_path = os.path.join(os.getcwd(), "logs", Log_File)  # Construct the path for logs directory including the file name.
-os.makedirs(logs_path, exist_ok=True)  # Create the logs directory if it doesn't exist.
 
-LOG_FILE_PATH = os.path.join(logs_path, Log_File)  # Full path to the log file.
+# Id of the request being served by the current thread/task (None outside requests)
+request_id_var = ContextVar("request_id", default=None)
+
+TEXT_FORMAT = "[%(asctime)s] %(lineno)d %(name)s - %(levelname)s - %(message)s"
+
+_lock = threading.Lock()
+_state = {"pid": None, "listener": None, "queue_handler": None, "file_path": None}
+
+
+def set_request_id(request_id):
+    """
+    Tags every record logged from the current context with 'request_id'.
+
+    Returns:
+        Token to pass to 'reset_request_id' when the request is done.
+    """
+    return request_id_var.set(request_id)
+
+
+def reset_request_id(token):
+    request_id_var.reset(token)
+
+
+class RequestIdFilter(std_logging.Filter):
+    """
+    Copies the current request id onto the record. It runs in the logging
+    thread itself, before the record crosses over to the writer thread.
+    """
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class JsonFormatter(std_logging.Formatter):
+    """
+    Formats a record as one JSON line.
+    """
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "line": record.lineno,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "process": record.process,
+            "thread": record.threadName,
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class RecordQueueHandler(log_handlers.QueueHandler):
+    """
+    QueueHandler that keeps the traceback apart from the message, so the
+    writer thread can still put it in its own JSON field.
+    """
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = std_logging.Formatter().formatException(record.exc_info)
+        # The arguments and traceback object may not be safe to read from another thread
+        record.msg, record.args, record.exc_info = record.message, None, None
+        return record
+
+
+class SizeAndTimeRotatingFileHandler(log_handlers.RotatingFileHandler):
+    """
+    RotatingFileHandler that also rolls over once per time interval.
+
+    Args:
+        when (str): 'midnight', or an interval such as '1h', '30m' or '1d'.
+    """
+    UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+    def __init__(self, filename, max_bytes: int, backup_count: int, when: str = "midnight"):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+        self.when = when.strip().lower()
+        self.rollover_at = self._next_rollover(time.time())
+
+    def _next_rollover(self, now: float) -> float:
+        if self.when == "midnight":
+            tomorrow = datetime.fromtimestamp(now).date().toordinal() + 1
+            return time.mktime(datetime.fromordinal(tomorrow).timetuple())
+        return now + float(self.when[:-1]) * self.UNITS[self.when[-1]]
+
+    def shouldRollover(self, record):
+        if time.time() >= self.rollover_at:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        self.rollover_at = self._next_rollover(time.time())
+
+
+def _file_handler() -> std_logging.Handler:
+    """
+    Handler writing this process's log file (created when the first record arrives).
+    """
+    log_dir = os.environ.get("LOG_DIR", os.path.join(os.getcwd(), "logs"))
+    os.makedirs(log_dir, exist_ok=True)  # Only the directory; the file is created by the handler
+
+    # One file per process (gunicorn workers, spawned pool workers, ...), so processes
+    # started in the same second never share a file or rotate each other's
+    log_file = f"log_{datetime.now().strftime('%m_%d_%Y_%H_%M_%S')}_pid{os.getpid()}"
+    _state["file_path"] = os.path.join(log_dir, log_file + ".log")
+
+    handler = SizeAndTimeRotatingFileHandler(
+        _state["file_path"],
+        max_bytes=int(os.environ.get("LOG_MAX_BYTES", 10 * 1024 * 1024)),
+        backup_count=int(os.environ.get("LOG_BACKUP_COUNT", 5)),
+        when=os.environ.get("LOG_ROTATE_WHEN", "midnight"),
+    )
+    if os.environ.get("LOG_FORMAT", "json").lower() == "text":
+        handler.setFormatter(std_logging.Formatter(TEXT_FORMAT))
+    else:
+        handler.setFormatter(JsonFormatter())
+    return handler
+
+
+def _start_listener():
+    """
+    Starts the background writer thread draining the log queue into the file.
+    """
+    log_queue = queue.SimpleQueue()                 # Unbounded: putting a record never blocks
+    _state["queue_handler"].queue = log_queue
+    listener = log_handlers.QueueListener(log_queue, _file_handler(), respect_handler_level=True)
+    listener.start()
+    _state["listener"] = listener
+    _state["pid"] = os.getpid()
+
+
+def configure():
+    """
+    Sets up queue-based logging on the root logger. Safe to call many times:
+    only the first call in each process does the work.
+    """
+    if _state["pid"] == os.getpid():
+        return
+    with _lock:
+        if _state["pid"] == os.getpid():
+            return
+        root = std_logging.getLogger()
+        root.setLevel(os.environ.get("LOG_LEVEL", "INFO").upper())
+
+        queue_handler = RecordQueueHandler(queue.SimpleQueue())
+        queue_handler.addFilter(RequestIdFilter())
+        root.addHandler(queue_handler)
+        _state["queue_handler"] = queue_handler
+        _start_listener()
+        # Flush the queue on a normal exit
+        atexit.register(shutdown)
+
+
+def shutdown():
+    """
+    Writes out the queued records and stops the writer thread.
+    """
+    listener = _state["listener"]
+    if listener is not None and _state["pid"] == os.getpid():
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+        _state["listener"] = None
+
+
+def _after_fork_in_child():
+    # The writer thread does not survive a fork: start a new one in the child
+    # (on a fresh queue, the inherited one may have been locked mid-put)
+    if _state["listener"] is not None:
+        _start_listener()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+class _LazyLogging:
+    """
+    Stands in for the standard 'logging' module: the first attribute access
+    (logging.info, logging.getLogger, logging.INFO, ...) configures logging,
+    then the attribute is cached so later calls cost nothing extra.
+    """
+    def __getattr__(self, name):
+        configure()
+        value = getattr(std_logging, name)
+        self.__dict__[name] = value
+        return value
 
-logging.basicConfig(  # Set up basic logging configuration.
-    filename=LOG_FILE_PATH,  # Log messages will be written to this file.
-    format="[%(asctime)s] %(lineno)d %(name)s - %(levelname)s - %(message)s",  # Format: timestamp, line number, logger name, level, message.
-    level=logging.INFO,  # Log INFO level and above.
-)
 
+logging = _LazyLogging()